@@ -1,4 +1,3 @@
-import sqlite3
 import json
 from openai import OpenAI
 from dotenv import load_dotenv
@@ -8,12 +7,26 @@ import ast
 import random
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from src.quiz.data import load_nano_topics
+from src.db.migrations import migrate
+from src.db.pool import get_connection
+from src.quiz.dedup import DuplicateIndex
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Load environment variables
 load_dotenv()
 openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+# --- Parallel generation settings ---
+# Nano-topics generated at the same time
+GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", "6"))
+# Attempts per nano-topic before it is left for the next run
+TOPIC_RETRIES = 3
+# Questions buffered before the writer inserts them in one transaction
+WRITE_BATCH_SIZE = 50
+# Records finished nano-topics so an interrupted run can resume
+LEDGER_PATH = os.path.join(os.path.dirname(__file__), "generation_ledger.json")
+
 # Define the IGCSE curriculum structure (manually extracted and structured)
 curriculum = {
     "subject": "mathematics",
@@ -542,156 +555,251 @@ def generate_questions(nano_topic, keywords, num_questions=3, difficulty=None, s
     print(f"Max retries exceeded for {nano_topic}. Returning empty list.")
     return []
 
-def create_database():
-    """Create SQLite database and tables."""
-    conn = sqlite3.connect("data/math.db")
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS topics (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            subject TEXT NOT NULL,
-            name TEXT NOT NULL,
-            description TEXT
-        )
-    """)
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS subtopics (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            topic_id INTEGER,
-            name TEXT NOT NULL,
-            description TEXT,
-            FOREIGN KEY (topic_id) REFERENCES topics(id)
-        )
-    """)
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS micro_topics (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            subtopic_id INTEGER,
-            name TEXT NOT NULL,
-            description TEXT,
-            FOREIGN KEY (subtopic_id) REFERENCES subtopics(id)
-        )
-    """)
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS nano_topics (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            micro_topic_id INTEGER,
-            name TEXT NOT NULL,
-            description TEXT,
-            keywords TEXT,
-            FOREIGN KEY (micro_topic_id) REFERENCES micro_topics(id)
-        )
-    """)
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS questions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nano_topic_id INTEGER,
-            question TEXT NOT NULL,
-            options TEXT NOT NULL,
-            answer TEXT NOT NULL,
-            difficulty TEXT,
-            style TEXT, 
-            FOREIGN KEY (nano_topic_id) REFERENCES nano_topics(id)
+
+class GenerationLedger:
+    """Progress ledger for one generation run, stored as JSON next to this script.
+
+    A ledger left behind by an interrupted run with the same run key is
+    resumed; the file is deleted once a run finishes every task.
+    """
+
+    def __init__(self, run_key, path=LEDGER_PATH):
+        self.run_key = run_key
+        self.path = path
+        self.done = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("run_key") == run_key:
+                self.done = data.get("done", {})
+                print(f"Resuming generation run '{run_key}': {len(self.done)} nano-topics already done.")
+
+    def is_done(self, task_key):
+        return task_key in self.done
+
+    def mark_done(self, task_keys_with_counts):
+        self.done.update(task_keys_with_counts)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"run_key": self.run_key, "done": self.done}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class QuestionWriter:
+    """Single writer that inserts generated questions in batches.
+
+    Questions that near-duplicate an existing question in the same nano-topic
+    (or one generated earlier in the run) are dropped before insert. Tasks are
+    recorded in the ledger only after their questions are committed.
+    """
+
+    def __init__(self, conn, ledger, batch_size=WRITE_BATCH_SIZE):
+        self.conn = conn
+        self.ledger = ledger
+        self.batch_size = batch_size
+        self.index = DuplicateIndex(conn)
+        self._rows = []
+        self._finished = {}
+        self.inserted = 0
+        self.duplicates = 0
+
+    def add(self, task_key, nano_topic_id, questions):
+        added = 0
+        for q in questions:
+            duplicate_id, signature = self.index.find_duplicate(nano_topic_id, q["question"])
+            if duplicate_id is not None:
+                self.duplicates += 1
+                continue
+            self.index.add(nano_topic_id, None, signature)
+            self._rows.append(((nano_topic_id, q["question"], json.dumps(q["options"]), q["answer"], q["difficulty"], q["style"]), signature))
+            added += 1
+        self._finished[task_key] = added
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+        return added
+
+    def flush(self):
+        if not self._finished:
+            return
+        c = self.conn.cursor()
+        c.executemany(
+            "INSERT INTO questions (nano_topic_id, question, options, answer, difficulty, style) VALUES (?, ?, ?, ?, ?, ?)",
+            [row for row, _ in self._rows]
         )
-    """)
-    c.execute("CREATE INDEX IF NOT EXISTS idx_nano_topic_id ON questions(nano_topic_id)")
-    c.execute("CREATE INDEX IF NOT EXISTS idx_nano_name ON nano_topics(name)")
-    conn.commit()
-    conn.close()
+        # ids are AUTOINCREMENT and the write lock is held until commit, so
+        # the batch holds the largest ids, in insert order
+        c.execute("SELECT id FROM questions ORDER BY id DESC LIMIT ?", (len(self._rows),))
+        ids = sorted(row[0] for row in c.fetchall())
+        self.index.store([(question_id, row[0], signature) for question_id, (row, signature) in zip(ids, self._rows)])
+        self.conn.commit()
+        self.inserted += len(self._rows)
+        self.ledger.mark_done(self._finished)
+        self._rows = []
+        self._finished = {}
+
+
+def generate_balanced_questions(nano_topic, keywords, num_questions=10):
+    """Generate a diverse set for a nano-topic, then top up styles below their target share."""
+    base_questions = generate_questions(nano_topic, keywords, num_questions=num_questions)
+    if not base_questions:
+        return []
+    questions = list(base_questions)
+
+    # Add targeted styles for balance (40% mcq, 30% short_answer, 20% exam_style, 10% true_false)
+    styles = ['mcq', 'short_answer', 'exam_style', 'true_false']
+    weights = [0.4, 0.3, 0.2, 0.1]  # Target distribution
+    current_counts = {s: sum(1 for q in base_questions if q["style"] == s) for s in styles}
+    for style, weight in zip(styles, weights):
+        target_count = int((num_questions * weight) / sum(weights))
+        if current_counts[style] < target_count:
+            questions.extend(generate_questions(nano_topic, keywords, num_questions=target_count - current_counts[style], style=style))
+    return questions
+
+
+def _generate_with_retry(task):
+    """Run one task's generator, retrying with jittered backoff when it fails or returns nothing."""
+    for attempt in range(TOPIC_RETRIES):
+        try:
+            questions = task["generate"]()
+            if questions:
+                return questions
+            print(f"No questions returned for {task['name']} (attempt {attempt + 1}/{TOPIC_RETRIES}).")
+        except Exception as e:
+            print(f"Generation failed for {task['name']} (attempt {attempt + 1}/{TOPIC_RETRIES}): {str(e)}")
+        if attempt < TOPIC_RETRIES - 1:
+            time.sleep(random.uniform(0, 2 ** (attempt + 1)))
+    return None
+
+
+def run_parallel_generation(conn, run_key, tasks, max_workers=GENERATION_WORKERS):
+    """Generate questions for many nano-topics concurrently and insert them through one writer.
+
+    Each task is a dict with "key", "name", "nano_topic_id" and a "generate"
+    callable returning a list of questions. Model calls run on worker threads;
+    inserts happen on this thread only.
+    """
+    ledger = GenerationLedger(run_key)
+    pending = [task for task in tasks if not ledger.is_done(task["key"])]
+    print(f"Generating questions for {len(pending)} nano-topics with {max_workers} workers...")
+    writer = QuestionWriter(conn, ledger)
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_generate_with_retry, task): task for task in pending}
+        for future in as_completed(futures):
+            task = futures[future]
+            questions = future.result()
+            if questions is None:
+                failed.append(task["name"])
+                continue
+            added = writer.add(task["key"], task["nano_topic_id"], questions)
+            print(f"Generated {len(questions)} questions for {task['name']} ({len(questions) - added} near-duplicates dropped).")
+    writer.flush()
+
+    if failed:
+        print(f"{len(failed)} nano-topics failed and will be retried on the next run: {', '.join(failed)}")
+    else:
+        ledger.clear()
+    print(f"Inserted {writer.inserted} questions, skipped {writer.duplicates} near-duplicates.")
+    return writer.inserted
+
+def create_database():
+    """Create or upgrade the SQLite schema through the versioned migrations."""
+    conn = get_connection()
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
+
+def _get_or_insert(c, select_sql, select_params, insert_sql, insert_params):
+    """Return the id of an existing row, inserting it first if needed (keeps re-runs idempotent)."""
+    c.execute(select_sql, select_params)
+    row = c.fetchone()
+    if row:
+        return row[0]
+    c.execute(insert_sql, insert_params)
+    return c.lastrowid
 
 def populate_database():
     """Populate SQLite database with curriculum data and generated questions with diverse styles."""
-    conn = sqlite3.connect("data/math.db")
+    conn = get_connection()
     c = conn.cursor()
+    tasks = []
     
     # Insert topics
     for topic in curriculum["topics"]:
-        c.execute("INSERT INTO topics (subject, name, description) VALUES (?, ?, ?)",
-                 (curriculum["subject"], topic["name"], topic["description"]))
-        topic_id = c.lastrowid
+        topic_id = _get_or_insert(
+            c, "SELECT id FROM topics WHERE subject = ? AND name = ?", (curriculum["subject"], topic["name"]),
+            "INSERT INTO topics (subject, name, description) VALUES (?, ?, ?)",
+            (curriculum["subject"], topic["name"], topic["description"]))
         print(f"Inserted topic: {topic['name']} with ID: {topic_id}")
         
         # Insert subtopics
         for subtopic in topic["subtopics"]:
-            c.execute("INSERT INTO subtopics (topic_id, name, description) VALUES (?, ?, ?)",
-                     (topic_id, subtopic["name"], subtopic["description"]))
-            subtopic_id = c.lastrowid
+            subtopic_id = _get_or_insert(
+                c, "SELECT id FROM subtopics WHERE topic_id = ? AND name = ?", (topic_id, subtopic["name"]),
+                "INSERT INTO subtopics (topic_id, name, description) VALUES (?, ?, ?)",
+                (topic_id, subtopic["name"], subtopic["description"]))
             print(f"Inserted subtopic: {subtopic['name']} with ID: {subtopic_id}")
             
             # Insert micro-topics
             for micro in subtopic["micro_topics"]:
-                c.execute("INSERT INTO micro_topics (subtopic_id, name, description) VALUES (?, ?, ?)",
-                         (subtopic_id, micro["name"], micro["description"]))
-                micro_id = c.lastrowid
+                micro_id = _get_or_insert(
+                    c, "SELECT id FROM micro_topics WHERE subtopic_id = ? AND name = ?", (subtopic_id, micro["name"]),
+                    "INSERT INTO micro_topics (subtopic_id, name, description) VALUES (?, ?, ?)",
+                    (subtopic_id, micro["name"], micro["description"]))
                 print(f"Inserted micro-topic: {micro['name']} with ID: {micro_id}")
                 
-                # Insert nano-topics and questions
+                # Insert nano-topics; their questions are generated in parallel below
                 for nano in micro["nano_topics"]:
-                    c.execute("INSERT INTO nano_topics (micro_topic_id, name, keywords) VALUES (?, ?, ?)",
-                             (micro_id, nano["name"], ",".join(nano["keywords"])))
-                    nano_id = c.lastrowid
+                    nano_id = _get_or_insert(
+                        c, "SELECT id FROM nano_topics WHERE micro_topic_id = ? AND name = ?", (micro_id, nano["name"]),
+                        "INSERT INTO nano_topics (micro_topic_id, name, keywords) VALUES (?, ?, ?)",
+                        (micro_id, nano["name"], ",".join(nano["keywords"])))
                     print(f"Inserted nano-topic: {nano['name']} with ID: {nano_id}")
-                    
-                    # Generate initial set with diverse styles
-                    base_questions = generate_questions(nano["name"], nano["keywords"], num_questions=10)
-                    for q in base_questions:
-                        c.execute("INSERT INTO questions (nano_topic_id, question, options, answer, difficulty, style) VALUES (?, ?, ?, ?, ?, ?)",
-                                 (nano_id, q["question"], json.dumps(q["options"]), q["answer"], q["difficulty"], q["style"]))
-                    
-                    # Add targeted styles for balance (40% mcq, 30% short_answer, 20% exam_style, 10% true_false)
-                    total_questions = 10  # Initial set
-                    styles = ['mcq', 'short_answer', 'exam_style', 'true_false']
-                    weights = [0.4, 0.3, 0.2, 0.1]  # Target distribution
-                    current_counts = {s: sum(1 for q in base_questions if q["style"] == s) for s in styles}
-                    for style, weight in zip(styles, weights):
-                        target_count = int((total_questions * weight) / sum(weights))
-                        if current_counts[style] < target_count:
-                            additional = generate_questions(nano["name"], nano["keywords"], num_questions=target_count - current_counts[style], style=style)
-                            for q in additional:
-                                c.execute("INSERT INTO questions (nano_topic_id, question, options, answer, difficulty, style) VALUES (?, ?, ?, ?, ?, ?)",
-                                         (nano_id, q["question"], json.dumps(q["options"]), q["answer"], q["difficulty"], q["style"]))
-
+                    tasks.append({
+                        "key": str(nano_id),
+                        "name": nano["name"],
+                        "nano_topic_id": nano_id,
+                        "generate": lambda nano=nano: generate_balanced_questions(nano["name"], nano["keywords"], num_questions=10)
+                    })
+    
+    # The curriculum structure is committed before generation starts, so a
+    # resumed run finds the same nano-topic IDs
     conn.commit()
+    run_parallel_generation(conn, "populate", tasks)
     conn.close()
 
 def add_questions_to_nano_skills(nano_skills=None, num_questions=6, difficulty=None, style=None):
     """Add questions to specified nano-skills or all if none specified."""
-    conn = sqlite3.connect("data/math.db")
+    conn = get_connection()
     c = conn.cursor()
     
     # Fetch existing nano-topics to determine which to add questions for
-    c.execute("SELECT name FROM nano_topics")
-    all_nano_topics = [row[0] for row in c.fetchall()]
+    c.execute("SELECT id, name, keywords FROM nano_topics")
+    all_nano_topics = c.fetchall()
     if not all_nano_topics:
         print("No nano-topics found in the database. Please run populate_database first.")
+        conn.close()
         return
-    target_nano_topics = all_nano_topics if nano_skills is None else [n for n in nano_skills if n in all_nano_topics]
+    target_nano_topics = all_nano_topics if nano_skills is None else [n for n in all_nano_topics if n[1] in nano_skills]
     
-    for nano_topic in target_nano_topics:
-        # Fetch topic and micro-topic for context
-        c.execute("""
-            SELECT t.name, m.name FROM nano_topics n
-            JOIN micro_topics m ON n.micro_topic_id = m.id
-            JOIN subtopics s ON m.subtopic_id = s.id
-            JOIN topics t ON s.topic_id = t.id
-            WHERE n.name = ?
-        """, (nano_topic,))
-        topic, micro_topic = c.fetchone()
-        
-        # Generate questions with specified or diverse difficulties and styles
-        try:
-            keywords = load_nano_topics(topic)[all_nano_topics.index(nano_topic)]["keywords"]
-        except IndexError:
-            print(f"Error: Nano-topic {nano_topic} not found in loaded nano-topics. Skipping.")
-            continue
-        questions = generate_questions(nano_topic, keywords, num_questions, difficulty, style)
-        for q in questions:
-            c.execute("""
-                INSERT INTO questions (nano_topic_id, question, options, answer, difficulty, style)
-                VALUES ((SELECT id FROM nano_topics WHERE name = ?), ?, ?, ?, ?, ?)
-            """, (nano_topic, q["question"], json.dumps(q["options"]), q["answer"], q["difficulty"], q["style"]))
-
-    conn.commit()
+    # Generate questions with specified or diverse difficulties and styles
+    tasks = []
+    for nano_id, nano_topic, keywords in target_nano_topics:
+        keywords = keywords.split(",") if keywords else []
+        tasks.append({
+            "key": str(nano_id),
+            "name": nano_topic,
+            "nano_topic_id": nano_id,
+            "generate": lambda nano_topic=nano_topic, keywords=keywords: generate_questions(nano_topic, keywords, num_questions, difficulty, style)
+        })
+    
+    run_key = f"add:{num_questions}:{difficulty}:{style}:{','.join(sorted(nano_skills)) if nano_skills else '*'}"
+    run_parallel_generation(conn, run_key, tasks)
     conn.close()
     print(f"Added {num_questions} questions per specified nano-topic to the database.")
 
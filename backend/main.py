@@ -1,31 +1,48 @@
 # FILE: main.py
 
-from fastapi import FastAPI, HTTPException, Depends, status, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, status, BackgroundTasks, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 import sqlite3
 import json
+import asyncio
 import hashlib
 import secrets
 from datetime import datetime, timedelta
 import os
 import sys
-import pandas as pd
 # DATABASE_PATH = os.path.join(os.path.dirname(__file__), "data", "math.db")
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 # Add the src directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.auth.auth import hash_password, init_db
-from src.quiz.data import load_nano_topics, get_questions, get_unanswered_questions
-from src.quiz.bkt import BKT, select_next_module
-from src.quiz.openai_client import (
-    generate_question, generate_explanation, generate_hint, 
-    generate_mini_lesson, generate_parent_report, generate_actionable_steps
+from src.quiz.data import load_nano_topics, get_questions, get_unanswered_questions, get_next_question
+from src.quiz.bkt import select_next_topic
+from src.quiz.mastery import record_answer, rebuild_mastery
+from src.quiz.analytics import record_result_rollup, rebuild_rollups, get_class_analytics as read_class_analytics
+from src.quiz.analytics import (
+    aggregate_student_results, merge_student_aggregates, build_student_analytics,
+    load_analytics_snapshot, write_analytics_snapshot, snapshot_student_analytics,
+    run_snapshot_job, SNAPSHOT_JOB_ENABLED
 )
-from src.supervisor.supervisor import run_full_database_check
+from src.quiz.curriculum import curriculum_snapshot, etag_matches
+from src.quiz.assignment_questions import assignment_question_cache, sample_assignment_questions
+from src.quiz.async_openai_client import (
+    generate_hint_async, generate_mini_lesson_async,
+    close_async_client
+)
+from src.quiz.parent_reports import (
+    load_stored_reports, generate_reports, precompute_weekly_reports,
+    run_report_job, REPORT_JOB_ENABLED
+)
+from src.quiz.llm_cache import llm_cache
+from src.quiz.explanations import explanation_service
+from src.auth.token_cache import token_cache
+from src.db.pool import get_connection, get_db, get_pool, close_all_pools
+from config import settings
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -46,13 +63,29 @@ app.add_middleware(
 # Security
 security = HTTPBearer()
 
-# Database path
-DATABASE_PATH = os.path.join("data", "math.db")
+# Background task that precomputes the weekly parent reports
+report_job_task = None
+# Background task that refreshes the per-student analytics snapshots
+snapshot_job_task = None
 
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
+    global report_job_task, snapshot_job_task
     init_db()
+    if REPORT_JOB_ENABLED:
+        report_job_task = asyncio.create_task(run_report_job())
+    if SNAPSHOT_JOB_ENABLED:
+        snapshot_job_task = asyncio.create_task(run_snapshot_job())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if report_job_task is not None:
+        report_job_task.cancel()
+    if snapshot_job_task is not None:
+        snapshot_job_task.cancel()
+    close_all_pools()
+    await close_async_client()
 
 # Pydantic models
 class UserCreate(BaseModel):
@@ -94,6 +127,8 @@ class QuestionAnswer(BaseModel):
     question: str
     answer: str
     nano_topic: str
+    question_id: Optional[int] = None
+    custom_question_id: Optional[int] = None
     hint_used: bool = False
     lesson_viewed: bool = False
 
@@ -116,8 +151,8 @@ class AnnouncementCreate(BaseModel):
 
 # Utility functions
 def get_db_connection():
-    """Get database connection"""
-    return sqlite3.connect(DATABASE_PATH)
+    """Get a pooled database connection (close() returns it to the pool)"""
+    return get_connection()
 
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Verify JWT token (simplified for this example)"""
@@ -129,8 +164,12 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     return token
 
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current user from a token"""
+    """Get current user from a token (served from the token cache when possible)"""
     token = credentials.credentials
+    cached_user = token_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    
     conn = get_db_connection()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
@@ -156,12 +195,14 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
         
-    return {
+    current_user = {
         "id": user["id"],
         "username": user["username"],
         "role": user["role"],
         "link_code": user["link_code"]
     }
+    token_cache.set(token, current_user, token_data["expires_at"])
+    return current_user
 
 # Authentication endpoints
 @app.post("/auth/register")
@@ -227,6 +268,20 @@ async def login(user: UserLogin):
         "link_code": db_user["link_code"]
     }
 
+@app.post("/auth/logout")
+async def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Revoke the current token"""
+    token = credentials.credentials
+    conn = get_db_connection()
+    try:
+        conn.execute("DELETE FROM auth_tokens WHERE token = ?", (token,))
+        token_cache.invalidate_token(token, conn)
+        conn.commit()
+    finally:
+        conn.close()
+    
+    return {"message": "Logged out successfully"}
+
 # In main.py, add this new endpoint
 
 @app.get("/auth/me")
@@ -295,11 +350,20 @@ async def get_topic_questions(nano_topic: str, current_user: dict = Depends(get_
         questions = get_questions(nano_topic)
     return {"questions": questions}
 
+@app.get("/quiz/next-question")
+async def get_next_question_for_student(subject: str, micro_topic: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    """Get one adaptive question: weakest topic first, difficulty matched to mastery, unanswered only"""
+    if current_user["role"] != "student":
+        raise HTTPException(status_code=403, detail="Only students can get adaptive questions")
+    
+    question = get_next_question(current_user["id"], subject, micro_topic)
+    return {"question": question}
+
 
 # In main.py, replace the ENTIRE submit_answer function with this one:
 
 @app.get("/quiz/hint")
-async def get_hint(question: str, nano_topic: str, assignment_id: Optional[int] = None, current_user: dict = Depends(get_current_user)):
+async def get_hint(question: str, nano_topic: str, assignment_id: Optional[int] = None, question_id: Optional[int] = None, current_user: dict = Depends(get_current_user)):
     """Get hint for a question (handles both regular and custom questions)"""
     conn = get_db_connection()
     c = conn.cursor()
@@ -311,33 +375,44 @@ async def get_hint(question: str, nano_topic: str, assignment_id: Optional[int]
         
         if assignment and assignment[0]:  # Has custom questions
             # For custom questions, generate a generic hint since we don't store hints
-            hint = generate_hint(question, [], "See the answer choices for clues", nano_topic)
             conn.close()
+            hint = await generate_hint_async(question, [], "See the answer choices for clues", nano_topic)
             return {"hint": hint}
     
-    # Regular question logic
-    c.execute("""
-        SELECT options, answer FROM questions q
-        JOIN nano_topics n ON q.nano_topic_id = n.id
-        WHERE q.question = ? AND n.name = ? AND q.is_approved = 1
-    """, (question, nano_topic))
+    # Regular question logic (with the pre-generated hint, if any)
+    if question_id is not None:
+        c.execute("""
+            SELECT q.options, q.answer, qc.hint FROM questions q
+            LEFT JOIN question_content qc ON qc.question_id = q.id
+            WHERE q.id = ? AND q.is_approved = 1
+        """, (question_id,))
+    else:
+        c.execute("""
+            SELECT q.options, q.answer, qc.hint FROM questions q
+            JOIN nano_topics n ON q.nano_topic_id = n.id
+            LEFT JOIN question_content qc ON qc.question_id = q.id
+            WHERE q.question = ? AND n.name = ? AND q.is_approved = 1
+        """, (question, nano_topic))
     
     result = c.fetchone()
     conn.close()
     
     if not result:
         # Fallback for custom questions or missing questions
-        hint = generate_hint(question, [], "Think about the key concepts involved", nano_topic)
+        hint = await generate_hint_async(question, [], "Think about the key concepts involved", nano_topic)
         return {"hint": hint}
     
+    if result[2]:
+        return {"hint": result[2]}
+    
     options = json.loads(result[0]) if result[0] else []
     answer = result[1]
     
-    hint = generate_hint(question, options, answer, nano_topic)
+    hint = await generate_hint_async(question, options, answer, nano_topic)
     return {"hint": hint}
 
 @app.get("/quiz/lesson")
-async def get_mini_lesson(question: str, nano_topic: str, assignment_id: Optional[int] = None, current_user: dict = Depends(get_current_user)):
+async def get_mini_lesson(question: str, nano_topic: str, assignment_id: Optional[int] = None, question_id: Optional[int] = None, current_user: dict = Depends(get_current_user)):
     """Get mini lesson for a topic (handles both regular and custom questions)"""
     conn = get_db_connection()
     c = conn.cursor()
@@ -349,28 +424,90 @@ async def get_mini_lesson(question: str, nano_topic: str, assignment_id: Optiona
         
         if assignment and assignment[0]:  # Has custom questions
             # For custom questions, generate a generic lesson
-            lesson = generate_mini_lesson(nano_topic, question, "General explanation")
             conn.close()
+            lesson = await generate_mini_lesson_async(nano_topic, question, "General explanation")
             return {"lesson": lesson}
     
-    # Regular question logic
-    c.execute("""
-        SELECT answer FROM questions q
-        JOIN nano_topics n ON q.nano_topic_id = n.id
-        WHERE q.question = ? AND n.name = ? AND q.is_approved = 1
-    """, (question, nano_topic))
+    # Regular question logic (with the pre-generated lesson, if any)
+    if question_id is not None:
+        c.execute("""
+            SELECT q.answer, qc.lesson FROM questions q
+            LEFT JOIN question_content qc ON qc.question_id = q.id
+            WHERE q.id = ? AND q.is_approved = 1
+        """, (question_id,))
+    else:
+        c.execute("""
+            SELECT q.answer, qc.lesson FROM questions q
+            JOIN nano_topics n ON q.nano_topic_id = n.id
+            LEFT JOIN question_content qc ON qc.question_id = q.id
+            WHERE q.question = ? AND n.name = ? AND q.is_approved = 1
+        """, (question, nano_topic))
     
     result = c.fetchone()
     conn.close()
     
     if not result:
         # Fallback for custom questions
-        lesson = generate_mini_lesson(nano_topic, question, "General explanation")
+        lesson = await generate_mini_lesson_async(nano_topic, question, "General explanation")
         return {"lesson": lesson}
     
-    lesson = generate_mini_lesson(nano_topic, question, result[0])
+    if result[1]:
+        return {"lesson": result[1]}
+    
+    lesson = await generate_mini_lesson_async(nano_topic, question, result[0])
     return {"lesson": lesson}
 
+def _find_question_by_text(c, answer_data, assignment_id):
+    """Resolve a submitted answer by question text; returns (correct_answer, nano_topic_id, question_id)"""
+    # First, try to find the question in regular questions table
+    nano_topic_result = c.execute("SELECT id FROM nano_topics WHERE name = ?", (answer_data.nano_topic,)).fetchone()
+    
+    correct_answer = None
+    nano_topic_id = None
+    question_id = None
+    
+    if nano_topic_result:
+        nano_topic_id = nano_topic_result["id"]
+        
+        # Try regular questions first
+        question_result = c.execute(
+            "SELECT id, answer FROM questions WHERE nano_topic_id = ? AND question = ? AND is_approved = 1",
+            (nano_topic_id, answer_data.question)
+        ).fetchone()
+        
+        if question_result:
+            question_id = question_result["id"]
+            correct_answer = question_result["answer"]
+        else:
+            # Try custom questions if assignment_id is provided
+            if assignment_id:
+                custom_question_result = c.execute("""
+                    SELECT tcq.correct_answer 
+                    FROM teacher_custom_questions tcq
+                    WHERE tcq.question_text = ? AND tcq.nano_topic_id = ?
+                """, (answer_data.question, nano_topic_id)).fetchone()
+                
+                if custom_question_result:
+                    correct_answer = custom_question_result["correct_answer"]
+    
+    if not correct_answer:
+        # If we still can't find it, try to find any custom question with this text
+        custom_result = c.execute(
+            "SELECT correct_answer FROM teacher_custom_questions WHERE question_text = ?",
+            (answer_data.question,)
+        ).fetchone()
+        
+        if custom_result:
+            correct_answer = custom_result["correct_answer"]
+            # Use a default nano_topic_id or create one for custom questions
+            if not nano_topic_result:
+                nano_topic_id = 1  # Default fallback
+        else:
+            print("--- DEBUG: FAILED - Question not found in any table ---")
+            raise HTTPException(status_code=404, detail="Question not found")
+    
+    return correct_answer, nano_topic_id, question_id
+
 @app.post("/quiz/submit-answer")
 async def submit_answer(answer_data: QuestionAnswer, assignment_id: Optional[int] = None, current_user: dict = Depends(get_current_user)):
     """Submit answer and update BKT model (handles both regular and custom questions)"""
@@ -385,74 +522,53 @@ async def submit_answer(answer_data: QuestionAnswer, assignment_id: Optional[int
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
 
-        # First, try to find the question in regular questions table
-        nano_topic_result = c.execute("SELECT id FROM nano_topics WHERE name = ?", (answer_data.nano_topic,)).fetchone()
-        
         correct_answer = None
         is_correct = False
+        question_id = None
         
-        if nano_topic_result:
-            nano_topic_id = nano_topic_result["id"]
-            
-            # Try regular questions first
+        if answer_data.question_id is not None:
+            # Regular question referenced by ID
             question_result = c.execute(
-                "SELECT answer FROM questions WHERE nano_topic_id = ? AND question = ? AND is_approved = 1",
-                (nano_topic_id, answer_data.question)
+                "SELECT answer, nano_topic_id FROM questions WHERE id = ? AND is_approved = 1",
+                (answer_data.question_id,)
             ).fetchone()
-            
-            if question_result:
-                correct_answer = question_result["answer"]
-            else:
-                # Try custom questions if assignment_id is provided
-                if assignment_id:
-                    custom_question_result = c.execute("""
-                        SELECT tcq.correct_answer 
-                        FROM teacher_custom_questions tcq
-                        WHERE tcq.question_text = ? AND tcq.nano_topic_id = ?
-                    """, (answer_data.question, nano_topic_id)).fetchone()
-                    
-                    if custom_question_result:
-                        correct_answer = custom_question_result["correct_answer"]
-        
-        if not correct_answer:
-            # If we still can't find it, try to find any custom question with this text
+            if not question_result:
+                raise HTTPException(status_code=404, detail="Question not found")
+            question_id = answer_data.question_id
+            correct_answer = question_result["answer"]
+            nano_topic_id = question_result["nano_topic_id"]
+        elif answer_data.custom_question_id is not None:
+            # Teacher custom question referenced by ID
             custom_result = c.execute(
-                "SELECT correct_answer FROM teacher_custom_questions WHERE question_text = ?",
-                (answer_data.question,)
+                "SELECT correct_answer, nano_topic_id FROM teacher_custom_questions WHERE id = ?",
+                (answer_data.custom_question_id,)
             ).fetchone()
-            
-            if custom_result:
-                correct_answer = custom_result["correct_answer"]
-                # Use a default nano_topic_id or create one for custom questions
-                if not nano_topic_result:
-                    nano_topic_id = 1  # Default fallback
-            else:
-                print("--- DEBUG: FAILED - Question not found in any table ---")
+            if not custom_result:
                 raise HTTPException(status_code=404, detail="Question not found")
+            correct_answer = custom_result["correct_answer"]
+            nano_topic_id = custom_result["nano_topic_id"] or 1  # Default fallback
+        else:
+            # Older clients only send the question text
+            correct_answer, nano_topic_id, question_id = _find_question_by_text(c, answer_data, assignment_id)
 
         is_correct = answer_data.answer.strip().lower() == correct_answer.strip().lower()
         print(f"--- DEBUG: User's answer is_correct: {is_correct} ---")
 
-        # Update BKT model
-        bkt = BKT()
-        last_result = c.execute(
-            "SELECT p_learned FROM student_results WHERE student_id = ? AND nano_topic_id = ? ORDER BY timestamp DESC LIMIT 1",
-            (current_user["id"], nano_topic_id)
-        ).fetchone()
-        
-        if last_result:
-            bkt.p_learned = last_result["p_learned"]
-
-        new_p_learned = bkt.update(is_correct)
+        # Update BKT model from the student's mastery row (same transaction as the result insert)
+        new_p_learned = record_answer(conn, current_user["id"], nano_topic_id, is_correct)
+        record_result_rollup(conn, current_user["id"], nano_topic_id, is_correct, new_p_learned)
 
         # Save result
         c.execute("""
             INSERT INTO student_results 
-            (student_id, nano_topic_id, question, is_correct, p_learned, hint_used, lesson_viewed, attempt_completed)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (current_user["id"], nano_topic_id, answer_data.question, is_correct, new_p_learned, 
+            (student_id, nano_topic_id, question, question_id, is_correct, p_learned, hint_used, lesson_viewed, attempt_completed)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (current_user["id"], nano_topic_id, answer_data.question, question_id, is_correct, new_p_learned, 
               answer_data.hint_used, answer_data.lesson_viewed, True))
         conn.commit()
+        # Hand the connection back before awaiting the LLM
+        conn.close()
+        conn = None
 
         response = {
             "is_correct": is_correct,
@@ -461,11 +577,21 @@ async def submit_answer(answer_data: QuestionAnswer, assignment_id: Optional[int
         }
 
         if not is_correct:
-            try:
-                explanation = generate_explanation(answer_data.question, answer_data.answer, correct_answer)
-                response["explanation"] = explanation
-            except Exception as e:
-                response["explanation"] = "Sorry, an explanation could not be generated at this time."
+            # The explanation is generated in the background; the client
+            # fetches it from /quiz/explanation/{ticket}.
+            if not answer_data.answer or not answer_data.answer.strip():
+                response["explanation"] = "Invalid input provided."
+            else:
+                ticket = await explanation_service.submit(
+                    current_user["id"], answer_data.question, answer_data.answer, correct_answer
+                )
+                response["explanation_ticket"] = ticket
+                if ticket is None:
+                    response["explanation"] = "Sorry, an explanation could not be generated at this time."
+                else:
+                    ready = await explanation_service.get(ticket)
+                    if ready and ready["status"] != "pending":
+                        response["explanation"] = ready["explanation"]
         
         return response
 
@@ -480,6 +606,17 @@ async def submit_answer(answer_data: QuestionAnswer, assignment_id: Optional[int
         if conn:
             conn.close()
 
+@app.get("/quiz/explanation/{ticket}")
+async def get_explanation(ticket: str, wait: float = 0, current_user: dict = Depends(get_current_user)):
+    """Fetch a wrong-answer explanation by ticket, optionally long-polling up to `wait` seconds"""
+    if current_user["role"] != "student":
+        raise HTTPException(status_code=403, detail="Only students can fetch explanations")
+    
+    result = await explanation_service.wait(ticket, min(max(wait, 0), 30))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Explanation ticket not found")
+    
+    return {"ticket": ticket, **result}
 
 @app.get("/quiz/next-topic")
 async def get_next_topic(current_user: dict = Depends(get_current_user)):
@@ -490,20 +627,14 @@ async def get_next_topic(current_user: dict = Depends(get_current_user)):
     conn = get_db_connection()
     c = conn.cursor()
     
-    # Get latest p_learned for each nano topic
+    # Latest p_learned for each nano topic, one row per topic
     c.execute("""
-        SELECT n.name, sr.p_learned
-        FROM (
-            SELECT nano_topic_id, MAX(timestamp) as latest_timestamp
-            FROM student_results
-            WHERE student_id = ?
-            GROUP BY nano_topic_id
-        ) latest
-        JOIN student_results sr ON sr.nano_topic_id = latest.nano_topic_id 
-                                AND sr.timestamp = latest.latest_timestamp
-                                AND sr.student_id = ?
-        JOIN nano_topics n ON n.id = sr.nano_topic_id
-    """, (current_user["id"], current_user["id"]))
+        SELECT n.name, m.p_learned
+        FROM student_mastery m
+        JOIN nano_topics n ON n.id = m.nano_topic_id
+        WHERE m.student_id = ?
+        ORDER BY m.nano_topic_id
+    """, (current_user["id"],))
     
     results = c.fetchall()
     conn.close()
@@ -513,14 +644,8 @@ async def get_next_topic(current_user: dict = Depends(get_current_user)):
         topics = load_nano_topics("Numbers and the Number System")
         return {"next_topic": topics[0]["name"] if topics else None}
     
-    # Create BKT dictionary
-    bkt_dict = {}
-    for topic_name, p_learned in results:
-        bkt = BKT()
-        bkt.p_learned = p_learned
-        bkt_dict[topic_name] = bkt
-    
-    next_topic = select_next_module(bkt_dict)
+    topic_names = [row[0] for row in results]
+    next_topic = select_next_topic(topic_names, [row[1] for row in results])
     return {"next_topic": next_topic}
 
 # Teacher/Class Management endpoints
@@ -640,6 +765,80 @@ async def get_my_classes(current_user: dict = Depends(get_current_user)):
     return {"classes": classes}
 
 
+@app.get("/students/me/assignments")
+async def get_my_assignments(
+    page: int = 1,
+    page_size: int = settings.DEFAULT_PAGE_SIZE,
+    status_filter: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get the student's assignments across all their classes, with attempt counts.
+    Replaces one /classes/my-classes call plus a call per class and per assignment.
+    - status_filter="incomplete": assignments with no completed attempt
+    - status_filter="open": attempts left and not past the due date
+    """
+    if current_user["role"] != "student":
+        raise HTTPException(status_code=403, detail="Only students can view their assignments")
+    if status_filter not in (None, "incomplete", "open"):
+        raise HTTPException(status_code=400, detail="status_filter must be 'incomplete' or 'open'")
+    
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), settings.MAX_PAGE_SIZE)
+    having = ""
+    params = [current_user["id"]]
+    if status_filter == "incomplete":
+        having = "HAVING COUNT(asub.completed_at) = 0"
+    elif status_filter == "open":
+        having = "HAVING COUNT(asub.id) < a.max_attempts AND (a.due_date IS NULL OR a.due_date >= ?)"
+        params.append(datetime.now().isoformat())
+    params.extend([page_size, (page - 1) * page_size])
+    
+    conn = get_db_connection()
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    try:
+        c.execute(f"""
+            SELECT a.id, a.title, a.description, a.due_date, a.min_questions, a.max_attempts,
+                   a.show_hints, a.show_lessons, a.micro_topic_id, a.nano_topic_ids, a.created_at,
+                   c.id AS class_id, c.name AS class_name, u.username AS teacher_name,
+                   COUNT(asub.id) AS attempts,
+                   COUNT(asub.completed_at) AS completed_attempts,
+                   MAX(CASE WHEN asub.completed_at IS NOT NULL THEN asub.score END) AS best_score,
+                   COUNT(*) OVER () AS total
+            FROM student_classes sc
+            JOIN classes c ON c.id = sc.class_id
+            JOIN assignments a ON a.class_id = c.id
+            LEFT JOIN users u ON u.id = c.teacher_id
+            LEFT JOIN assignment_submissions asub
+                   ON asub.assignment_id = a.id AND asub.student_id = sc.student_id
+            WHERE sc.student_id = ?
+            GROUP BY a.id
+            {having}
+            ORDER BY a.created_at DESC, a.id DESC
+            LIMIT ? OFFSET ?
+        """, params)
+        rows = c.fetchall()
+    finally:
+        conn.close()
+    
+    assignments = []
+    for row in rows:
+        assignment = dict(row)
+        assignment.pop("total")
+        assignment["nano_topic_ids"] = json.loads(row["nano_topic_ids"]) if row["nano_topic_ids"] else None
+        assignment["has_incomplete"] = row["attempts"] > row["completed_attempts"]
+        assignments.append(assignment)
+    
+    total = rows[0]["total"] if rows else 0
+    return {
+        "assignments": assignments,
+        "page": page,
+        "page_size": page_size,
+        "total": total,
+        "has_more": page * page_size < total
+    }
+
 @app.post("/assignments/create")
 async def create_assignment(assignment: AssignmentCreate, current_user: dict = Depends(get_current_user)):
     """Create a new assignment"""
@@ -835,58 +1034,13 @@ async def get_parent_report(current_user: dict = Depends(get_current_user)):
     """, (current_user["id"],))
     
     students = c.fetchall()
-    reports = []
-    
-    for student_id, student_name in students:
-        # Get student progress
-        c.execute("""
-            SELECT 
-                n.name,
-                sr.is_correct,
-                sr.p_learned,
-                sr.timestamp
-            FROM student_results sr
-            JOIN nano_topics n ON sr.nano_topic_id = n.id
-            WHERE sr.student_id = ? AND sr.timestamp >= date('now', '-7 days')
-            ORDER BY sr.timestamp DESC
-        """, (student_id,))
-        
-        recent_results = c.fetchall()
-        
-        # Analyze strengths and weaknesses
-        topic_performance = {}
-        for topic, is_correct, p_learned, timestamp in recent_results:
-            if topic not in topic_performance:
-                topic_performance[topic] = {"correct": 0, "total": 0, "mastery": p_learned}
-            topic_performance[topic]["total"] += 1
-            if is_correct:
-                topic_performance[topic]["correct"] += 1
-        
-        strengths = [topic for topic, perf in topic_performance.items() 
-                    if perf["correct"] / perf["total"] >= 0.8]
-        weaknesses = [{"topic": topic, "mastery": perf["mastery"]} 
-                     for topic, perf in topic_performance.items() 
-                     if perf["correct"] / perf["total"] < 0.6]
-        
-        # Generate actionable steps for weak topics
-        actionable_steps = []
-        for weakness in weaknesses[:3]:  # Top 3 weaknesses
-            steps = generate_actionable_steps(weakness["topic"], weakness["mastery"])
-            actionable_steps.append({
-                "topic": weakness["topic"],
-                "steps": steps
-            })
-        
-        reports.append({
-            "student_name": student_name,
-            "strengths": strengths,
-            "weaknesses": [w["topic"] for w in weaknesses],
-            "actionable_steps": actionable_steps,
-            "total_questions": len(recent_results),
-            "accuracy": sum(1 for _, is_correct, _, _ in recent_results if is_correct) / len(recent_results) * 100 if recent_results else 0
-        })
-    
+    # Reports precomputed by the weekly job (or a recent request) are served as stored
+    stored = load_stored_reports(conn, [student_id for student_id, _ in students])
     conn.close()
+    
+    # Anything missing or stale is generated now, with all LLM calls in flight together
+    fresh = await generate_reports([s for s in students if s[0] not in stored])
+    reports = [stored.get(student_id) or fresh[student_id] for student_id, _ in students]
     return {"reports": reports}
 
 # Feedback endpoints
@@ -910,14 +1064,135 @@ async def submit_feedback(feedback: FeedbackCreate, current_user: dict = Depends
 
 # Admin endpoints
 @app.post("/admin/run-supervisor")
-async def run_supervisor(background_tasks: BackgroundTasks, current_user: dict = Depends(get_current_user)):
-    """Run the supervisor AI to validate questions"""
+async def run_supervisor(background_tasks: BackgroundTasks, full: bool = False, current_user: dict = Depends(get_current_user)):
+    """Run the supervisor AI to validate new or changed questions (all questions with full=true)"""
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can run supervisor")
     
-    background_tasks.add_task(run_full_database_check)
+    # Imported on first use to keep worker start-up light
+    from src.supervisor.supervisor import run_full_database_check
+    background_tasks.add_task(run_full_database_check, full=full)
     return {"message": "Supervisor validation started in background"}
 
+@app.post("/admin/pregenerate-content")
+async def pregenerate_content(background_tasks: BackgroundTasks, current_user: dict = Depends(get_current_user)):
+    """Pre-generate hints and mini-lessons for approved questions"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can run content pre-generation")
+    
+    from src.supervisor.supervisor import run_content_pregeneration
+    background_tasks.add_task(run_content_pregeneration)
+    return {"message": "Hint and lesson pre-generation started in background"}
+
+@app.post("/admin/rebuild-mastery")
+async def rebuild_student_mastery(student_id: Optional[int] = None, current_user: dict = Depends(get_current_user)):
+    """Recompute the student_mastery table from student_results (one student or everyone)"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can rebuild mastery")
+    
+    def rebuild():
+        conn = get_db_connection()
+        try:
+            rows = rebuild_mastery(conn, student_id)
+            conn.commit()
+        finally:
+            conn.close()
+        return rows
+    
+    # The rebuild is synchronous; keep it off the event loop
+    loop = asyncio.get_running_loop()
+    rows = await loop.run_in_executor(None, rebuild)
+    return {"message": "Mastery rebuilt", "rows": rows}
+
+@app.post("/admin/precompute-parent-reports")
+async def precompute_parent_reports(background_tasks: BackgroundTasks, current_user: dict = Depends(get_current_user)):
+    """Regenerate every stored weekly parent report now instead of waiting for the scheduled job"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can precompute reports")
+    
+    background_tasks.add_task(precompute_weekly_reports, force=True)
+    return {"message": "Parent report precomputation started"}
+
+@app.post("/admin/rebuild-analytics")
+async def rebuild_analytics_rollups(student_id: Optional[int] = None, current_user: dict = Depends(get_current_user)):
+    """Recompute the daily analytics rollups from student_results (one student or everyone)"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can rebuild analytics")
+    
+    def rebuild():
+        conn = get_db_connection()
+        try:
+            rows = rebuild_rollups(conn, student_id)
+            conn.commit()
+        finally:
+            conn.close()
+        return rows
+    
+    # The rebuild is synchronous; keep it off the event loop
+    loop = asyncio.get_running_loop()
+    rows = await loop.run_in_executor(None, rebuild)
+    return {"message": "Analytics rebuilt", "rows": rows}
+
+@app.post("/admin/snapshot-analytics")
+async def refresh_analytics_snapshots(full: bool = False, current_user: dict = Depends(get_current_user)):
+    """Refresh the per-student analytics snapshots now; full=true recomputes them from student_results"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can refresh analytics snapshots")
+    
+    # The pass is synchronous; keep it off the event loop
+    loop = asyncio.get_running_loop()
+    students = await loop.run_in_executor(None, snapshot_student_analytics, full)
+    return {"message": "Analytics snapshots refreshed", "students": students}
+
+@app.get("/admin/db-stats")
+async def get_db_stats(current_user: dict = Depends(get_current_user)):
+    """Get connection pool hit/miss and wait-time counters"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view database stats")
+    
+    return {"pool": get_pool().stats()}
+
+@app.get("/admin/auth-cache")
+async def get_auth_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Get hit-rate counters for the token/user cache"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view cache stats")
+    
+    return {"cache": token_cache.stats()}
+
+@app.get("/admin/llm-cache")
+async def get_llm_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Get hit/miss counters for the hint, lesson and explanation cache"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view cache stats")
+    
+    return {"cache": llm_cache.stats()}
+
+@app.get("/admin/curriculum-cache")
+async def get_curriculum_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Get the version and hit/rebuild counters of the curriculum structure snapshot"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view cache stats")
+    
+    return {"cache": curriculum_snapshot.stats()}
+
+@app.get("/admin/assignment-question-cache")
+async def get_assignment_question_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Get hit/miss counters for the resolved assignment question sets"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view cache stats")
+    
+    return {"cache": assignment_question_cache.stats()}
+
+@app.delete("/admin/llm-cache")
+async def invalidate_llm_cache(kind: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    """Invalidate cached generations, optionally only one kind (hint, lesson, explanation, actionable_steps)"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can invalidate the cache")
+    
+    removed = llm_cache.invalidate(kind=kind)
+    return {"message": "Cache invalidated", "removed": removed}
+
 @app.get("/admin/question-stats")
 async def get_question_stats(current_user: dict = Depends(get_current_user)):
     """Get question validation statistics"""
@@ -1317,77 +1592,16 @@ async def get_assignment_submissions(assignment_id: int, current_user: dict = De
 
 # Additional utility endpoints
 @app.get("/topics/structure")
-async def get_curriculum_structure():
+async def get_curriculum_structure(
+    if_none_match: Optional[str] = Header(None),
+    conn: sqlite3.Connection = Depends(get_db)
+):
     """Get the complete curriculum structure"""
-    conn = get_db_connection()
-    c = conn.cursor()
-    
-    c.execute("""
-        SELECT t.id, t.name, t.description,
-               s.id, s.name, s.description,
-               m.id, m.name, m.description,
-               n.id, n.name, n.keywords
-        FROM topics t
-        LEFT JOIN subtopics s ON t.id = s.topic_id
-        LEFT JOIN micro_topics m ON s.id = m.subtopic_id
-        LEFT JOIN nano_topics n ON m.id = n.micro_topic_id
-        ORDER BY t.id, s.id, m.id, n.id
-    """)
-    
-    results = c.fetchall()
-    conn.close()
-    
-    # Structure the data
-    curriculum = {}
-    
-    for row in results:
-        topic_id, topic_name, topic_desc = row[0], row[1], row[2]
-        subtopic_id, subtopic_name, subtopic_desc = row[3], row[4], row[5]
-        micro_id, micro_name, micro_desc = row[6], row[7], row[8]
-        nano_id, nano_name, nano_keywords = row[9], row[10], row[11]
-        
-        if topic_id not in curriculum:
-            curriculum[topic_id] = {
-                "id": topic_id,
-                "name": topic_name,
-                "description": topic_desc,
-                "subtopics": {}
-            }
-        
-        if subtopic_id and subtopic_id not in curriculum[topic_id]["subtopics"]:
-            curriculum[topic_id]["subtopics"][subtopic_id] = {
-                "id": subtopic_id,
-                "name": subtopic_name,
-                "description": subtopic_desc,
-                "micro_topics": {}
-            }
-        
-        if micro_id and micro_id not in curriculum[topic_id]["subtopics"][subtopic_id]["micro_topics"]:
-            curriculum[topic_id]["subtopics"][subtopic_id]["micro_topics"][micro_id] = {
-                "id": micro_id,
-                "name": micro_name,
-                "description": micro_desc,
-                "nano_topics": {}
-            }
-        
-        if nano_id:
-            curriculum[topic_id]["subtopics"][subtopic_id]["micro_topics"][micro_id]["nano_topics"][nano_id] = {
-                "id": nano_id,
-                "name": nano_name,
-                "keywords": nano_keywords.split(",") if nano_keywords else []
-            }
-    
-    # Convert to list format
-    structured_curriculum = []
-    for topic in curriculum.values():
-        topic["subtopics"] = list(topic["subtopics"].values())
-        for subtopic in topic["subtopics"]:
-            subtopic["micro_topics"] = list(subtopic["micro_topics"].values())
-            for micro_topic in subtopic["micro_topics"]:
-                micro_topic["nano_topics"] = list(micro_topic["nano_topics"].values())
-        structured_curriculum.append(topic)
-    
-    return {"curriculum": structured_curriculum}
+    body, etag = curriculum_snapshot.get(conn)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.get("/health")
 async def health_check():
@@ -1471,82 +1685,38 @@ async def get_class_analytics(class_id: int, current_user: dict = Depends(get_cu
         conn.close()
         raise HTTPException(status_code=403, detail="Not authorized to view this class")
 
-    # Fetch all results for all students in the class
-    c.execute("""
-        SELECT
-            u.id as student_id,
-            u.username,
-            sr.p_learned,
-            sr.is_correct,
-            sr.timestamp,
-            n.name as topic_name
-        FROM student_results sr
-        JOIN users u ON sr.student_id = u.id
-        JOIN student_classes sc ON u.id = sc.student_id
-        JOIN nano_topics n ON sr.nano_topic_id = n.id
-        WHERE sc.class_id = ?
-    """, (class_id,))
-    
-    all_results = c.fetchall()
-    conn.close()
-
-    if not all_results:
-        return {"students": [], "topics": [], "timeline": []}
-
-    # Process data with Pandas
-    df = pd.DataFrame([dict(row) for row in all_results])
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df['date'] = df['timestamp'].dt.date
-
-    # 1. Per-student performance
-    student_performance = df.groupby('student_id').agg(
-        username=('username', 'first'),
-        total_questions=('student_id', 'size'),
-        correct_answers=('is_correct', lambda x: x.sum()),
-        avg_mastery=('p_learned', 'mean'),
-        active_days=('date', 'nunique')
-    ).reset_index()
-    student_performance['accuracy'] = (student_performance['correct_answers'] / student_performance['total_questions']) * 100
-    student_performance['avg_mastery'] *= 100 # Convert to percentage
-
-    # 2. Per-topic performance
-    topic_performance = df.groupby('topic_name').agg(
-        total_attempts=('topic_name', 'size'),
-        correct_answers=('is_correct', lambda x: x.sum()),
-        avg_mastery=('p_learned', 'mean')
-    ).reset_index()
-    topic_performance['accuracy'] = (topic_performance['correct_answers'] / topic_performance['total_attempts']) * 100
-    topic_performance['avg_mastery'] *= 100
-
-    # 3. Timeline
-    timeline = df.groupby('date').agg(
-        questions_answered=('date', 'size'),
-        avg_mastery=('p_learned', 'mean')
-    ).reset_index()
-    timeline['avg_mastery'] *= 100
-    
-    return {
-        "students": student_performance.to_dict('records'),
-        "topics": topic_performance.to_dict('records'),
-        "timeline": timeline.to_dict('records')
-    }
+    # Aggregates come from the daily rollups maintained on answer submission
+    try:
+        return read_class_analytics(conn, class_id)
+    finally:
+        conn.close()
 
 @app.get("/assignments/{assignment_id}/questions")
-async def get_assignment_questions(assignment_id: int, current_user: dict = Depends(get_current_user)):
-    """Get questions for a specific assignment (handles both AI and custom questions)"""
+async def get_assignment_questions(
+    assignment_id: int,
+    sample: bool = False,
+    count: Optional[int] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get questions for a specific assignment (handles both AI and custom questions).
+    With sample=true only `count` questions (default: the assignment's min_questions)
+    are returned: every custom question, then a random pick of the generated ones.
+    """
     conn = get_db_connection()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
     
     # Get assignment details
     c.execute("""
-        SELECT a.custom_questions, a.micro_topic_id, a.nano_topic_ids, a.class_id
+        SELECT a.custom_questions, a.micro_topic_id, a.nano_topic_ids, a.class_id, a.min_questions
         FROM assignments a
         WHERE a.id = ?
     """, (assignment_id,))
     
     assignment = c.fetchone()
     if not assignment:
+        conn.close()
         raise HTTPException(status_code=404, detail="Assignment not found")
     
     # Check access
@@ -1554,89 +1724,25 @@ async def get_assignment_questions(assignment_id: int, current_user: dict = Depe
         c.execute("SELECT student_id FROM student_classes WHERE class_id = ? AND student_id = ?", 
                  (assignment["class_id"], current_user["id"]))
         if not c.fetchone():
+            conn.close()
             raise HTTPException(status_code=403, detail="Not enrolled in this class")
     elif current_user["role"] == "teacher":
         c.execute("SELECT teacher_id FROM classes WHERE id = ?", (assignment["class_id"],))
         class_result = c.fetchone()
         if not class_result or class_result["teacher_id"] != current_user["id"]:
+            conn.close()
             raise HTTPException(status_code=403, detail="Not authorized")
     
-    questions = []
-    
-    # Handle custom questions
-    if assignment["custom_questions"]:
-        custom_question_data = json.loads(assignment["custom_questions"])
-        custom_question_ids = [q["id"] for q in custom_question_data]
-        
-        if custom_question_ids:
-            placeholders = ",".join("?" * len(custom_question_ids))
-            c.execute(f"""
-                SELECT tcq.question_text as question, tcq.options, tcq.correct_answer as answer, 
-                       tcq.style, n.name as nano_topic
-                FROM teacher_custom_questions tcq
-                LEFT JOIN nano_topics n ON tcq.nano_topic_id = n.id
-                WHERE tcq.id IN ({placeholders})
-            """, custom_question_ids)
-            
-            for row in c.fetchall():
-                questions.append({
-                    "question": row["question"],
-                    "options": json.loads(row["options"]) if row["options"] else [],
-                    "answer": row["answer"],
-                    "style": row["style"],
-                    "nano_topic": row["nano_topic"] or "Custom Question"
-                })
-    
-    # Handle AI-generated questions
-    if assignment["micro_topic_id"]:
-        # Get nano topics for this micro topic
-        if assignment["nano_topic_ids"]:
-            # Specific nano topics were selected
-            nano_topic_ids = json.loads(assignment["nano_topic_ids"])
-            if nano_topic_ids:
-                placeholders = ",".join("?" * len(nano_topic_ids))
-                c.execute(f"""
-                    SELECT n.name
-                    FROM nano_topics n
-                    WHERE n.id IN ({placeholders})
-                """, nano_topic_ids)
-            else:
-                # Empty list means no specific nano topics
-                c.execute("""
-                    SELECT n.name
-                    FROM nano_topics n
-                    WHERE n.micro_topic_id = ?
-                """, (assignment["micro_topic_id"],))
-        else:
-            # No nano_topic_ids specified, get all nano topics for the micro topic
-            c.execute("""
-                SELECT n.name
-                FROM nano_topics n
-                WHERE n.micro_topic_id = ?
-            """, (assignment["micro_topic_id"],))
-        
-        nano_topics = [row["name"] for row in c.fetchall()]
-        
-        # Get questions from each nano topic
-        for nano_topic in nano_topics:
-            c.execute("""
-                SELECT q.question, q.options, q.answer, q.style
-                FROM questions q
-                JOIN nano_topics n ON q.nano_topic_id = n.id
-                WHERE n.name = ? AND q.is_approved = 1
-            """, (nano_topic,))
-            
-            for row in c.fetchall():
-                questions.append({
-                    "question": row["question"],
-                    "options": json.loads(row["options"]) if row["options"] else [],
-                    "answer": row["answer"],
-                    "style": row["style"],
-                    "nano_topic": nano_topic
-                })
+    try:
+        # Resolved once per assignment; assignments are immutable after creation
+        questions = assignment_question_cache.get(conn, assignment_id, assignment)
+    finally:
+        conn.close()
     
-    conn.close()
-    return {"questions": questions}
+    total_available = len(questions)
+    if sample:
+        questions = sample_assignment_questions(questions, max(count or assignment["min_questions"] or 10, 1))
+    return {"questions": questions, "total_available": total_available}
 
 # ADD these new endpoints to main.py for proper parent data retrieval:
 
@@ -1690,52 +1796,18 @@ async def get_student_analytics_for_parent(
     """, (current_user["id"], student_id)).fetchone()
     
     if not link_check:
+        conn.close()
         raise HTTPException(status_code=403, detail="Not authorized to view this student's data")
     
-    # Get comprehensive student data (same as student analytics but for parent access)
-    # Overall statistics including hints and lessons
-    stats = c.execute("""
-        SELECT 
-            COUNT(*) as total_questions,
-            SUM(CASE WHEN is_correct THEN 1 ELSE 0 END) as correct_answers,
-            AVG(p_learned) as avg_mastery,
-            COUNT(DISTINCT nano_topic_id) as topics_attempted,
-            SUM(CASE WHEN hint_used THEN 1 ELSE 0 END) as hints_used,
-            SUM(CASE WHEN lesson_viewed THEN 1 ELSE 0 END) as lessons_viewed,
-            COUNT(DISTINCT DATE(timestamp)) as active_days,
-            MIN(DATE(timestamp)) as first_activity,
-            MAX(DATE(timestamp)) as last_activity
-        FROM student_results
-        WHERE student_id = ?
-    """, (student_id,)).fetchone()
-    
-    # Topic-wise progress
-    topic_progress = c.execute("""
-        SELECT 
-            n.name as topic,
-            COUNT(*) as questions_answered,
-            SUM(CASE WHEN sr.is_correct THEN 1 ELSE 0 END) as correct_answers,
-            MAX(sr.p_learned) as mastery_level,
-            MAX(sr.timestamp) as last_attempt
-        FROM student_results sr
-        JOIN nano_topics n ON sr.nano_topic_id = n.id
-        WHERE sr.student_id = ?
-        GROUP BY n.name
-        ORDER BY mastery_level ASC
-    """, (student_id,)).fetchall()
-    
-    # Recent daily activity (last 30 days)
-    daily_activity = c.execute("""
-        SELECT 
-            DATE(timestamp) as date,
-            COUNT(*) as questions_answered,
-            AVG(CASE WHEN is_correct THEN 100.0 ELSE 0.0 END) as accuracy
-        FROM student_results
-        WHERE student_id = ? 
-        AND timestamp >= date('now', '-30 days')
-        GROUP BY DATE(timestamp)
-        ORDER BY date DESC
-    """, (student_id,)).fetchall()
+    # Serve the latest snapshot plus whatever was answered since it was taken
+    aggregates, _ = load_analytics_snapshot(conn, student_id)
+    if aggregates is None:
+        aggregates = write_analytics_snapshot(conn, student_id)
+        conn.commit()
+    else:
+        aggregates = merge_student_aggregates(
+            aggregates, aggregate_student_results(conn, student_id, aggregates["last_result_id"])
+        )
     
     # Get user creation date
     user_data = c.execute(
@@ -1745,54 +1817,7 @@ async def get_student_analytics_for_parent(
     
     conn.close()
     
-    if not stats or not stats["total_questions"]:
-        return {
-            "has_data": False,
-            "account_created": user_data["created_at"] if user_data else None
-        }
-    
-    # Calculate consistency
-    account_created = user_data["created_at"] if user_data else None
-    consistency = 0
-    if account_created and stats["active_days"]:
-        created_date = datetime.fromisoformat(account_created)
-        days_since_creation = (datetime.now() - created_date).days + 1
-        consistency = (stats["active_days"] / days_since_creation * 100) if days_since_creation > 0 else 0
-    
-    return {
-        "has_data": True,
-        "overall_stats": {
-            "total_questions": stats["total_questions"],
-            "correct_answers": stats["correct_answers"], 
-            "accuracy": (stats["correct_answers"] / stats["total_questions"]) * 100,
-            "avg_mastery": stats["avg_mastery"] * 100 if stats["avg_mastery"] else 0,
-            "topics_attempted": stats["topics_attempted"],
-            "hints_used": stats["hints_used"],
-            "lessons_viewed": stats["lessons_viewed"],
-            "active_days": stats["active_days"],
-            "consistency": consistency
-        },
-        "topic_progress": [
-            {
-                "topic": row["topic"],
-                "questions_answered": row["questions_answered"],
-                "correct_answers": row["correct_answers"],
-                "accuracy": (row["correct_answers"] / row["questions_answered"]) * 100,
-                "mastery_level": row["mastery_level"] * 100 if row["mastery_level"] else 0,
-                "last_attempt": row["last_attempt"]
-            }
-            for row in topic_progress
-        ],
-        "daily_activity": [
-            {
-                "date": row["date"],
-                "questions_answered": row["questions_answered"],
-                "accuracy": row["accuracy"]
-            }
-            for row in daily_activity
-        ],
-        "account_created": account_created
-    }
+    return build_student_analytics(aggregates, user_data["created_at"] if user_data else None)
 
 if __name__ == "__main__":
     import uvicorn
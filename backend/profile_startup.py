@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Startup Profiler for the FastAPI Backend
+Imports main.py in a fresh interpreter with -X importtime, runs the startup
+schema check, and reports where the time goes, per module and per package.
+The child works on a temporary copy of the database, so profiling never
+migrates the real one.
+
+Usage: python profile_startup.py [--top N]
+"""
+
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+# The database the API would open; copied, never touched
+SOURCE_DATABASE = os.getenv("DATABASE_PATH", os.path.join(BACKEND_DIR, "data", "math.db"))
+
+# Runs in the child interpreter; the timings go to stdout, importtime to stderr
+CHILD_CODE = """
+import json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+main.init_db()
+finished = time.perf_counter()
+print(json.dumps({"import": imported - started, "init_db": finished - imported}))
+"""
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr):
+    """Return [(module, self_us, cumulative_us, depth)] from -X importtime output."""
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return modules
+
+
+def copy_database(target):
+    """Copy the source database (if there is one) to target with SQLite's backup API."""
+    if not os.path.exists(SOURCE_DATABASE):
+        return False
+    source = sqlite3.connect(f"file:{SOURCE_DATABASE}?mode=ro", uri=True)
+    copy = sqlite3.connect(target)
+    try:
+        source.backup(copy)
+    finally:
+        copy.close()
+        source.close()
+    return True
+
+
+def profile_startup(top=15):
+    """Run the child interpreter and print the import cost report."""
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "math.db")
+        copied = copy_database(database)
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CHILD_CODE],
+            cwd=BACKEND_DIR, capture_output=True, text=True,
+            env={**os.environ, "DATABASE_PATH": database}
+        )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        print("❌ Importing main.py failed")
+        return False
+
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    modules = parse_importtime(result.stderr)
+
+    print("⏱️ Backend Startup Profile")
+    print("=" * 60)
+    print(f"Import main.py:  {timings['import'] * 1000:8.1f} ms")
+    print(f"init_db():       {timings['init_db'] * 1000:8.1f} ms  ({'copy of ' + SOURCE_DATABASE if copied else 'empty database'})")
+    print(f"Modules loaded:  {len(modules):8d}")
+
+    # Cost of each top-level package = sum of its modules' own import time
+    packages = defaultdict(int)
+    for module, self_us, _, _ in modules:
+        packages[module.split(".")[0]] += self_us
+
+    print(f"\nTop {top} packages by total import time")
+    print("-" * 60)
+    for package, total_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"{total_us / 1000:10.1f} ms  {package}")
+
+    print(f"\nTop {top} modules by cumulative import time (direct imports of main)")
+    print("-" * 60)
+    # Depth 0 is main itself; depth 1 are the modules main imports
+    direct = [m for m in modules if m[3] == 1]
+    for module, _, cumulative_us, _ in sorted(direct, key=lambda m: -m[2])[:top]:
+        print(f"{cumulative_us / 1000:10.1f} ms  {module}")
+    return True
+
+
+if __name__ == "__main__":
+    top = 15
+    if "--top" in sys.argv:
+        top = int(sys.argv[sys.argv.index("--top") + 1])
+    sys.exit(0 if profile_startup(top) else 1)
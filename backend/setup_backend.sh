@@ -98,17 +98,7 @@ fi
 
 # Run database migrations
 echo "🔄 Running database migrations..."
-if [ -f "data/add_teacher_features.py" ]; then
-    python data/add_teacher_features.py
-fi
-
-if [ -f "data/add_enhanced_assignment_features.py" ]; then
-    python data/add_enhanced_assignment_features.py
-fi
-
-if [ -f "data/fix_database_columns.py" ]; then
-    python data/fix_database_columns.py
-fi
+python -m src.db.migrations
 
 echo "✅ Database migrations completed!"
 
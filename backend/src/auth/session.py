@@ -1,12 +1,13 @@
 import streamlit as st
-import sqlite3
 import secrets
 from datetime import datetime, timedelta
 
+from ..db.pool import get_connection
+
 def create_session(user_id):
     """Create a new session token"""
     token = secrets.token_hex(16)
-    conn = sqlite3.connect("data/math.db")
+    conn = get_connection()
     c = conn.cursor()
     c.execute("""
         INSERT INTO sessions (user_id, token, created_at, last_activity)
@@ -21,7 +22,7 @@ def validate_session():
     if "session_token" not in st.session_state:
         return False
     
-    conn = sqlite3.connect("data/math.db")
+    conn = get_connection()
     c = conn.cursor()
     c.execute("""
         SELECT user_id, last_activity FROM sessions 
@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+from ..db.pool import get_connection
+
+# --- Token Cache Settings ---
+# Upper bound on how long a token->user lookup is reused without hitting the database
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "60"))
+# Maximum number of tokens kept in memory
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+# When enabled, invalidations are shared between worker processes through the
+# auth_invalidations table, so a logout on one worker is seen by the others.
+TOKEN_CACHE_SHARED = os.getenv("TOKEN_CACHE_SHARED", "0") == "1"
+# Seconds between checks of the shared invalidation feed
+TOKEN_CACHE_SYNC_INTERVAL = float(os.getenv("TOKEN_CACHE_SYNC_INTERVAL", "1.0"))
+
+
+class TokenCache:
+    """In-process token -> user cache used by get_current_user."""
+
+    def __init__(self, ttl=TOKEN_CACHE_TTL, max_entries=TOKEN_CACHE_MAX_ENTRIES,
+                 shared=TOKEN_CACHE_SHARED, sync_interval=TOKEN_CACHE_SYNC_INTERVAL):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared = shared
+        self.sync_interval = sync_interval
+        self._entries = {}  # token -> (user dict, valid_until timestamp)
+        self._lock = threading.Lock()
+        self._last_sync = 0.0
+        self._last_invalidation_id = None
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, token):
+        """Return a copy of the cached user for a token, or None."""
+        if self.shared:
+            self._sync()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and entry[1] > now:
+                self._counters["hits"] += 1
+                return dict(entry[0])
+            if entry is not None:
+                del self._entries[token]
+            self._counters["misses"] += 1
+        return None
+
+    def set(self, token, user, expires_at):
+        """Cache a user until the token expires or the TTL runs out, whichever is first."""
+        if isinstance(expires_at, str):
+            expires_at = datetime.fromisoformat(expires_at)
+        valid_until = min(expires_at.timestamp(), time.time() + self.ttl)
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._evict_expired()
+                if len(self._entries) >= self.max_entries:
+                    # Drop the oldest insertion; dicts keep insertion order
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[token] = (dict(user), valid_until)
+
+    def _evict_expired(self):
+        now = time.time()
+        for token in [t for t, (_, until) in self._entries.items() if until <= now]:
+            del self._entries[token]
+
+    def invalidate_token(self, token, conn=None):
+        """Forget one token (e.g. on logout)."""
+        self._drop(lambda t, user: t == token)
+        self._publish(conn, token=token)
+
+    def invalidate_user(self, user_id, conn=None):
+        """Forget every token of a user (e.g. after a password or role change)."""
+        self._drop(lambda t, user: user["id"] == user_id)
+        self._publish(conn, user_id=user_id)
+
+    def _drop(self, predicate):
+        with self._lock:
+            stale = [t for t, (user, _) in self._entries.items() if predicate(t, user)]
+            for token in stale:
+                del self._entries[token]
+            self._counters["invalidations"] += len(stale)
+
+    def _publish(self, conn, token=None, user_id=None):
+        if not self.shared:
+            return
+        own_conn = conn is None
+        if own_conn:
+            conn = get_connection()
+        try:
+            conn.execute(
+                "INSERT INTO auth_invalidations (token, user_id, created_at) VALUES (?, ?, ?)",
+                (token, user_id, time.time())
+            )
+            # Workers sync every few seconds, so a day of history is plenty
+            conn.execute("DELETE FROM auth_invalidations WHERE created_at < ?", (time.time() - 86400,))
+            if own_conn:
+                conn.commit()
+        finally:
+            if own_conn:
+                conn.close()
+
+    def _sync(self):
+        now = time.time()
+        if now - self._last_sync < self.sync_interval:
+            return
+        self._last_sync = now
+        conn = get_connection()
+        try:
+            if self._last_invalidation_id is None:
+                # Start from the current end of the feed; older entries predate our cache
+                row = conn.execute("SELECT COALESCE(MAX(id), 0) FROM auth_invalidations").fetchone()
+                self._last_invalidation_id = row[0]
+                return
+            rows = conn.execute(
+                "SELECT id, token, user_id FROM auth_invalidations WHERE id > ? ORDER BY id",
+                (self._last_invalidation_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        for row_id, token, user_id in rows:
+            if token is not None:
+                self._drop(lambda t, user, token=token: t == token)
+            if user_id is not None:
+                self._drop(lambda t, user, user_id=user_id: user["id"] == user_id)
+            self._last_invalidation_id = row_id
+
+    def stats(self):
+        """Return hit/miss counters and the current cache size."""
+        with self._lock:
+            counters = dict(self._counters)
+            counters["entries"] = len(self._entries)
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = counters["hits"] / lookups if lookups else 0.0
+        counters["shared"] = self.shared
+        return counters
+
+
+token_cache = TokenCache()
@@ -0,0 +1,60 @@
+"""Managed secondary indexes for the hot query predicates.
+
+Every index the API relies on is listed here. The schema migrations
+(src/db/migrations.py) create them by name, so a migration that has shipped
+keeps doing the same thing when this list grows; after adding an index,
+append a migration that creates it. test_query_plans.py checks the queries in
+main.py and src/quiz/data.py against the migrated schema with EXPLAIN QUERY
+PLAN.
+"""
+
+# (name, table, columns, partial-index WHERE clause or None)
+INDEXES = (
+    # Per-student history: analytics, topic progress, weekly reports
+    ("idx_student_results_student_topic_time", "student_results", "student_id, nano_topic_id, timestamp", None),
+    # Anti-join that skips questions the student already answered
+    ("idx_student_results_student_question", "student_results", "student_id, question_id", None),
+    ("idx_questions_topic_approved_difficulty", "questions", "nano_topic_id, is_approved, difficulty", None),
+    # Hint, lesson and submit lookups that only have the question text
+    ("idx_questions_question", "questions", "question", None),
+    # The admin review queue is a small slice of a large table
+    ("idx_questions_rejected", "questions", "id", "is_approved = 0 AND rejection_reason IS NOT NULL"),
+    # Curriculum lookups by name and walks down the topic tree
+    ("idx_topics_name", "topics", "name", None),
+    ("idx_subtopics_topic", "subtopics", "topic_id", None),
+    ("idx_micro_topics_subtopic", "micro_topics", "subtopic_id", None),
+    ("idx_nano_topics_micro_topic", "nano_topics", "micro_topic_id", None),
+    ("idx_nano_topics_name", "nano_topics", "name", None),
+    # Parent -> linked student checks; the links table has no primary key
+    ("idx_parent_child_links_parent_student", "parent_child_links", "parent_id, student_id", None),
+    ("idx_classes_teacher", "classes", "teacher_id, created_at", None),
+    # The primary key is (student_id, class_id); rosters need the reverse
+    ("idx_student_classes_class", "student_classes", "class_id, student_id", None),
+    ("idx_assignments_class", "assignments", "class_id, created_at", None),
+    ("idx_assignment_submissions_assignment_student", "assignment_submissions", "assignment_id, student_id", None),
+    ("idx_assignment_submissions_student", "assignment_submissions", "student_id", None),
+    ("idx_announcements_class", "announcements", "class_id, created_at", None),
+    ("idx_teacher_custom_questions_text", "teacher_custom_questions", "question_text, nano_topic_id", None),
+    ("idx_teacher_custom_questions_teacher", "teacher_custom_questions", "teacher_id, created_at", None),
+    ("idx_question_signatures_topic", "question_signatures", "nano_topic_id", None),
+    # LLM cache invalidation by kind and least-recently-used eviction
+    ("idx_llm_cache_kind", "llm_cache", "kind", None),
+    ("idx_llm_cache_last_accessed", "llm_cache", "last_accessed", None),
+)
+
+INDEXES_BY_NAME = {index[0]: index for index in INDEXES}
+
+
+def create_indexes(conn, names):
+    """Create the named managed indexes."""
+    for name in names:
+        _, table, columns, where = INDEXES_BY_NAME[name]
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})" + (f" WHERE {where}" if where else "")
+        )
+
+
+def drop_indexes(conn, names):
+    """Drop indexes that are no longer managed."""
+    for name in names:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
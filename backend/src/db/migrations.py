@@ -0,0 +1,597 @@
+"""Versioned schema migrations.
+
+The schema version lives in a single-row schema_version table, so a start
+against an up-to-date database reads one integer and does nothing else.
+Pending migrations run in order, each under BEGIN IMMEDIATE so that only one
+worker applies a given step; the version is bumped in the same transaction
+as the step's final write.
+
+Databases created before the runner existed have no version yet. They run
+every migration once, so each step checks what is already there instead of
+assuming a blank database.
+
+To change the schema, append a migration to MIGRATIONS; never edit one that
+has shipped. Run them offline with: python -m src.db.migrations [--status]
+"""
+
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+from .indexes import create_indexes, drop_indexes
+from ..quiz.mastery import backfill_mastery
+from ..quiz.analytics import backfill_rollups
+from ..quiz.curriculum import create_curriculum_version_triggers
+
+# --- Migration Settings ---
+# Rows copied or updated per transaction by the large data migrations, so
+# they never hold the write lock for long
+MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "5000"))
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _add_columns(conn, table, columns):
+    """Add the (name, definition) columns the table does not have yet; returns the added names."""
+    existing = _columns(conn, table)
+    added = []
+    for name, definition in columns:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+            added.append(name)
+    return added
+
+
+def run_in_batches(conn, table, sql, start=0, batch_size=None):
+    """Run `sql` over table's id range in committed batches.
+
+    `sql` gets the bounds of each batch as two parameters (id > ? AND id <= ?).
+    Every batch commits and re-takes the write lock, so other writers get in
+    between batches, and an interrupted run resumes from any `start`.
+    """
+    batch_size = batch_size or MIGRATION_BATCH_SIZE
+    max_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+    low = start
+    while low < max_id:
+        conn.execute(sql, (low, low + batch_size))
+        conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        low += batch_size
+
+
+def _001_base_schema(conn):
+    """Users, curriculum, questions, results and the teacher/class tables."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL,
+            role TEXT NOT NULL,
+            link_code TEXT UNIQUE,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS parent_child_links (
+            parent_id INTEGER,
+            student_id INTEGER,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (parent_id) REFERENCES users(id),
+            FOREIGN KEY (student_id) REFERENCES users(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS auth_tokens (
+            token TEXT PRIMARY KEY,
+            user_id INTEGER,
+            created_at TEXT,
+            expires_at TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS topics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            subject TEXT NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS subtopics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            topic_id INTEGER,
+            name TEXT NOT NULL,
+            description TEXT,
+            FOREIGN KEY (topic_id) REFERENCES topics(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS micro_topics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            subtopic_id INTEGER,
+            name TEXT NOT NULL,
+            description TEXT,
+            FOREIGN KEY (subtopic_id) REFERENCES subtopics(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS nano_topics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            micro_topic_id INTEGER,
+            name TEXT NOT NULL,
+            description TEXT,
+            keywords TEXT,
+            FOREIGN KEY (micro_topic_id) REFERENCES micro_topics(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS questions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nano_topic_id INTEGER,
+            question TEXT NOT NULL,
+            options TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            difficulty TEXT DEFAULT 'intermediate',
+            style TEXT DEFAULT 'mcq',
+            FOREIGN KEY (nano_topic_id) REFERENCES nano_topics(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS student_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER,
+            nano_topic_id INTEGER,
+            question TEXT,
+            is_correct BOOLEAN,
+            p_learned REAL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            attempt_completed BOOLEAN,
+            FOREIGN KEY (student_id) REFERENCES users(id),
+            FOREIGN KEY (nano_topic_id) REFERENCES nano_topics(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS feedback (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            feedback_text TEXT NOT NULL,
+            rating INTEGER,
+            context TEXT,
+            role TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ai_interactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            role TEXT,
+            question TEXT,
+            response TEXT,
+            helpful BOOLEAN,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    """)
+    # Teacher features (formerly data/add_teacher_features.py)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS classes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            teacher_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT,
+            grade_level TEXT,
+            class_code TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (teacher_id) REFERENCES users(id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS student_classes (
+            student_id INTEGER NOT NULL,
+            class_id INTEGER NOT NULL,
+            joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (student_id, class_id),
+            FOREIGN KEY (student_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY (class_id) REFERENCES classes(id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS assignments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            class_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT,
+            due_date TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            min_questions INTEGER DEFAULT 10,
+            max_attempts INTEGER DEFAULT 1,
+            show_hints BOOLEAN DEFAULT TRUE,
+            show_lessons BOOLEAN DEFAULT TRUE,
+            micro_topic_id INTEGER,
+            nano_topic_ids TEXT,
+            FOREIGN KEY (class_id) REFERENCES classes(id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS assignment_submissions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            assignment_id INTEGER NOT NULL,
+            student_id INTEGER NOT NULL,
+            attempt_number INTEGER NOT NULL,
+            score REAL,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_at TIMESTAMP,
+            total_questions INTEGER,
+            correct_answers INTEGER,
+            time_spent INTEGER,
+            FOREIGN KEY (assignment_id) REFERENCES assignments(id) ON DELETE CASCADE,
+            FOREIGN KEY (student_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS announcements (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            class_id INTEGER NOT NULL,
+            teacher_id INTEGER NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (class_id) REFERENCES classes(id) ON DELETE CASCADE,
+            FOREIGN KEY (teacher_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS teacher_custom_questions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            teacher_id INTEGER,
+            question_text TEXT NOT NULL,
+            options TEXT,
+            correct_answer TEXT NOT NULL,
+            difficulty TEXT DEFAULT 'intermediate',
+            style TEXT DEFAULT 'mcq',
+            nano_topic_id INTEGER,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (teacher_id) REFERENCES users(id),
+            FOREIGN KEY (nano_topic_id) REFERENCES nano_topics(id)
+        )
+    """)
+
+
+def _002_student_results_nano_topic_id(conn):
+    """Replace the nano_topic name column of early databases with nano_topic_id.
+
+    The table is rebuilt by copying into student_results_new in batches; a
+    copy interrupted half-way resumes after the last copied id.
+    """
+    columns = _columns(conn, "student_results")
+    if "nano_topic" not in columns:
+        if "nano_topic_id" not in columns:
+            conn.execute("ALTER TABLE student_results ADD COLUMN nano_topic_id INTEGER")
+        return
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS student_results_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER,
+            nano_topic_id INTEGER,
+            question TEXT,
+            is_correct BOOLEAN,
+            p_learned REAL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            attempt_completed BOOLEAN,
+            FOREIGN KEY (student_id) REFERENCES users(id),
+            FOREIGN KEY (nano_topic_id) REFERENCES nano_topics(id)
+        )
+    """)
+    copied = conn.execute("SELECT COALESCE(MAX(id), 0) FROM student_results_new").fetchone()[0]
+    run_in_batches(conn, "student_results", """
+        INSERT INTO student_results_new
+            (id, student_id, nano_topic_id, question, is_correct, p_learned, timestamp, attempt_completed)
+        SELECT id, student_id, (SELECT id FROM nano_topics WHERE name = nano_topic),
+               question, is_correct, p_learned, timestamp, attempt_completed
+        FROM student_results
+        WHERE id > ? AND id <= ?
+    """, start=copied)
+    conn.execute("DROP TABLE student_results")
+    conn.execute("ALTER TABLE student_results_new RENAME TO student_results")
+
+
+def _003_student_results_tracking(conn):
+    """Completion, hint and lesson tracking plus the question_id link."""
+    _add_columns(conn, "student_results", [
+        ("timestamp", "DATETIME"),
+        ("attempt_completed", "BOOLEAN"),
+        ("hint_used", "BOOLEAN DEFAULT 0"),
+        ("lesson_viewed", "BOOLEAN DEFAULT 0"),
+        ("question_id", "INTEGER REFERENCES questions(id)"),
+    ])
+    # The question_id backfill below looks every result up by question text
+    create_indexes(conn, ["idx_questions_question"])
+    # Runs whether or not the column was just added: the batches commit before
+    # the version is bumped, so an interrupted backfill finds it already there
+    run_in_batches(conn, "student_results", """
+        UPDATE student_results SET attempt_completed = 1
+        WHERE attempt_completed IS NULL AND is_correct IS NOT NULL AND id > ? AND id <= ?
+    """)
+    # Backfill from the stored question text; custom questions stay NULL
+    run_in_batches(conn, "student_results", """
+        UPDATE student_results SET question_id = (
+            SELECT q.id FROM questions q
+            WHERE q.question = student_results.question
+            AND q.nano_topic_id = student_results.nano_topic_id
+            ORDER BY q.id LIMIT 1
+        )
+        WHERE question_id IS NULL AND id > ? AND id <= ?
+    """)
+
+
+def _004_question_review_columns(conn):
+    """Approval, rejection and supervisor bookkeeping columns on questions."""
+    _add_columns(conn, "questions", [
+        ("difficulty", "TEXT DEFAULT 'intermediate'"),
+        ("style", "TEXT DEFAULT 'mcq'"),
+        ("is_approved", "INTEGER DEFAULT 0"),
+        ("rejection_reason", "TEXT"),
+        ("content_hash", "TEXT"),
+        ("validator_version", "TEXT"),
+        ("validated_at", "TEXT"),
+    ])
+
+
+def _005_assignment_features(conn):
+    """Creation timestamps and the enhanced assignment columns.
+
+    Formerly data/add_enhanced_assignment_features.py and data/fix_database_columns.py.
+    """
+    now = datetime.now().isoformat()
+    # SQLite cannot add a column with a CURRENT_TIMESTAMP default, so existing
+    # rows are stamped with the migration time instead
+    if _add_columns(conn, "users", [("created_at", "DATETIME")]):
+        conn.execute("UPDATE users SET created_at = ? WHERE created_at IS NULL", (now,))
+    if _add_columns(conn, "parent_child_links", [("created_at", "DATETIME")]):
+        conn.execute("UPDATE parent_child_links SET created_at = ? WHERE created_at IS NULL", (now,))
+    if "created_at" in _add_columns(conn, "assignments", [
+        ("difficulty_preference", "TEXT DEFAULT 'mixed'"),
+        ("count_skips", "BOOLEAN DEFAULT 1"),
+        ("custom_questions", "TEXT"),
+        ("created_at", "DATETIME"),
+    ]):
+        conn.execute("UPDATE assignments SET created_at = ? WHERE created_at IS NULL", (now,))
+    _add_columns(conn, "classes", [("description", "TEXT"), ("grade_level", "TEXT")])
+    _add_columns(conn, "assignment_submissions", [("skipped_questions", "INTEGER DEFAULT 0")])
+
+
+def _006_derived_tables(conn):
+    """Mastery, rollup, report and snapshot tables plus pre-generated question content."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS auth_invalidations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            token TEXT,
+            user_id INTEGER,
+            created_at REAL
+        )
+    """)
+    # Latest BKT state per student and nano topic, maintained by submit-answer
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS student_mastery (
+            student_id INTEGER NOT NULL,
+            nano_topic_id INTEGER NOT NULL,
+            p_learned REAL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            last_seen DATETIME,
+            PRIMARY KEY (student_id, nano_topic_id),
+            FOREIGN KEY (student_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY (nano_topic_id) REFERENCES nano_topics(id)
+        )
+    """)
+    # Latest precomputed weekly parent report per student
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS student_weekly_reports (
+            student_id INTEGER PRIMARY KEY,
+            report TEXT NOT NULL,
+            generated_at REAL NOT NULL,
+            FOREIGN KEY (student_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """)
+    # Per-student analytics aggregates, refreshed by the snapshot job; results
+    # with id > last_result_id are merged in at read time
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS student_analytics_snapshots (
+            student_id INTEGER PRIMARY KEY,
+            document TEXT NOT NULL,
+            last_result_id INTEGER NOT NULL,
+            snapshot_at REAL NOT NULL,
+            FOREIGN KEY (student_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """)
+    # Daily per-topic answer counts, kept current on submission for class analytics
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS student_topic_daily_stats (
+            student_id INTEGER NOT NULL,
+            nano_topic_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            p_learned_sum REAL NOT NULL DEFAULT 0,
+            p_learned_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (student_id, nano_topic_id, day),
+            FOREIGN KEY (student_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY (nano_topic_id) REFERENCES nano_topics(id)
+        )
+    """)
+    # Pre-generated hint and mini-lesson text for approved questions
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS question_content (
+            question_id INTEGER PRIMARY KEY,
+            hint TEXT,
+            lesson TEXT,
+            generated_at TEXT,
+            FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
+        )
+    """)
+    # MinHash signatures used to reject near-duplicate generated questions
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS question_signatures (
+            question_id INTEGER PRIMARY KEY,
+            nano_topic_id INTEGER NOT NULL,
+            signature BLOB NOT NULL,
+            FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
+        )
+    """)
+    # Version counter bumped by triggers whenever the curriculum tables change
+    create_curriculum_version_triggers(conn)
+    backfill_mastery(conn)
+    backfill_rollups(conn)
+
+
+def _007_managed_indexes(conn):
+    """Composite indexes for the hot queries (see src/db/indexes.py)."""
+    create_indexes(conn, [
+        "idx_student_results_student_topic_time",
+        "idx_student_results_student_question",
+        "idx_questions_topic_approved_difficulty",
+        "idx_questions_rejected",
+        "idx_topics_name",
+        "idx_subtopics_topic",
+        "idx_micro_topics_subtopic",
+        "idx_nano_topics_micro_topic",
+        "idx_nano_topics_name",
+        "idx_classes_teacher",
+        "idx_student_classes_class",
+        "idx_assignments_class",
+        "idx_assignment_submissions_assignment_student",
+        "idx_assignment_submissions_student",
+        "idx_announcements_class",
+        "idx_teacher_custom_questions_text",
+        "idx_teacher_custom_questions_teacher",
+        "idx_question_signatures_topic",
+    ])
+    # Made redundant by a composite index above that starts with the same columns
+    drop_indexes(conn, [
+        "idx_student_results_student_id",
+        "idx_nano_topic_id",
+        "idx_nano_name",
+        "idx_assignments_class_id",
+        "idx_assignment_submissions_student_id",
+    ])
+
+
+def _008_parent_link_index(conn):
+    """Index for the parent -> linked student lookups."""
+    create_indexes(conn, ["idx_parent_child_links_parent_student"])
+
+
+def _009_llm_cache(conn):
+    """LLM cache table and its shared invalidation generation."""
+    # Created on first use by earlier versions of the cache, so it may exist
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            last_accessed REAL NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS llm_cache_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO llm_cache_generation (id, generation) VALUES (1, 0)")
+    create_indexes(conn, ["idx_llm_cache_kind", "idx_llm_cache_last_accessed"])
+
+
+def _010_explanation_tickets(conn):
+    """Shared status of background explanation tickets."""
+    # Pending and failed tickets only; finished text is in llm_cache
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS explanation_tickets (
+            ticket TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """)
+
+
+# (version, migration) in the order they are applied
+MIGRATIONS = (
+    (1, _001_base_schema),
+    (2, _002_student_results_nano_topic_id),
+    (3, _003_student_results_tracking),
+    (4, _004_question_review_columns),
+    (5, _005_assignment_features),
+    (6, _006_derived_tables),
+    (7, _007_managed_indexes),
+    (8, _008_parent_link_index),
+    (9, _009_llm_cache),
+    (10, _010_explanation_tickets),
+)
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    """Return the applied schema version, 0 for a database the runner has not seen."""
+    try:
+        row = conn.execute("SELECT version FROM schema_version WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        # No schema_version table yet
+        return 0
+    return row[0] if row else 0
+
+
+def migrate(conn):
+    """Apply pending migrations; returns the versions applied (empty when current)."""
+    if get_schema_version(conn) >= LATEST_VERSION:
+        return []
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO schema_version (id, version) VALUES (1, 0)")
+    conn.commit()
+
+    applied = []
+    for version, migration in MIGRATIONS:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-read under the write lock: another worker may have applied it
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            migration(conn)
+            conn.execute("UPDATE schema_version SET version = ? WHERE id = 1", (version,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+        print(f"Applied schema migration {version}: {migration.__doc__.splitlines()[0]}")
+    return applied
+
+
+if __name__ == "__main__":
+    # Offline schema upgrade; --status only reports the current version
+    from .pool import get_connection
+
+    conn = get_connection()
+    try:
+        current = get_schema_version(conn)
+        if "--status" in sys.argv:
+            print(f"Schema version {current} (latest {LATEST_VERSION}).")
+        else:
+            applied = migrate(conn)
+            print(f"Applied {len(applied)} migrations; schema version {get_schema_version(conn)}.")
+    finally:
+        conn.close()
@@ -0,0 +1,222 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Path to the SQLite database file (overridable through the environment)
+DATABASE_PATH = os.getenv(
+    "DATABASE_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "..", "data", "math.db"),
+)
+
+# --- Pool Settings ---
+# Maximum number of connections handed out at the same time
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "16"))
+# Maximum number of idle connections kept open for reuse
+POOL_MAX_IDLE = int(os.getenv("DB_POOL_MAX_IDLE", "8"))
+# Seconds to wait for a free connection before opening an overflow one
+POOL_WAIT_TIMEOUT = float(os.getenv("DB_POOL_WAIT_TIMEOUT", "0.5"))
+# Seconds SQLite waits on a locked database before raising
+BUSY_TIMEOUT = float(os.getenv("DB_BUSY_TIMEOUT", "5.0"))
+
+# Applied to every new connection. WAL lets readers run alongside the single
+# writer, and NORMAL sync is durable enough under WAL while avoiding an fsync
+# on every commit.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",  # ~16 MB page cache
+    "PRAGMA mmap_size=268435456",  # 256 MB memory-mapped I/O
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() hands it back to its pool."""
+
+    _pool = None
+    _in_use = False
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.release(self)
+        else:
+            super().close()
+
+    def _close(self):
+        super().close()
+
+    def __del__(self):
+        # A connection dropped without close() (e.g. an early raise) must not
+        # leak its checkout slot.
+        if self._in_use and self._pool is not None:
+            self._pool._forget()
+
+
+class ConnectionPool:
+    """Thread-safe pool of tuned SQLite connections for one database file."""
+
+    def __init__(self, database_path, max_size=POOL_MAX_SIZE, max_idle=POOL_MAX_IDLE,
+                 wait_timeout=POOL_WAIT_TIMEOUT):
+        self.database_path = database_path
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.wait_timeout = wait_timeout
+        self._idle = deque()
+        self._checked_out = 0
+        self._cond = threading.Condition()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "overflow": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.database_path,
+            timeout=BUSY_TIMEOUT,
+            check_same_thread=False,
+            factory=PooledConnection,
+        )
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        conn._pool = self
+        return conn
+
+    def acquire(self):
+        """Return a connection, reusing an idle one when possible."""
+        with self._cond:
+            if not self._idle and self._checked_out >= self.max_size:
+                self._counters["waits"] += 1
+                started = time.perf_counter()
+                self._cond.wait_for(
+                    lambda: self._idle or self._checked_out < self.max_size,
+                    timeout=self.wait_timeout,
+                )
+                waited = time.perf_counter() - started
+                self._counters["wait_time_total"] += waited
+                self._counters["wait_time_max"] = max(self._counters["wait_time_max"], waited)
+                if not self._idle and self._checked_out >= self.max_size:
+                    # Never fail a request because the pool is busy; the extra
+                    # connection is closed again when it is released.
+                    self._counters["overflow"] += 1
+
+            self._checked_out += 1
+            if self._idle:
+                self._counters["hits"] += 1
+                conn = self._idle.pop()
+                conn._in_use = True
+                return conn
+            self._counters["misses"] += 1
+
+        try:
+            conn = self._open()
+        except Exception:
+            self._forget()
+            raise
+        conn._in_use = True
+        return conn
+
+    def _forget(self):
+        with self._cond:
+            self._checked_out -= 1
+            self._cond.notify()
+
+    def release(self, conn):
+        """Return a connection to the pool, discarding it if the pool is full."""
+        if not conn._in_use:
+            return
+        conn._in_use = False
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+            reusable = True
+        except sqlite3.Error:
+            reusable = False
+
+        with self._cond:
+            self._checked_out -= 1
+            if reusable and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                conn = None
+            self._cond.notify()
+
+        if conn is not None:
+            conn._close()
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks a connection out for the block."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def stats(self):
+        """Return a snapshot of the pool's usage counters."""
+        with self._cond:
+            counters = dict(self._counters)
+            counters["checked_out"] = self._checked_out
+            counters["idle"] = len(self._idle)
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = counters["hits"] / lookups if lookups else 0.0
+        counters["wait_time_avg"] = (
+            counters["wait_time_total"] / counters["waits"] if counters["waits"] else 0.0
+        )
+        counters["max_size"] = self.max_size
+        return counters
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones close on release)."""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            conn._close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(database_path=None):
+    """Return the shared pool for a database file, creating it on first use."""
+    key = os.path.abspath(database_path or DATABASE_PATH)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(key)
+        return pool
+
+
+def get_connection(database_path=None):
+    """Check out a pooled connection; call close() to return it."""
+    return get_pool(database_path).acquire()
+
+
+def connection(database_path=None):
+    """Context manager yielding a pooled connection."""
+    return get_pool(database_path).connection()
+
+
+def get_db():
+    """FastAPI dependency that yields a pooled connection for one request."""
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def close_all_pools():
+    """Close idle connections in every pool (used on application shutdown)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
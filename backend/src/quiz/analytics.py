@@ -0,0 +1,366 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from ..db.pool import get_connection
+
+# --- Analytics Snapshot Settings ---
+# Seconds between refreshes of the per-student analytics snapshots
+SNAPSHOT_JOB_INTERVAL = float(os.getenv("ANALYTICS_SNAPSHOT_INTERVAL", "3600"))
+# Start the snapshot job with the API (disable on all but one worker process)
+SNAPSHOT_JOB_ENABLED = os.getenv("ANALYTICS_SNAPSHOT_JOB", "1") == "1"
+
+
+def record_result_rollup(conn, student_id, nano_topic_id, is_correct, p_learned, timestamp=None):
+    """Add one answer to the student's daily per-topic rollup.
+
+    Runs on the caller's connection without committing, so the rollup row and
+    the student_results insert land in the same transaction.
+    """
+    conn.execute("""
+        INSERT INTO student_topic_daily_stats
+            (student_id, nano_topic_id, day, attempts, correct, p_learned_sum, p_learned_count)
+        VALUES (?, ?, date(COALESCE(?, CURRENT_TIMESTAMP)), 1, ?, COALESCE(?, 0), ?)
+        ON CONFLICT(student_id, nano_topic_id, day) DO UPDATE SET
+            attempts = student_topic_daily_stats.attempts + 1,
+            correct = student_topic_daily_stats.correct + excluded.correct,
+            p_learned_sum = student_topic_daily_stats.p_learned_sum + excluded.p_learned_sum,
+            p_learned_count = student_topic_daily_stats.p_learned_count + excluded.p_learned_count
+    """, (student_id, nano_topic_id, timestamp, int(bool(is_correct)), p_learned, int(p_learned is not None)))
+
+
+def rebuild_rollups(conn, student_id=None):
+    """Recompute student_topic_daily_stats from the student_results log with one grouped query.
+
+    Only needed for backfill or repair; submissions keep the rollups current.
+    Returns the number of rollup rows written. Does not commit, so a migration
+    can run it inside its own transaction.
+    """
+    c = conn.cursor()
+    where = "WHERE nano_topic_id IS NOT NULL"
+    params = ()
+    if student_id is not None:
+        where += " AND student_id = ?"
+        params = (student_id,)
+        c.execute("DELETE FROM student_topic_daily_stats WHERE student_id = ?", params)
+    else:
+        c.execute("DELETE FROM student_topic_daily_stats")
+    c.execute(f"""
+        INSERT INTO student_topic_daily_stats
+            (student_id, nano_topic_id, day, attempts, correct, p_learned_sum, p_learned_count)
+        SELECT student_id, nano_topic_id, date(timestamp), COUNT(*),
+               SUM(COALESCE(is_correct, 0)), COALESCE(SUM(p_learned), 0), COUNT(p_learned)
+        FROM student_results
+        {where}
+        GROUP BY student_id, nano_topic_id, date(timestamp)
+    """, params)
+    return c.rowcount
+
+
+def backfill_rollups(conn):
+    """Build the rollups from the log the first time they are found empty."""
+    has_rollups = conn.execute("SELECT 1 FROM student_topic_daily_stats LIMIT 1").fetchone()
+    has_results = conn.execute("SELECT 1 FROM student_results LIMIT 1").fetchone()
+    if has_rollups or not has_results:
+        return 0
+    return rebuild_rollups(conn)
+
+
+def _percent(part, whole):
+    return part / whole * 100 if whole else None
+
+
+def get_class_analytics(conn, class_id):
+    """Per-student, per-topic and per-day aggregates for a class, read from the rollups."""
+    c = conn.cursor()
+    c.execute("""
+        SELECT u.id, u.username, SUM(r.attempts), SUM(r.correct),
+               SUM(r.p_learned_sum), SUM(r.p_learned_count), COUNT(DISTINCT r.day)
+        FROM student_classes sc
+        JOIN users u ON u.id = sc.student_id
+        JOIN student_topic_daily_stats r ON r.student_id = sc.student_id
+        JOIN nano_topics n ON n.id = r.nano_topic_id
+        WHERE sc.class_id = ?
+        GROUP BY u.id
+        ORDER BY u.id
+    """, (class_id,))
+    students = [
+        {
+            "student_id": student_id,
+            "username": username,
+            "total_questions": attempts,
+            "correct_answers": correct,
+            "avg_mastery": _percent(p_sum, p_count),
+            "active_days": active_days,
+            "accuracy": _percent(correct, attempts)
+        }
+        for student_id, username, attempts, correct, p_sum, p_count, active_days in c.fetchall()
+    ]
+
+    c.execute("""
+        SELECT n.name, SUM(r.attempts), SUM(r.correct), SUM(r.p_learned_sum), SUM(r.p_learned_count)
+        FROM student_classes sc
+        JOIN student_topic_daily_stats r ON r.student_id = sc.student_id
+        JOIN nano_topics n ON n.id = r.nano_topic_id
+        WHERE sc.class_id = ?
+        GROUP BY n.name
+        ORDER BY n.name
+    """, (class_id,))
+    topics = [
+        {
+            "topic_name": topic_name,
+            "total_attempts": attempts,
+            "correct_answers": correct,
+            "avg_mastery": _percent(p_sum, p_count),
+            "accuracy": _percent(correct, attempts)
+        }
+        for topic_name, attempts, correct, p_sum, p_count in c.fetchall()
+    ]
+
+    c.execute("""
+        SELECT r.day, SUM(r.attempts), SUM(r.p_learned_sum), SUM(r.p_learned_count)
+        FROM student_classes sc
+        JOIN student_topic_daily_stats r ON r.student_id = sc.student_id
+        JOIN nano_topics n ON n.id = r.nano_topic_id
+        WHERE sc.class_id = ?
+        GROUP BY r.day
+        ORDER BY r.day
+    """, (class_id,))
+    timeline = [
+        {
+            "date": day,
+            "questions_answered": attempts,
+            "avg_mastery": _percent(p_sum, p_count)
+        }
+        for day, attempts, p_sum, p_count in c.fetchall()
+    ]
+
+    return {"students": students, "topics": topics, "timeline": timeline}
+
+
+def aggregate_student_results(conn, student_id, after_id=0):
+    """Mergeable aggregates of a student's results with id > after_id.
+
+    Counts and sums are kept raw (not as percentages) so a snapshot and a
+    later delta can be combined exactly with merge_student_aggregates.
+
+    The upper id is fixed first and bounds every query, so a result committed
+    while they run is left for the next delta instead of being counted in
+    some aggregates but not covered by last_result_id.
+    """
+    c = conn.cursor()
+    last_id = c.execute(
+        "SELECT COALESCE(MAX(id), 0) FROM student_results WHERE student_id = ? AND id > ?",
+        (student_id, after_id)
+    ).fetchone()[0]
+    bounds = (student_id, after_id, last_id)
+
+    overall = c.execute("""
+        SELECT COUNT(*),
+               SUM(CASE WHEN is_correct THEN 1 ELSE 0 END),
+               SUM(p_learned), COUNT(p_learned),
+               SUM(CASE WHEN hint_used THEN 1 ELSE 0 END),
+               SUM(CASE WHEN lesson_viewed THEN 1 ELSE 0 END)
+        FROM student_results
+        WHERE student_id = ? AND id > ? AND id <= ?
+    """, bounds).fetchone()
+    total, correct, p_sum, p_count, hints, lessons = overall
+
+    topic_ids = [row[0] for row in c.execute("""
+        SELECT DISTINCT nano_topic_id FROM student_results
+        WHERE student_id = ? AND id > ? AND id <= ? AND nano_topic_id IS NOT NULL
+    """, bounds)]
+
+    days = {
+        day: [answered, day_correct]
+        for day, answered, day_correct in c.execute("""
+            SELECT DATE(timestamp), COUNT(*), SUM(CASE WHEN is_correct THEN 1 ELSE 0 END)
+            FROM student_results
+            WHERE student_id = ? AND id > ? AND id <= ? AND timestamp IS NOT NULL
+            GROUP BY DATE(timestamp)
+        """, bounds)
+    }
+
+    topics = {
+        name: [answered, topic_correct, max_p, last_attempt]
+        for name, answered, topic_correct, max_p, last_attempt in c.execute("""
+            SELECT n.name, COUNT(*), SUM(CASE WHEN sr.is_correct THEN 1 ELSE 0 END),
+                   MAX(sr.p_learned), MAX(sr.timestamp)
+            FROM student_results sr
+            JOIN nano_topics n ON sr.nano_topic_id = n.id
+            WHERE sr.student_id = ? AND sr.id > ? AND sr.id <= ?
+            GROUP BY n.name
+        """, bounds)
+    }
+
+    return {
+        "last_result_id": max(last_id, after_id),
+        "total": total,
+        "correct": correct or 0,
+        "p_sum": p_sum or 0.0,
+        "p_count": p_count,
+        "hints": hints or 0,
+        "lessons": lessons or 0,
+        "topic_ids": topic_ids,
+        "days": days,
+        "topics": topics,
+    }
+
+
+def _max_or_none(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+
+def merge_student_aggregates(base, delta):
+    """Combine a snapshot with the aggregates of the results recorded after it."""
+    days = {day: list(values) for day, values in base["days"].items()}
+    for day, (answered, correct) in delta["days"].items():
+        current = days.setdefault(day, [0, 0])
+        current[0] += answered
+        current[1] += correct
+    topics = {name: list(values) for name, values in base["topics"].items()}
+    for name, (answered, correct, max_p, last_attempt) in delta["topics"].items():
+        if name not in topics:
+            topics[name] = [answered, correct, max_p, last_attempt]
+            continue
+        current = topics[name]
+        current[0] += answered
+        current[1] += correct
+        current[2] = _max_or_none(current[2], max_p)
+        current[3] = _max_or_none(current[3], last_attempt)
+    return {
+        "last_result_id": max(base["last_result_id"], delta["last_result_id"]),
+        "total": base["total"] + delta["total"],
+        "correct": base["correct"] + delta["correct"],
+        "p_sum": base["p_sum"] + delta["p_sum"],
+        "p_count": base["p_count"] + delta["p_count"],
+        "hints": base["hints"] + delta["hints"],
+        "lessons": base["lessons"] + delta["lessons"],
+        "topic_ids": sorted(set(base["topic_ids"]) | set(delta["topic_ids"])),
+        "days": days,
+        "topics": topics,
+    }
+
+
+def build_student_analytics(aggregates, account_created, today=None):
+    """Turn aggregates into the /parent/student-analytics response document."""
+    if not aggregates["total"]:
+        return {"has_data": False, "account_created": account_created}
+
+    # date('now') in SQLite is UTC
+    today = today or datetime.now(timezone.utc).date()
+    active_days = len(aggregates["days"])
+    consistency = 0
+    if account_created and active_days:
+        created_date = datetime.fromisoformat(account_created)
+        days_since_creation = (datetime.now() - created_date).days + 1
+        consistency = (active_days / days_since_creation * 100) if days_since_creation > 0 else 0
+
+    # Topics with the lowest mastery first (no mastery sorts first, as in SQL)
+    topics = sorted(aggregates["topics"].items(), key=lambda item: (item[1][2] is not None, item[1][2] or 0))
+    recent_cutoff = (today - timedelta(days=30)).isoformat()
+    recent_days = sorted(
+        (item for item in aggregates["days"].items() if item[0] >= recent_cutoff),
+        reverse=True
+    )
+
+    return {
+        "has_data": True,
+        "overall_stats": {
+            "total_questions": aggregates["total"],
+            "correct_answers": aggregates["correct"],
+            "accuracy": (aggregates["correct"] / aggregates["total"]) * 100,
+            "avg_mastery": aggregates["p_sum"] / aggregates["p_count"] * 100 if aggregates["p_count"] else 0,
+            "topics_attempted": len(aggregates["topic_ids"]),
+            "hints_used": aggregates["hints"],
+            "lessons_viewed": aggregates["lessons"],
+            "active_days": active_days,
+            "consistency": consistency
+        },
+        "topic_progress": [
+            {
+                "topic": name,
+                "questions_answered": answered,
+                "correct_answers": correct,
+                "accuracy": (correct / answered) * 100,
+                "mastery_level": max_p * 100 if max_p else 0,
+                "last_attempt": last_attempt
+            }
+            for name, (answered, correct, max_p, last_attempt) in topics
+        ],
+        "daily_activity": [
+            {
+                "date": day,
+                "questions_answered": answered,
+                "accuracy": correct / answered * 100.0
+            }
+            for day, (answered, correct) in recent_days
+        ],
+        "account_created": account_created
+    }
+
+
+def load_analytics_snapshot(conn, student_id):
+    """Return (aggregates, snapshot_at) of the student's stored snapshot, or (None, None)."""
+    row = conn.execute(
+        "SELECT document, snapshot_at FROM student_analytics_snapshots WHERE student_id = ?",
+        (student_id,)
+    ).fetchone()
+    if row is None:
+        return None, None
+    return json.loads(row[0]), row[1]
+
+
+def write_analytics_snapshot(conn, student_id, full=False):
+    """Bring one student's snapshot up to date; full=True recomputes it from scratch."""
+    aggregates = None if full else load_analytics_snapshot(conn, student_id)[0]
+    if aggregates is None:
+        aggregates = aggregate_student_results(conn, student_id)
+    else:
+        aggregates = merge_student_aggregates(
+            aggregates, aggregate_student_results(conn, student_id, aggregates["last_result_id"])
+        )
+    conn.execute("""
+        INSERT INTO student_analytics_snapshots (student_id, document, last_result_id, snapshot_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(student_id) DO UPDATE SET
+            document = excluded.document,
+            last_result_id = excluded.last_result_id,
+            snapshot_at = excluded.snapshot_at
+    """, (student_id, json.dumps(aggregates), aggregates["last_result_id"], time.time()))
+    return aggregates
+
+
+def snapshot_student_analytics(full=False):
+    """Refresh the analytics snapshot of every student with results. Returns the count."""
+    conn = get_connection()
+    try:
+        student_ids = [row[0] for row in conn.execute("SELECT DISTINCT student_id FROM student_results")]
+        for student_id in student_ids:
+            write_analytics_snapshot(conn, student_id, full=full)
+            # One short write per student, so submissions are never blocked for long
+            conn.commit()
+    finally:
+        conn.close()
+    print(f"[{datetime.now().isoformat()}] Wrote {len(student_ids)} student analytics snapshots.")
+    return len(student_ids)
+
+
+async def run_snapshot_job(interval=SNAPSHOT_JOB_INTERVAL):
+    """Refresh the analytics snapshots every `interval` seconds until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            # The queries are synchronous; keep them off the event loop
+            await loop.run_in_executor(None, snapshot_student_analytics)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Analytics snapshot job failed: {str(e)}")
+        await asyncio.sleep(interval)
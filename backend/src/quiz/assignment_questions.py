@@ -0,0 +1,125 @@
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+
+# --- Assignment Question Cache Settings ---
+# Assignments never change after creation, but questions can still be approved
+# or rejected by the supervisor, so resolved sets are refreshed after this many seconds
+ASSIGNMENT_QUESTIONS_TTL = float(os.getenv("ASSIGNMENT_QUESTIONS_TTL", "600"))
+# Assignments whose resolved question sets are kept in memory
+ASSIGNMENT_QUESTIONS_MAX_ENTRIES = int(os.getenv("ASSIGNMENT_QUESTIONS_MAX_ENTRIES", "512"))
+
+
+def resolve_assignment_questions(conn, assignment):
+    """Resolve an assignment's custom and AI-generated questions with one query.
+
+    `assignment` needs custom_questions, micro_topic_id and nano_topic_ids. An
+    empty or missing nano_topic_ids list means every nano-topic of the micro-topic.
+    Custom questions come first, in the order the teacher picked them.
+    """
+    custom_ids = []
+    if assignment["custom_questions"]:
+        custom_ids = [q["id"] for q in json.loads(assignment["custom_questions"])]
+    nano_topic_ids = json.loads(assignment["nano_topic_ids"]) if assignment["nano_topic_ids"] else []
+
+    parts, params = [], []
+    if custom_ids:
+        parts.append(f"""
+            SELECT 0 AS kind, tcq.id, tcq.question_text, tcq.options, tcq.correct_answer,
+                   tcq.style, COALESCE(n.name, 'Custom Question')
+            FROM teacher_custom_questions tcq
+            LEFT JOIN nano_topics n ON tcq.nano_topic_id = n.id
+            WHERE tcq.id IN ({",".join("?" * len(custom_ids))})
+        """)
+        params.extend(custom_ids)
+    if assignment["micro_topic_id"]:
+        if nano_topic_ids:
+            topic_filter = f"n.id IN ({','.join('?' * len(nano_topic_ids))})"
+            params.extend(nano_topic_ids)
+        else:
+            topic_filter = "n.micro_topic_id = ?"
+            params.append(assignment["micro_topic_id"])
+        parts.append(f"""
+            SELECT 1 AS kind, q.id, q.question, q.options, q.answer, q.style, n.name
+            FROM questions q
+            JOIN nano_topics n ON q.nano_topic_id = n.id
+            WHERE {topic_filter} AND q.is_approved = 1
+        """)
+    if not parts:
+        return []
+
+    rows = conn.execute(" UNION ALL ".join(parts) + " ORDER BY 1, 2", params).fetchall()
+    custom_order = {qid: i for i, qid in enumerate(custom_ids)}
+    custom, generated = [], []
+    for kind, qid, text, options, answer, style, nano_topic in rows:
+        question = {
+            "question": text,
+            "options": json.loads(options) if options else [],
+            "answer": answer,
+            "style": style,
+            "nano_topic": nano_topic
+        }
+        if kind == 0:
+            question["custom_question_id"] = qid
+            custom.append(question)
+        else:
+            question["id"] = qid
+            generated.append(question)
+    custom.sort(key=lambda q: custom_order[q["custom_question_id"]])
+    return custom + generated
+
+
+def sample_assignment_questions(questions, count):
+    """Pick `count` questions: every custom question first, then a random sample of the rest."""
+    custom = [q for q in questions if "custom_question_id" in q]
+    generated = [q for q in questions if "custom_question_id" not in q]
+    if count <= len(custom):
+        return custom[:count]
+    return custom + random.sample(generated, min(count - len(custom), len(generated)))
+
+
+class AssignmentQuestionCache:
+    """In-process LRU of resolved question sets, keyed by assignment id."""
+
+    def __init__(self, ttl=ASSIGNMENT_QUESTIONS_TTL, max_entries=ASSIGNMENT_QUESTIONS_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # assignment_id -> (questions, expires_at)
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0}
+
+    def get(self, conn, assignment_id, assignment):
+        """Return the assignment's resolved questions, resolving them on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(assignment_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(assignment_id)
+                self._counters["hits"] += 1
+                return entry[0]
+            self._counters["misses"] += 1
+
+        questions = resolve_assignment_questions(conn, assignment)
+        with self._lock:
+            self._entries[assignment_id] = (questions, now + self.ttl)
+            self._entries.move_to_end(assignment_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return questions
+
+    def invalidate(self, assignment_id=None):
+        with self._lock:
+            if assignment_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(assignment_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {**self._counters, "entries": len(self._entries)}
+
+
+assignment_question_cache = AssignmentQuestionCache()
@@ -0,0 +1,160 @@
+import asyncio
+import os
+from dotenv import load_dotenv
+
+from .openai_client import (
+    build_explanation_messages, build_hint_messages,
+    build_mini_lesson_messages, build_actionable_steps_messages
+)
+from .llm_cache import llm_cache
+
+# Load environment variables
+load_dotenv()
+
+# Model used for the student/parent facing completions
+CHAT_MODEL = "gpt-3.5-turbo"
+# Maximum number of completions in flight per worker
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# Seconds allowed for one completion, including time queued for a slot
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+# Actionable steps are generated per mastery bucket of this width, not per exact p_learned
+MASTERY_BUCKET_WIDTH = 0.1
+
+_client = None
+_semaphore = None
+
+
+def get_async_client():
+    """Return the worker-wide AsyncOpenAI client, creating it on first use."""
+    global _client
+    if _client is None:
+        # Imported here so importing the API does not load the SDK
+        from openai import AsyncOpenAI
+        _client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=LLM_TIMEOUT)
+    return _client
+
+
+def _get_semaphore():
+    # Created lazily so it binds to the running event loop
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return _semaphore
+
+
+async def _complete(messages, **kwargs):
+    async def _call():
+        async with _get_semaphore():
+            response = await get_async_client().chat.completions.create(
+                model=CHAT_MODEL,
+                messages=messages,
+                **kwargs
+            )
+            return response.choices[0].message.content
+
+    # wait_for cancels the in-flight request on timeout; a cancelled caller
+    # propagates CancelledError the same way.
+    return await asyncio.wait_for(_call(), timeout=LLM_TIMEOUT)
+
+
+async def _cached_complete(kind, key_parts, messages, **kwargs):
+    # Only successful completions are cached; errors propagate to the caller
+    key = llm_cache.make_key(kind, CHAT_MODEL, *key_parts)
+    cached = await llm_cache.aget(key)
+    if cached is not None:
+        return cached
+    content = (await _complete(messages, **kwargs)).strip()
+    await llm_cache.aset(key, kind, content)
+    return content
+
+
+async def close_async_client():
+    """Close the shared client's HTTP connections (used on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+async def generate_explanation_async(question, student_answer, correct_answer, raise_errors=False):
+    """Async version of generate_explanation.
+
+    With raise_errors, timeouts and API errors propagate instead of being
+    returned as the explanation text.
+    """
+    if not all([question, student_answer, correct_answer]):
+        return "Invalid input provided."
+    try:
+        return await _cached_complete(
+            "explanation",
+            (question, student_answer.strip().lower(), correct_answer),
+            build_explanation_messages(question, student_answer, correct_answer)
+        )
+    except asyncio.TimeoutError:
+        if raise_errors:
+            raise
+        return "Error generating explanation: the request timed out."
+    except Exception as e:
+        if raise_errors:
+            raise
+        return f"Error generating explanation: {str(e)}"
+
+
+async def generate_hint_async(question, options, answer, nano_topic):
+    """Async version of generate_hint."""
+    try:
+        return await _cached_complete(
+            "hint",
+            (question, list(options or []), answer, nano_topic),
+            build_hint_messages(question, options, answer, nano_topic),
+            max_tokens=150
+        )
+    except asyncio.TimeoutError:
+        return "Error generating hint: the request timed out."
+    except Exception as e:
+        return f"Error generating hint: {str(e)}"
+
+
+async def generate_mini_lesson_async(nano_topic, question, correct_answer):
+    """Async version of generate_mini_lesson."""
+    try:
+        return await _cached_complete(
+            "lesson",
+            (nano_topic, question, correct_answer),
+            build_mini_lesson_messages(nano_topic, question, correct_answer),
+            max_tokens=300
+        )
+    except asyncio.TimeoutError:
+        return "Error generating lesson: the request timed out."
+    except Exception as e:
+        return f"Error generating lesson: {str(e)}"
+
+
+def mastery_bucket(p_learned):
+    """Index of the mastery bucket p_learned falls into (0 .. 1/MASTERY_BUCKET_WIDTH - 1)."""
+    buckets = int(round(1 / MASTERY_BUCKET_WIDTH))
+    return min(max(int((p_learned or 0) * buckets), 0), buckets - 1)
+
+
+async def generate_actionable_steps_async(nano_topic, p_learned, raise_errors=False):
+    """Async version of generate_actionable_steps, cached per (nano_topic, mastery bucket).
+
+    The prompt is built from the bucket midpoint, so every student in the same
+    bucket shares one generation. With raise_errors, timeouts and API errors
+    propagate instead of being returned as the steps text.
+    """
+    bucket = mastery_bucket(p_learned)
+    try:
+        return await _cached_complete(
+            "actionable_steps",
+            (nano_topic, bucket),
+            build_actionable_steps_messages(nano_topic, (bucket + 0.5) * MASTERY_BUCKET_WIDTH)
+        )
+    except asyncio.TimeoutError:
+        if raise_errors:
+            raise
+        return "Error generating actionable steps: the request timed out."
+    except Exception as e:
+        if raise_errors:
+            raise
+        return f"Error generating actionable steps: {str(e)}"
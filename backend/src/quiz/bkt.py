@@ -1,13 +1,17 @@
-import numpy as np
+# Default model parameters, shared by the scalar and vectorized implementations
+P_INIT = 0.2   # Initial probability of knowing the skill
+P_LEARN = 0.1  # Probability of learning after a question
+P_GUESS = 0.2  # Probability of guessing correctly
+P_SLIP = 0.1   # Probability of slipping (wrong despite knowing)
 
 class BKT:
     """Bayesian Knowledge Tracing model for tracking student mastery."""
     
     def __init__(self):
-        self.p_learned = 0.2  # Initial probability of knowing the skill
-        self.p_learn = 0.1    # Probability of learning after a question
-        self.p_guess = 0.2    # Probability of guessing correctly
-        self.p_slip = 0.1     # Probability of slipping (wrong despite knowing)
+        self.p_learned = P_INIT  # Initial probability of knowing the skill
+        self.p_learn = P_LEARN   # Probability of learning after a question
+        self.p_guess = P_GUESS   # Probability of guessing correctly
+        self.p_slip = P_SLIP     # Probability of slipping (wrong despite knowing)
 
     def update(self, correct):
         """Update knowledge state based on correct/incorrect answer."""
@@ -24,4 +28,10 @@ def select_next_module(bkt_dict):
     """Select the next module (topic) based on weakest p_learned score."""
     if not bkt_dict:
         return None
-    return min(bkt_dict, key=lambda topic: bkt_dict[topic].p_learned)
\ No newline at end of file
+    return min(bkt_dict, key=lambda topic: bkt_dict[topic].p_learned)
+
+def select_next_topic(topic_names, p_learned):
+    """select_next_module over parallel lists of topic names and p_learned scores."""
+    if len(topic_names) == 0:
+        return None
+    return topic_names[min(range(len(p_learned)), key=p_learned.__getitem__)]
@@ -0,0 +1,143 @@
+"""Array-backed BKT for bulk replays, kept out of bkt.py so importing the API does not load numpy."""
+
+import numpy as np
+
+from .bkt import P_INIT, P_LEARN, P_GUESS, P_SLIP
+
+def bkt_update_vector(p_learned, correct, p_learn=P_LEARN, p_guess=P_GUESS, p_slip=P_SLIP):
+    """Apply one BKT update to arrays of p_learned/correct values.
+
+    Uses the same operation order as BKT.update, so results are bit-identical.
+    """
+    p = np.asarray(p_learned, dtype=np.float64)
+    correct = np.asarray(correct, dtype=bool)
+    known_correct = p * (1 - p_slip)
+    posterior_correct = known_correct / (known_correct + (1 - p) * p_guess)
+    known_incorrect = p * p_slip
+    posterior_incorrect = known_incorrect / (known_incorrect + (1 - p) * (1 - p_guess))
+    posterior = np.where(correct, posterior_correct, posterior_incorrect)
+    return np.minimum(posterior + p_learn * (1 - posterior), 1.0)
+
+def _occurrence_rank(keys):
+    """For each position, how many earlier positions share its key (0 for the first)."""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.r_[0, np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1]
+    group_start = np.repeat(starts, np.diff(np.r_[starts, len(keys)]))
+    rank = np.empty(len(keys), dtype=np.int64)
+    rank[order] = np.arange(len(keys)) - group_start
+    return rank
+
+class BKTEngine:
+    """Array-backed BKT state for many (student, nano_topic) pairs.
+
+    State lives in contiguous NumPy arrays indexed through a (student_id,
+    nano_topic_id) -> row map. Batches are applied in one vectorized pass per
+    "round": repeated observations of the same pair are applied in order, one
+    round per repeat, so the numbers match sequential BKT.update calls.
+    """
+
+    def __init__(self, p_init=P_INIT, p_learn=P_LEARN, p_guess=P_GUESS, p_slip=P_SLIP, capacity=1024):
+        self.p_init = p_init
+        self.p_learn = p_learn
+        self.p_guess = p_guess
+        self.p_slip = p_slip
+        self._index = {}
+        self._keys = []
+        self.p_learned = np.full(capacity, p_init, dtype=np.float64)
+        self.attempts = np.zeros(capacity, dtype=np.int64)
+        self.correct = np.zeros(capacity, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _grow(self, needed):
+        capacity = len(self.p_learned)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        self.p_learned = np.concatenate([self.p_learned, np.full(new_capacity - capacity, self.p_init)])
+        self.attempts = np.concatenate([self.attempts, np.zeros(new_capacity - capacity, dtype=np.int64)])
+        self.correct = np.concatenate([self.correct, np.zeros(new_capacity - capacity, dtype=np.int64)])
+
+    def rows(self, student_ids, nano_topic_ids):
+        """Return the state rows for (student, topic) pairs, allocating new ones at p_init."""
+        rows = np.empty(len(student_ids), dtype=np.int64)
+        for i, key in enumerate(zip(student_ids, nano_topic_ids)):
+            row = self._index.get(key)
+            if row is None:
+                row = self._index[key] = len(self._keys)
+                self._keys.append(key)
+            rows[i] = row
+        self._grow(len(self._keys))
+        return rows
+
+    def load(self, student_ids, nano_topic_ids, p_learned, attempts=None, correct=None):
+        """Seed state from stored values (e.g. the mastery table)."""
+        rows = self.rows(student_ids, nano_topic_ids)
+        self.p_learned[rows] = p_learned
+        if attempts is not None:
+            self.attempts[rows] = attempts
+        if correct is not None:
+            self.correct[rows] = correct
+        return rows
+
+    def get(self, student_id, nano_topic_id):
+        """Return p_learned for one pair (p_init if it has never been seen)."""
+        row = self._index.get((student_id, nano_topic_id))
+        return self.p_init if row is None else float(self.p_learned[row])
+
+    def update_batch(self, student_ids, nano_topic_ids, correct):
+        """Apply a batch of observations in order; returns p_learned after each one."""
+        correct = np.asarray(correct, dtype=bool)
+        rows = self.rows(student_ids, nano_topic_ids)
+        trajectory = np.empty(len(rows), dtype=np.float64)
+        if len(rows) == 0:
+            return trajectory
+
+        rank = _occurrence_rank(rows)
+        for r in range(int(rank.max()) + 1):
+            sel = np.flatnonzero(rank == r)
+            target = rows[sel]
+            updated = bkt_update_vector(self.p_learned[target], correct[sel],
+                                        self.p_learn, self.p_guess, self.p_slip)
+            self.p_learned[target] = updated
+            trajectory[sel] = updated
+        np.add.at(self.attempts, rows, 1)
+        np.add.at(self.correct, rows, correct.astype(np.int64))
+        return trajectory
+
+    def replay(self, student_id, nano_topic_ids, correct):
+        """Rebuild one student's state from their full answer history (oldest first).
+
+        Any existing state for the student's topics in the history is reset to
+        p_init first. Returns p_learned after each answer.
+        """
+        nano_topic_ids = list(nano_topic_ids)
+        rows = self.rows([student_id] * len(nano_topic_ids), nano_topic_ids)
+        unique_rows = np.unique(rows)
+        self.p_learned[unique_rows] = self.p_init
+        self.attempts[unique_rows] = 0
+        self.correct[unique_rows] = 0
+        return self.update_batch([student_id] * len(nano_topic_ids), nano_topic_ids, correct)
+
+    def items(self):
+        """Yield (student_id, nano_topic_id, p_learned, attempts, correct) for every pair."""
+        for (student_id, topic_id), row in self._index.items():
+            yield (student_id, topic_id, float(self.p_learned[row]),
+                   int(self.attempts[row]), int(self.correct[row]))
+
+    def student_state(self, student_id):
+        """Return {nano_topic_id: p_learned} for one student."""
+        return {
+            topic_id: float(self.p_learned[row])
+            for (sid, topic_id), row in self._index.items() if sid == student_id
+        }
+
+    def select_next(self, student_id, nano_topic_ids):
+        """Return the weakest of the given topics for a student (ties go to the first)."""
+        nano_topic_ids = list(nano_topic_ids)
+        if not nano_topic_ids:
+            return None
+        scores = [self.get(student_id, topic_id) for topic_id in nano_topic_ids]
+        return nano_topic_ids[int(np.argmin(scores))]
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import threading
+
+CURRICULUM_TABLES = ("topics", "subtopics", "micro_topics", "nano_topics")
+
+
+def create_curriculum_version_triggers(conn):
+    """Create the curriculum_version counter and the triggers that bump it.
+
+    Any insert, update or delete on a curriculum table increments the counter,
+    including writes made by the offline data scripts, so every API worker can
+    tell its cached snapshot is stale with a single-row read.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS curriculum_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO curriculum_version (id, version) VALUES (1, 1)")
+    for table in CURRICULUM_TABLES:
+        for action in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{action.lower()}_curriculum_version
+                AFTER {action} ON {table}
+                BEGIN
+                    UPDATE curriculum_version SET version = version + 1 WHERE id = 1;
+                END
+            """)
+
+
+def get_curriculum_version(conn):
+    row = conn.execute("SELECT version FROM curriculum_version WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def build_curriculum_structure(conn):
+    """Build the nested topic -> subtopic -> micro-topic -> nano-topic structure."""
+    c = conn.cursor()
+
+    c.execute("""
+        SELECT t.id, t.name, t.description,
+               s.id, s.name, s.description,
+               m.id, m.name, m.description,
+               n.id, n.name, n.keywords
+        FROM topics t
+        LEFT JOIN subtopics s ON t.id = s.topic_id
+        LEFT JOIN micro_topics m ON s.id = m.subtopic_id
+        LEFT JOIN nano_topics n ON m.id = n.micro_topic_id
+        ORDER BY t.id, s.id, m.id, n.id
+    """)
+
+    results = c.fetchall()
+
+    # Structure the data
+    curriculum = {}
+
+    for row in results:
+        topic_id, topic_name, topic_desc = row[0], row[1], row[2]
+        subtopic_id, subtopic_name, subtopic_desc = row[3], row[4], row[5]
+        micro_id, micro_name, micro_desc = row[6], row[7], row[8]
+        nano_id, nano_name, nano_keywords = row[9], row[10], row[11]
+
+        if topic_id not in curriculum:
+            curriculum[topic_id] = {
+                "id": topic_id,
+                "name": topic_name,
+                "description": topic_desc,
+                "subtopics": {}
+            }
+
+        if subtopic_id and subtopic_id not in curriculum[topic_id]["subtopics"]:
+            curriculum[topic_id]["subtopics"][subtopic_id] = {
+                "id": subtopic_id,
+                "name": subtopic_name,
+                "description": subtopic_desc,
+                "micro_topics": {}
+            }
+
+        if micro_id and micro_id not in curriculum[topic_id]["subtopics"][subtopic_id]["micro_topics"]:
+            curriculum[topic_id]["subtopics"][subtopic_id]["micro_topics"][micro_id] = {
+                "id": micro_id,
+                "name": micro_name,
+                "description": micro_desc,
+                "nano_topics": {}
+            }
+
+        if nano_id:
+            curriculum[topic_id]["subtopics"][subtopic_id]["micro_topics"][micro_id]["nano_topics"][nano_id] = {
+                "id": nano_id,
+                "name": nano_name,
+                "keywords": nano_keywords.split(",") if nano_keywords else []
+            }
+
+    # Convert to list format
+    structured_curriculum = []
+    for topic in curriculum.values():
+        topic["subtopics"] = list(topic["subtopics"].values())
+        for subtopic in topic["subtopics"]:
+            subtopic["micro_topics"] = list(subtopic["micro_topics"].values())
+            for micro_topic in subtopic["micro_topics"]:
+                micro_topic["nano_topics"] = list(micro_topic["nano_topics"].values())
+        structured_curriculum.append(topic)
+
+    return structured_curriculum
+
+
+class CurriculumSnapshot:
+    """Pre-serialized /topics/structure response, rebuilt only when curriculum_version changes."""
+
+    def __init__(self):
+        self._version = None
+        self._body = None
+        self._etag = None
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "rebuilds": 0}
+
+    def get(self, conn):
+        """Return (body bytes, etag) for the current curriculum version."""
+        version = get_curriculum_version(conn)
+        with self._lock:
+            if self._body is not None and self._version == version:
+                self._counters["hits"] += 1
+                return self._body, self._etag
+
+        body = json.dumps(
+            {"curriculum": build_curriculum_structure(conn)},
+            ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        # The content hash keeps ETags distinct if the database is rebuilt and the counter restarts
+        etag = f'"{version}-{hashlib.sha256(body).hexdigest()[:16]}"'
+        with self._lock:
+            self._version, self._body, self._etag = version, body, etag
+            self._counters["rebuilds"] += 1
+        return body, etag
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+            self._body = None
+            self._etag = None
+
+    def stats(self):
+        with self._lock:
+            return {**self._counters, "version": self._version, "etag": self._etag}
+
+
+curriculum_snapshot = CurriculumSnapshot()
+
+
+def etag_matches(if_none_match, etag):
+    """True when an If-None-Match header value covers the given ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 7232 requires for If-None-Match
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
@@ -1,9 +1,12 @@
-import sqlite3
 import json
+import random
+
+from ..db.pool import get_connection
+from .bkt import P_INIT
 
 def load_nano_topics(subject, micro_topic=None):
     """Load nano-topics and their keywords from the SQLite database for a given subject and optional micro-topic."""
-    conn = sqlite3.connect("data/math.db")
+    conn = get_connection()
     c = conn.cursor()
     query = """
         SELECT n.name, n.keywords
@@ -25,32 +28,101 @@ def load_nano_topics(subject, micro_topic=None):
 
 def get_questions(nano_topic):
     """Retrieve APPROVED questions for a nano-topic from the SQLite database."""
-    conn = sqlite3.connect("data/math.db")
+    conn = get_connection()
     c = conn.cursor()
     # This query now filters for is_approved = 1
     c.execute("""
-        SELECT question, options, answer, difficulty, style
+        SELECT id, question, options, answer, difficulty, style
         FROM questions
         WHERE nano_topic_id = (SELECT id FROM nano_topics WHERE name = ?)
         AND is_approved = 1
     """, (nano_topic,))
-    questions = [{"question": row[0], "options": json.loads(row[1]), "answer": row[2], "difficulty": row[3], "style": row[4]} for row in c.fetchall()]
+    questions = [_question_from_row(row) for row in c.fetchall()]
     conn.close()
     return questions
 
 def get_unanswered_questions(user_id, nano_topic):
     """Get UNANSWERED and APPROVED questions for a given nano-topic and user."""
-    conn = sqlite3.connect("data/math.db")
+    conn = get_connection()
     c = conn.cursor()
-    # This query now ALSO filters for is_approved = 1
+    # Anti-join on the (student_id, question_id) index rather than question text
     c.execute("""
-        SELECT q.question, q.options, q.answer, q.difficulty, q.style
+        SELECT q.id, q.question, q.options, q.answer, q.difficulty, q.style
         FROM questions q
-        LEFT JOIN student_results r ON r.question = q.question AND r.student_id = ?
         WHERE q.nano_topic_id = (SELECT id FROM nano_topics WHERE name = ?)
         AND q.is_approved = 1
-        AND r.id IS NULL
-    """, (user_id, nano_topic))
-    questions = [{"question": row[0], "options": json.loads(row[1]), "answer": row[2], "difficulty": row[3], "style": row[4]} for row in c.fetchall()]
+        AND NOT EXISTS (
+            SELECT 1 FROM student_results r
+            WHERE r.student_id = ? AND r.question_id = q.id
+        )
+    """, (nano_topic, user_id))
+    questions = [_question_from_row(row) for row in c.fetchall()]
     conn.close()
-    return questions
\ No newline at end of file
+    return questions
+
+def _question_from_row(row):
+    return {"id": row[0], "question": row[1], "options": json.loads(row[2]), "answer": row[3], "difficulty": row[4], "style": row[5]}
+
+def difficulty_for_mastery(p_learned):
+    """Map a BKT p_learned score to the question difficulty the student should see next."""
+    if p_learned < 0.4:
+        return "beginner"
+    if p_learned < 0.7:
+        return "intermediate"
+    return "advanced"
+
+def get_next_question(user_id, subject, micro_topic=None):
+    """Pick one unanswered, approved question for a student.
+
+    Nano-topics are tried from weakest to strongest p_learned; within a topic the
+    question is sampled at random, preferring the difficulty that matches the
+    student's mastery. Returns None when every question has been answered.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute("""
+            SELECT n.id, n.name, COALESCE(sm.p_learned, ?) AS p_learned
+            FROM nano_topics n
+            JOIN micro_topics m ON n.micro_topic_id = m.id
+            JOIN subtopics s ON m.subtopic_id = s.id
+            JOIN topics t ON s.topic_id = t.id
+            LEFT JOIN student_mastery sm ON sm.nano_topic_id = n.id AND sm.student_id = ?
+            WHERE t.name = ? AND (m.name = ? OR ? IS NULL)
+            ORDER BY p_learned, n.id
+        """, (P_INIT, user_id, subject, micro_topic, micro_topic))
+        topics = c.fetchall()
+
+        for nano_topic_id, nano_topic, p_learned in topics:
+            difficulty = difficulty_for_mastery(p_learned)
+            row = _sample_unanswered(c, user_id, nano_topic_id, difficulty)
+            if row is None:
+                row = _sample_unanswered(c, user_id, nano_topic_id)
+            if row is not None:
+                question = _question_from_row(row)
+                question.update(nano_topic=nano_topic, p_learned=p_learned, target_difficulty=difficulty)
+                return question
+        return None
+    finally:
+        conn.close()
+
+def _sample_unanswered(c, user_id, nano_topic_id, difficulty=None):
+    # Count the candidates, then fetch a single row at a random offset so only
+    # one question is ever materialized.
+    where = """
+        FROM questions q
+        WHERE q.nano_topic_id = ? AND q.is_approved = 1
+        AND (q.difficulty = ? OR ? IS NULL)
+        AND NOT EXISTS (
+            SELECT 1 FROM student_results r
+            WHERE r.student_id = ? AND r.question_id = q.id
+        )
+    """
+    params = (nano_topic_id, difficulty, difficulty, user_id)
+    count = c.execute("SELECT COUNT(*) " + where, params).fetchone()[0]
+    if not count:
+        return None
+    return c.execute(
+        "SELECT q.id, q.question, q.options, q.answer, q.difficulty, q.style " + where + " ORDER BY q.id LIMIT 1 OFFSET ?",
+        params + (random.randrange(count),)
+    ).fetchone()
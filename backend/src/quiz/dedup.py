@@ -0,0 +1,182 @@
+import re
+import sys
+import zlib
+
+import numpy as np
+
+# Similarity above which two questions in the same nano-topic count as duplicates
+DUPLICATE_THRESHOLD = 0.8
+# Words per shingle; short questions make longer shingles too strict
+SHINGLE_SIZE = 2
+NUM_PERMUTATIONS = 64
+
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.RandomState(20240611)  # Fixed seed: stored signatures must stay comparable
+_PERM_A = _rng.randint(1, (1 << 31) - 1, size=NUM_PERMUTATIONS).astype(np.uint64)
+_PERM_B = _rng.randint(0, (1 << 31) - 1, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+
+def normalize_question_text(text):
+    """Lowercase, unify whitespace and drop punctuation, keeping digits and math symbols."""
+    text = (text or "").lower()
+    text = re.sub(r"[^\w\s+\-*/^=<>%.]", " ", text)
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", text)  # Keep decimal points only
+    text = re.sub(r"([+\-*/^=<>%])", r" \1 ", text)
+    return " ".join(text.split())
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Word shingles of the normalized text (the whole text when it is shorter than one shingle)."""
+    words = normalize_question_text(text).split()
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text):
+    """MinHash signature of the question's shingles as a uint32 array."""
+    hashes = np.array([zlib.crc32(s.encode("utf-8")) for s in shingles(text)], dtype=np.uint64)
+    # (a * x + b) mod p for every permutation and shingle; a, x < 2**32 so the product fits
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def signature_similarity(signature, others):
+    """Estimated Jaccard similarity between one signature and each row of `others`."""
+    if len(others) == 0:
+        return np.zeros(0)
+    return (np.asarray(others) == signature).mean(axis=1)
+
+
+class DuplicateIndex:
+    """Per-nano-topic MinHash signatures, backed by the question_signatures table.
+
+    Signatures for a nano-topic are loaded once, on the first check against it.
+    Questions added in the current run are included, so duplicates within one
+    generated batch are caught too.
+    """
+
+    def __init__(self, conn, threshold=DUPLICATE_THRESHOLD):
+        self.conn = conn
+        self.threshold = threshold
+        self._topics = {}
+
+    def _load(self, nano_topic_id):
+        if nano_topic_id not in self._topics:
+            self.backfill(nano_topic_id)
+            rows = self.conn.execute(
+                "SELECT question_id, signature FROM question_signatures WHERE nano_topic_id = ?",
+                (nano_topic_id,)
+            ).fetchall()
+            self._topics[nano_topic_id] = (
+                [row[0] for row in rows],
+                [np.frombuffer(row[1], dtype=np.uint32) for row in rows],
+            )
+        return self._topics[nano_topic_id]
+
+    def backfill(self, nano_topic_id):
+        """Index any questions in the topic that have no signature yet (e.g. inserted before the index existed)."""
+        missing = self.conn.execute("""
+            SELECT q.id, q.question FROM questions q
+            LEFT JOIN question_signatures s ON s.question_id = q.id
+            WHERE q.nano_topic_id = ? AND s.question_id IS NULL
+        """, (nano_topic_id,)).fetchall()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO question_signatures (question_id, nano_topic_id, signature) VALUES (?, ?, ?)",
+            [(qid, nano_topic_id, minhash_signature(text).tobytes()) for qid, text in missing]
+        )
+        return len(missing)
+
+    def find_duplicate(self, nano_topic_id, text):
+        """Return (duplicate_question_id, signature); the ID is None when the question is new.
+
+        A match against a question from this run that is not inserted yet returns -1.
+        """
+        signature = minhash_signature(text)
+        ids, signatures = self._load(nano_topic_id)
+        similarity = signature_similarity(signature, signatures)
+        if len(similarity) and similarity.max() >= self.threshold:
+            return ids[int(similarity.argmax())], signature
+        return None, signature
+
+    def add(self, nano_topic_id, question_id, signature):
+        """Remember a signature; pass question_id=None for a question not inserted yet."""
+        ids, signatures = self._load(nano_topic_id)
+        ids.append(-1 if question_id is None else question_id)
+        signatures.append(signature)
+
+    def store(self, rows):
+        """Persist (question_id, nano_topic_id, signature) rows on the caller's transaction."""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO question_signatures (question_id, nano_topic_id, signature) VALUES (?, ?, ?)",
+            [(qid, topic_id, signature.tobytes()) for qid, topic_id, signature in rows]
+        )
+
+
+def dedupe_question_bank(conn, threshold=DUPLICATE_THRESHOLD, apply=False):
+    """Find near-duplicate questions in each nano-topic and, with apply=True, merge them.
+
+    Within a topic the approved question with the lowest ID is kept. Student
+    results pointing at a duplicate are moved to the kept question before the
+    duplicate and its pre-generated content are deleted. Returns a list of
+    (kept_id, duplicate_id, similarity) tuples.
+    """
+    c = conn.cursor()
+    c.execute("SELECT DISTINCT nano_topic_id FROM questions WHERE nano_topic_id IS NOT NULL")
+    topic_ids = [row[0] for row in c.fetchall()]
+
+    merges = []
+    for topic_id in topic_ids:
+        rows = c.execute("""
+            SELECT id, question FROM questions
+            WHERE nano_topic_id = ?
+            ORDER BY COALESCE(is_approved, 0) DESC, id
+        """, (topic_id,)).fetchall()
+        kept_ids, kept_signatures = [], []
+        for qid, text in rows:
+            signature = minhash_signature(text)
+            similarity = signature_similarity(signature, kept_signatures)
+            if len(similarity) and similarity.max() >= threshold:
+                best = int(similarity.argmax())
+                merges.append((kept_ids[best], qid, float(similarity[best])))
+            else:
+                kept_ids.append(qid)
+                kept_signatures.append(signature)
+
+    if apply and merges:
+        pairs = [(kept_id, duplicate_id) for kept_id, duplicate_id, _ in merges]
+        duplicate_ids = [(duplicate_id,) for _, duplicate_id in pairs]
+        c.executemany("UPDATE student_results SET question_id = ? WHERE question_id = ?", pairs)
+        c.executemany("DELETE FROM question_content WHERE question_id = ?", duplicate_ids)
+        c.executemany("DELETE FROM question_signatures WHERE question_id = ?", duplicate_ids)
+        c.executemany("DELETE FROM questions WHERE id = ?", duplicate_ids)
+        conn.commit()
+
+    if apply:
+        # Make sure every remaining question has an up-to-date signature
+        index = DuplicateIndex(conn, threshold)
+        for topic_id in topic_ids:
+            index.backfill(topic_id)
+        conn.commit()
+    return merges
+
+
+if __name__ == "__main__":
+    # Offline cleanup of the existing bank: dry run unless --apply is given
+    from ..db.pool import get_connection
+
+    threshold = DUPLICATE_THRESHOLD
+    if "--threshold" in sys.argv:
+        threshold = float(sys.argv[sys.argv.index("--threshold") + 1])
+    apply = "--apply" in sys.argv
+    conn = get_connection()
+    try:
+        merges = dedupe_question_bank(conn, threshold=threshold, apply=apply)
+    finally:
+        conn.close()
+    for kept_id, duplicate_id, similarity in merges:
+        print(f"Question {duplicate_id} duplicates {kept_id} (similarity {similarity:.2f})")
+    action = "Merged" if apply else "Found"
+    print(f"{action} {len(merges)} near-duplicate questions.")
+    if merges and not apply:
+        print("Run again with --apply to merge them.")
@@ -0,0 +1,180 @@
+import asyncio
+import os
+import time
+from collections import deque
+
+from ..db.pool import get_connection
+from .async_openai_client import CHAT_MODEL, generate_explanation_async
+from .llm_cache import llm_cache
+
+# Explanations a single student may have waiting before new ones are refused
+MAX_PENDING_PER_STUDENT = int(os.getenv("EXPLANATION_MAX_PENDING", "5"))
+# Seconds a finished ticket is remembered in-process (the text itself stays in llm_cache)
+TICKET_TTL = 15 * 60
+# Shown when an explanation could not be generated
+FAILED_EXPLANATION = "Sorry, an explanation could not be generated at this time."
+
+
+def explanation_ticket(question, student_answer, correct_answer):
+    """Return the ticket for an explanation; identical inputs share one ticket."""
+    # Same key the async client caches the generated text under
+    return llm_cache.make_key(
+        "explanation", CHAT_MODEL, question, student_answer.strip().lower(), correct_answer
+    )
+
+
+class ExplanationService:
+    """Generates wrong-answer explanations in the background.
+
+    Each student has a FIFO queue drained by one worker task, so a student who
+    answers quickly can't flood the LLM. Requests with the same ticket share a
+    single in-flight generation.
+
+    Pending and failed tickets are also written to explanation_tickets and
+    finished text lives in llm_cache, so a poll that lands on another worker
+    process still finds the ticket.
+    """
+
+    def __init__(self, max_pending_per_student=MAX_PENDING_PER_STUDENT):
+        self.max_pending_per_student = max_pending_per_student
+        self._tickets = {}    # ticket -> {"status", "explanation", "updated_at", "done"}
+        self._inflight = {}   # ticket -> asyncio.Task
+        self._queues = {}     # student_id -> deque of (ticket, args)
+        self._workers = {}    # student_id -> asyncio.Task
+
+    async def submit(self, student_id, question, student_answer, correct_answer):
+        """Queue an explanation and return its ticket, or None if the student's queue is full."""
+        ticket = explanation_ticket(question, student_answer, correct_answer)
+        self._prune()
+
+        record = self._tickets.get(ticket)
+        if record and record["status"] in ("pending", "ready"):
+            return ticket
+
+        cached = await llm_cache.aget(ticket)
+        # Another request may have queued the same ticket during the lookup
+        record = self._tickets.get(ticket)
+        if record and record["status"] in ("pending", "ready"):
+            return ticket
+        if cached is not None:
+            self._tickets[ticket] = self._new_record("ready", cached)
+            return ticket
+
+        queue = self._queues.setdefault(student_id, deque())
+        if len(queue) >= self.max_pending_per_student:
+            return None
+
+        self._tickets[ticket] = self._new_record("pending")
+        await self._publish(ticket, "pending")
+        queue.append((ticket, (question, student_answer, correct_answer)))
+        if student_id not in self._workers:
+            self._workers[student_id] = asyncio.create_task(self._drain(student_id))
+        return ticket
+
+    async def get(self, ticket):
+        """Return {"status", "explanation"} for a ticket, or None if it is unknown."""
+        record = self._tickets.get(ticket)
+        if record is None:
+            # Another worker process may have generated it
+            cached = await llm_cache.aget(ticket)
+            if cached is None:
+                # ...or may still be generating it
+                loop = asyncio.get_running_loop()
+                status = await loop.run_in_executor(None, _load_ticket_status, ticket)
+                if status is None:
+                    return None
+                return {"status": status, "explanation": FAILED_EXPLANATION if status == "failed" else None}
+            record = self._tickets.setdefault(ticket, self._new_record("ready", cached))
+        return {"status": record["status"], "explanation": record["explanation"]}
+
+    async def wait(self, ticket, timeout):
+        """Wait up to timeout seconds for a ticket to finish, then return get(ticket)."""
+        record = self._tickets.get(ticket)
+        if record is not None and record["status"] == "pending" and timeout > 0:
+            try:
+                await asyncio.wait_for(asyncio.shield(record["done"].wait()), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        return await self.get(ticket)
+
+    async def _publish(self, ticket, status):
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, _store_ticket_status, ticket, status)
+        except Exception as e:
+            # Polls on this worker still see the in-process record
+            print(f"Could not share explanation ticket status: {str(e)}")
+
+    def _new_record(self, status, explanation=None):
+        done = asyncio.Event()
+        if status != "pending":
+            done.set()
+        return {"status": status, "explanation": explanation, "updated_at": time.time(), "done": done}
+
+    def _prune(self):
+        cutoff = time.time() - TICKET_TTL
+        stale = [t for t, r in self._tickets.items() if r["status"] != "pending" and r["updated_at"] < cutoff]
+        for ticket in stale:
+            del self._tickets[ticket]
+
+    async def _drain(self, student_id):
+        queue = self._queues[student_id]
+        try:
+            while queue:
+                ticket, args = queue.popleft()
+                task = self._inflight.get(ticket)
+                if task is None:
+                    task = self._inflight[ticket] = asyncio.create_task(
+                        generate_explanation_async(*args, raise_errors=True)
+                    )
+                    task.add_done_callback(lambda _t, key=ticket: self._inflight.pop(key, None))
+                try:
+                    explanation = await asyncio.shield(task)
+                    status = "ready"
+                except Exception:
+                    explanation = FAILED_EXPLANATION
+                    status = "failed"
+                await self._publish(ticket, status)
+                record = self._tickets.get(ticket)
+                if record is not None:
+                    record.update(status=status, explanation=explanation, updated_at=time.time())
+                    record["done"].set()
+        finally:
+            self._workers.pop(student_id, None)
+            if not queue:
+                self._queues.pop(student_id, None)
+
+
+def _store_ticket_status(ticket, status):
+    """Share a ticket's status with the other worker processes."""
+    now = time.time()
+    conn = get_connection()
+    try:
+        if status == "ready":
+            # The text itself is in llm_cache
+            conn.execute("DELETE FROM explanation_tickets WHERE ticket = ?", (ticket,))
+        else:
+            conn.execute("""
+                INSERT INTO explanation_tickets (ticket, status, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(ticket) DO UPDATE SET status = excluded.status, updated_at = excluded.updated_at
+            """, (ticket, status, now))
+        conn.execute("DELETE FROM explanation_tickets WHERE updated_at < ?", (now - TICKET_TTL,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _load_ticket_status(ticket):
+    """Return the shared status of a ticket still pending or failed on some worker, or None."""
+    conn = get_connection()
+    try:
+        row = conn.execute(
+            "SELECT status FROM explanation_tickets WHERE ticket = ? AND updated_at >= ?",
+            (ticket, time.time() - TICKET_TTL)
+        ).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+explanation_service = ExplanationService()
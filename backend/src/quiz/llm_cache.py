@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from ..db.pool import get_connection
+
+# --- Cache Settings ---
+# Seconds a generated text stays valid
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))
+# Entries kept in the in-process LRU in front of SQLite
+MEMORY_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "2048"))
+# Rows kept in the SQLite table before the least recently used are evicted
+DB_MAX_ROWS = int(os.getenv("LLM_CACHE_MAX_ROWS", "50000"))
+# Run expiry/size eviction every N writes
+EVICT_EVERY = 200
+# Seconds between checks of the shared invalidation generation, so an
+# invalidation on one worker clears the in-memory LRU of the others
+SYNC_INTERVAL = float(os.getenv("LLM_CACHE_SYNC_INTERVAL", "1.0"))
+
+
+class LLMCache:
+    """Content-addressed cache for generated texts: an LRU in front of a SQLite table.
+
+    invalidate() bumps the generation in llm_cache_generation; every worker
+    compares it at most once per sync_interval and clears its LRU when it
+    has moved.
+    """
+
+    def __init__(self, ttl=CACHE_TTL, memory_max_entries=MEMORY_MAX_ENTRIES, db_max_rows=DB_MAX_ROWS,
+                 sync_interval=SYNC_INTERVAL):
+        self.ttl = ttl
+        self.memory_max_entries = memory_max_entries
+        self.db_max_rows = db_max_rows
+        self.sync_interval = sync_interval
+        self._memory = OrderedDict()  # key -> (content, expires_at)
+        self._lock = threading.Lock()
+        self._generation = None
+        self._last_sync = 0.0
+        self._writes = 0
+        self._touched = {}  # key -> last DB hit time not yet written to last_accessed
+        self._counters = {"memory_hits": 0, "db_hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(kind, *parts):
+        """Hash the kind and prompt inputs into a stable cache key."""
+        payload = json.dumps([kind, *parts], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key, content, expires_at):
+        with self._lock:
+            self._memory[key] = (content, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_max_entries:
+                self._memory.popitem(last=False)
+
+    def _memory_get(self, key, now):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if entry[1] > now:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return entry[0]
+            del self._memory[key]
+        return None
+
+    def _db_get(self, key, now):
+        conn = get_connection()
+        try:
+            row = conn.execute(
+                "SELECT content, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        with self._lock:
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["db_hits"] += 1
+            # last_accessed is written with the next set(), so a read never
+            # takes the write lock
+            self._touched[key] = now
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    def _sync_due(self):
+        return time.time() - self._last_sync >= self.sync_interval
+
+    def _sync(self):
+        """Clear the LRU if another worker invalidated entries since the last check."""
+        self._last_sync = time.time()
+        conn = get_connection()
+        try:
+            generation = conn.execute("SELECT generation FROM llm_cache_generation WHERE id = 1").fetchone()[0]
+        finally:
+            conn.close()
+        with self._lock:
+            if self._generation is not None and generation != self._generation:
+                self._memory.clear()
+            self._generation = generation
+
+    def get(self, key):
+        """Return the cached text for a key, or None on a miss."""
+        if self._sync_due():
+            self._sync()
+        now = time.time()
+        content = self._memory_get(key, now)
+        if content is not None:
+            return content
+        return self._db_get(key, now)
+
+    async def aget(self, key):
+        """get() for async callers; a memory miss reads SQLite in the default executor."""
+        loop = asyncio.get_running_loop()
+        if self._sync_due():
+            await loop.run_in_executor(None, self._sync)
+        now = time.time()
+        content = self._memory_get(key, now)
+        if content is not None:
+            return content
+        return await loop.run_in_executor(None, self._db_get, key, now)
+
+    def set(self, key, kind, content, ttl=None):
+        """Store generated text under a key."""
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        conn = get_connection()
+        try:
+            conn.execute("""
+                INSERT OR REPLACE INTO llm_cache (key, kind, content, created_at, expires_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (key, kind, content, now, expires_at, now))
+            with self._lock:
+                touched, self._touched = self._touched, {}
+            conn.executemany(
+                "UPDATE llm_cache SET last_accessed = ? WHERE key = ?",
+                [(accessed, touched_key) for touched_key, accessed in touched.items()]
+            )
+            conn.commit()
+            with self._lock:
+                self._writes += 1
+                evict = self._writes % EVICT_EVERY == 0
+            if evict:
+                self._evict(conn, now)
+        finally:
+            conn.close()
+        self._remember(key, content, expires_at)
+
+    async def aset(self, key, kind, content, ttl=None):
+        """set() for async callers; the SQLite write runs in the default executor."""
+        await asyncio.get_running_loop().run_in_executor(None, self.set, key, kind, content, ttl)
+
+    def _evict(self, conn, now):
+        c = conn.cursor()
+        c.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        removed = c.rowcount
+        c.execute("""
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM llm_cache ORDER BY last_accessed DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.db_max_rows,))
+        removed += c.rowcount
+        conn.commit()
+        with self._lock:
+            self._counters["evictions"] += removed
+
+    def invalidate(self, key=None, kind=None):
+        """Drop one key, every entry of a kind, or (with no arguments) everything."""
+        conn = get_connection()
+        try:
+            c = conn.cursor()
+            if key is not None:
+                c.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            elif kind is not None:
+                c.execute("DELETE FROM llm_cache WHERE kind = ?", (kind,))
+            else:
+                c.execute("DELETE FROM llm_cache")
+            removed = c.rowcount
+            # Other workers clear their LRU when they see the new generation
+            c.execute("UPDATE llm_cache_generation SET generation = generation + 1 WHERE id = 1")
+            generation = c.execute("SELECT generation FROM llm_cache_generation WHERE id = 1").fetchone()[0]
+            conn.commit()
+        finally:
+            conn.close()
+
+        with self._lock:
+            # Memory entries don't record their kind; dropping them all is cheap
+            self._memory.clear()
+            self._generation = generation
+        return removed
+
+    def stats(self):
+        """Return hit/miss counters and the current LRU size."""
+        with self._lock:
+            counters = dict(self._counters)
+            counters["memory_entries"] = len(self._memory)
+        lookups = counters["memory_hits"] + counters["db_hits"] + counters["misses"]
+        counters["hit_rate"] = (counters["memory_hits"] + counters["db_hits"]) / lookups if lookups else 0.0
+        return counters
+
+
+llm_cache = LLMCache()
@@ -0,0 +1,112 @@
+from .bkt import BKT
+
+
+def record_answer(conn, student_id, nano_topic_id, is_correct, timestamp=None):
+    """Apply one answer to the student's mastery row and return the new p_learned.
+
+    Runs on the caller's connection without committing, so the mastery row and
+    the student_results insert land in the same transaction.
+    """
+    c = conn.cursor()
+    row = c.execute(
+        "SELECT p_learned FROM student_mastery WHERE student_id = ? AND nano_topic_id = ?",
+        (student_id, nano_topic_id)
+    ).fetchone()
+
+    bkt = BKT()
+    if row is not None:
+        bkt.p_learned = row[0]
+    else:
+        # No mastery row yet: continue from the latest logged answer, if any
+        last_result = c.execute(
+            "SELECT p_learned FROM student_results WHERE student_id = ? AND nano_topic_id = ? "
+            "ORDER BY timestamp DESC, id DESC LIMIT 1",
+            (student_id, nano_topic_id)
+        ).fetchone()
+        if last_result is not None and last_result[0] is not None:
+            bkt.p_learned = last_result[0]
+
+    new_p_learned = bkt.update(is_correct)
+    c.execute("""
+        INSERT INTO student_mastery (student_id, nano_topic_id, p_learned, attempts, correct, last_seen)
+        VALUES (?, ?, ?, 1, ?, COALESCE(?, CURRENT_TIMESTAMP))
+        ON CONFLICT(student_id, nano_topic_id) DO UPDATE SET
+            p_learned = excluded.p_learned,
+            attempts = student_mastery.attempts + 1,
+            correct = student_mastery.correct + excluded.correct,
+            last_seen = excluded.last_seen
+    """, (student_id, nano_topic_id, new_p_learned, int(bool(is_correct)), timestamp))
+    return new_p_learned
+
+
+def get_mastery(conn, student_id):
+    """Return the student's mastery rows joined with topic names."""
+    return conn.execute("""
+        SELECT m.nano_topic_id, n.name, m.p_learned, m.attempts, m.correct, m.last_seen
+        FROM student_mastery m
+        JOIN nano_topics n ON n.id = m.nano_topic_id
+        WHERE m.student_id = ?
+        ORDER BY m.nano_topic_id
+    """, (student_id,)).fetchall()
+
+
+def rebuild_mastery(conn, student_id=None):
+    """Recompute student_mastery from the student_results log.
+
+    Replays every answer in order through BKTEngine, for one student or (with
+    no student_id) everyone. Returns the number of mastery rows written.
+    Does not commit, so a migration can run it inside its own transaction.
+    """
+    c = conn.cursor()
+    if student_id is None:
+        c.execute("""
+            SELECT student_id, nano_topic_id, is_correct, timestamp
+            FROM student_results
+            WHERE is_correct IS NOT NULL AND nano_topic_id IS NOT NULL
+            ORDER BY timestamp, id
+        """)
+    else:
+        c.execute("""
+            SELECT student_id, nano_topic_id, is_correct, timestamp
+            FROM student_results
+            WHERE student_id = ? AND is_correct IS NOT NULL AND nano_topic_id IS NOT NULL
+            ORDER BY timestamp, id
+        """, (student_id,))
+    history = c.fetchall()
+
+    # numpy is only needed here, so it stays off the API's import path
+    from .bkt_engine import BKTEngine
+
+    engine = BKTEngine(capacity=max(len(history), 1))
+    engine.update_batch(
+        [row[0] for row in history],
+        [row[1] for row in history],
+        [bool(row[2]) for row in history]
+    )
+    last_seen = {}
+    for sid, topic_id, _, timestamp in history:
+        last_seen[(sid, topic_id)] = timestamp
+
+    rows = [
+        (sid, topic_id, p_learned, attempts, correct, last_seen[(sid, topic_id)])
+        for sid, topic_id, p_learned, attempts, correct in engine.items()
+    ]
+
+    if student_id is None:
+        c.execute("DELETE FROM student_mastery")
+    else:
+        c.execute("DELETE FROM student_mastery WHERE student_id = ?", (student_id,))
+    c.executemany("""
+        INSERT INTO student_mastery (student_id, nano_topic_id, p_learned, attempts, correct, last_seen)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
+    return len(rows)
+
+
+def backfill_mastery(conn):
+    """Build student_mastery from the log the first time it is found empty."""
+    has_mastery = conn.execute("SELECT 1 FROM student_mastery LIMIT 1").fetchone()
+    has_results = conn.execute("SELECT 1 FROM student_results LIMIT 1").fetchone()
+    if has_mastery or not has_results:
+        return 0
+    return rebuild_mastery(conn)
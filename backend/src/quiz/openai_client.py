@@ -1,5 +1,3 @@
-import openai
-from openai import OpenAI
 from dotenv import load_dotenv
 import os
 import json
@@ -7,7 +5,13 @@ import re
 
 # Load environment variables
 load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
+
+
+def _openai_client():
+    # The SDK is imported on first use; it is slow to import and most API
+    # workers never make a synchronous completion
+    from openai import OpenAI
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 def generate_question(subject, topic, difficulty="medium", previous_correct=None):
     """Generate a single question using OpenAI."""
@@ -31,7 +35,7 @@ def generate_question(subject, topic, difficulty="medium", previous_correct=None
     }}
     """
     try:
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = _openai_client()
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
@@ -70,7 +74,7 @@ def generate_question_batch(subject, topic, difficulty="medium", previous_correc
     ]
     """
     try:
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = _openai_client()
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
@@ -88,32 +92,23 @@ def generate_question_batch(subject, topic, difficulty="medium", previous_correc
     except (json.JSONDecodeError, Exception) as e:
         return [{"question": f"Error generating question: {str(e)}", "options": [], "answer": ""}] * batch_size
 
-def generate_explanation(question, student_answer, correct_answer):
-    """Generate explanation for incorrect answer using OpenAI."""
-    if not all([question, student_answer, correct_answer]):
-        return "Invalid input provided."
-    
+# --- Prompt builders (shared with async_openai_client) ---
+
+def build_explanation_messages(question, student_answer, correct_answer):
+    """Build the chat messages for a wrong-answer explanation."""
     prompt = f"""
     You are an educational assistant. Provide a concise explanation for why the student's answer is incorrect and suggest a next step.
     Question: {question}
     Student's answer: {student_answer}
     Correct answer: {correct_answer}
     """
-    try:
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an educational assistant."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"Error generating explanation: {str(e)}"
+    return [
+        {"role": "system", "content": "You are an educational assistant."},
+        {"role": "user", "content": prompt}
+    ]
 
-def generate_hint(question, options, answer, nano_topic):
-    """Generate a helpful hint for a question without giving away the answer."""
+def build_hint_messages(question, options, answer, nano_topic):
+    """Build the chat messages for a question hint."""
     prompt = f"""
     You are an educational assistant helping IGCSE Mathematics students. Generate a helpful hint for this question without revealing the answer directly.
     
@@ -129,22 +124,13 @@ def generate_hint(question, options, answer, nano_topic):
     
     Keep the hint concise (2-3 sentences max).
     """
-    try:
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an educational assistant specializing in IGCSE Mathematics."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=150
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        return f"Error generating hint: {str(e)}"
+    return [
+        {"role": "system", "content": "You are an educational assistant specializing in IGCSE Mathematics."},
+        {"role": "user", "content": prompt}
+    ]
 
-def generate_mini_lesson(nano_topic, question, correct_answer):
-    """Generate a mini-lesson for the nano-topic based on the current question."""
+def build_mini_lesson_messages(nano_topic, question, correct_answer):
+    """Build the chat messages for a nano-topic mini-lesson."""
     prompt = f"""
     You are an educational assistant for IGCSE Mathematics students. Create a brief mini-lesson on the nano-topic '{nano_topic}'.
     
@@ -159,14 +145,61 @@ def generate_mini_lesson(nano_topic, question, correct_answer):
     
     Keep it concise but comprehensive (under 200 words). Use clear formatting with bullet points where appropriate.
     """
+    return [
+        {"role": "system", "content": "You are an educational assistant specializing in IGCSE Mathematics."},
+        {"role": "user", "content": prompt}
+    ]
+
+def build_actionable_steps_messages(nano_topic, p_learned):
+    """Build the chat messages for parent actionable steps."""
+    prompt = f"""
+    You are an educational assistant. Generate 2-3 actionable steps for parents to help a grade 10-12 student improve in the IGCSE Mathematics nano-topic '{nano_topic}' (current mastery: {p_learned*100:.1f}%).
+    Focus on simple, home-based activities that reinforce the concept without requiring advanced tools.
+    Example for 'Factoring Quadratics':
+    - Practice factoring with household items: e.g., split 12 candies into two groups to represent factors of 12.
+    - Watch a 5-minute YouTube video on factoring trinomials and discuss one example together.
+    - Solve 3 simple factoring problems (e.g., x^2 + 5x + 6) on paper with parental guidance.
+    """
+    return [
+        {"role": "system", "content": "You are an educational assistant generating actionable steps."},
+        {"role": "user", "content": prompt}
+    ]
+
+def generate_explanation(question, student_answer, correct_answer):
+    """Generate explanation for incorrect answer using OpenAI."""
+    if not all([question, student_answer, correct_answer]):
+        return "Invalid input provided."
+    
     try:
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = _openai_client()
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an educational assistant specializing in IGCSE Mathematics."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=build_explanation_messages(question, student_answer, correct_answer)
+        )
+        return response.choices[0].message.content
+    except Exception as e:
+        return f"Error generating explanation: {str(e)}"
+
+def generate_hint(question, options, answer, nano_topic):
+    """Generate a helpful hint for a question without giving away the answer."""
+    try:
+        client = _openai_client()
+        response = client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=build_hint_messages(question, options, answer, nano_topic),
+            max_tokens=150
+        )
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        return f"Error generating hint: {str(e)}"
+
+def generate_mini_lesson(nano_topic, question, correct_answer):
+    """Generate a mini-lesson for the nano-topic based on the current question."""
+    try:
+        client = _openai_client()
+        response = client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=build_mini_lesson_messages(nano_topic, question, correct_answer),
             max_tokens=300
         )
         return response.choices[0].message.content.strip()
@@ -185,7 +218,7 @@ def generate_parent_report(strengths, weaknesses, points, badge):
     Provide specific topics and actionable next steps in English.
     """
     try:
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = _openai_client()
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
@@ -199,22 +232,11 @@ def generate_parent_report(strengths, weaknesses, points, badge):
     
 def generate_actionable_steps(nano_topic, p_learned):
     """Generate actionable steps for parents to help improve a student's nano-topic."""
-    prompt = f"""
-    You are an educational assistant. Generate 2-3 actionable steps for parents to help a grade 10-12 student improve in the IGCSE Mathematics nano-topic '{nano_topic}' (current mastery: {p_learned*100:.1f}%).
-    Focus on simple, home-based activities that reinforce the concept without requiring advanced tools.
-    Example for 'Factoring Quadratics':
-    - Practice factoring with household items: e.g., split 12 candies into two groups to represent factors of 12.
-    - Watch a 5-minute YouTube video on factoring trinomials and discuss one example together.
-    - Solve 3 simple factoring problems (e.g., x^2 + 5x + 6) on paper with parental guidance.
-    """
     try:
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = _openai_client()
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an educational assistant generating actionable steps."},
-                {"role": "user", "content": prompt}
-            ]
+            messages=build_actionable_steps_messages(nano_topic, p_learned)
         )
         return response.choices[0].message.content
     except Exception as e:
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+
+from ..db.pool import get_connection
+from .async_openai_client import generate_actionable_steps_async, mastery_bucket
+
+# --- Weekly Report Settings ---
+# Stored reports younger than this are served as-is by /analytics/parent-report
+REPORT_MAX_AGE = float(os.getenv("PARENT_REPORT_MAX_AGE", str(24 * 3600)))
+# Seconds between runs of the precompute job started with the API
+REPORT_JOB_INTERVAL = float(os.getenv("PARENT_REPORT_JOB_INTERVAL", str(24 * 3600)))
+# Start the precompute job with the API (disable on all but one worker process)
+REPORT_JOB_ENABLED = os.getenv("PARENT_REPORT_JOB", "1") == "1"
+# Weak topics per student that get actionable steps
+MAX_ACTIONABLE_TOPICS = 3
+# Students whose reports the precompute job builds, generates and stores at a time
+REPORT_JOB_BATCH_SIZE = int(os.getenv("PARENT_REPORT_JOB_BATCH_SIZE", "100"))
+# Student IDs bound per IN (...) query, well under SQLite's bound-variable limit
+LOAD_CHUNK_SIZE = 500
+# Shown in place of steps that could not be generated
+FAILED_STEPS = "Actionable steps could not be generated at this time."
+
+
+def build_student_report(conn, student_id, student_name):
+    """Summarize the student's last 7 days; returns (report, weaknesses needing steps)."""
+    c = conn.cursor()
+    c.execute("""
+        SELECT
+            n.name,
+            sr.is_correct,
+            sr.p_learned,
+            sr.timestamp
+        FROM student_results sr
+        JOIN nano_topics n ON sr.nano_topic_id = n.id
+        WHERE sr.student_id = ? AND sr.timestamp >= date('now', '-7 days')
+        ORDER BY sr.timestamp DESC
+    """, (student_id,))
+
+    recent_results = c.fetchall()
+
+    # Analyze strengths and weaknesses
+    topic_performance = {}
+    for topic, is_correct, p_learned, timestamp in recent_results:
+        if topic not in topic_performance:
+            topic_performance[topic] = {"correct": 0, "total": 0, "mastery": p_learned}
+        topic_performance[topic]["total"] += 1
+        if is_correct:
+            topic_performance[topic]["correct"] += 1
+
+    strengths = [topic for topic, perf in topic_performance.items()
+                 if perf["correct"] / perf["total"] >= 0.8]
+    weaknesses = [{"topic": topic, "mastery": perf["mastery"]}
+                  for topic, perf in topic_performance.items()
+                  if perf["correct"] / perf["total"] < 0.6]
+
+    report = {
+        "student_name": student_name,
+        "strengths": strengths,
+        "weaknesses": [w["topic"] for w in weaknesses],
+        "actionable_steps": [],
+        "total_questions": len(recent_results),
+        "accuracy": sum(1 for _, is_correct, _, _ in recent_results if is_correct) / len(recent_results) * 100 if recent_results else 0
+    }
+    return report, weaknesses[:MAX_ACTIONABLE_TOPICS]
+
+
+async def add_actionable_steps(reports):
+    """Fill in actionable steps for (report, weaknesses) pairs with all generations in flight at once.
+
+    Steps are cached per (nano_topic, mastery bucket), so each distinct pair is
+    requested once and most return from the cache; concurrency is bounded by
+    the client's semaphore. Returns, per report, whether all of its steps
+    were generated.
+    """
+    jobs = [(report, weakness) for report, weaknesses in reports for weakness in weaknesses]
+    mastery_by_key = {}
+    for _, weakness in jobs:
+        mastery_by_key.setdefault((weakness["topic"], mastery_bucket(weakness["mastery"])), weakness["mastery"])
+    results = await asyncio.gather(*(
+        generate_actionable_steps_async(topic, mastery, raise_errors=True)
+        for (topic, _), mastery in mastery_by_key.items()
+    ), return_exceptions=True)
+    steps = dict(zip(mastery_by_key, results))
+    for key, result in steps.items():
+        if isinstance(result, BaseException):
+            print(f"Error generating actionable steps for {key[0]}: {str(result)}")
+    complete = []
+    for report, weaknesses in reports:
+        ok = True
+        for weakness in weaknesses:
+            result = steps[(weakness["topic"], mastery_bucket(weakness["mastery"]))]
+            if isinstance(result, BaseException):
+                ok = False
+                result = FAILED_STEPS
+            report["actionable_steps"].append({"topic": weakness["topic"], "steps": result})
+        complete.append(ok)
+    return complete
+
+
+def load_stored_reports(conn, student_ids, max_age=REPORT_MAX_AGE):
+    """Return {student_id: report} for stored reports younger than max_age seconds."""
+    cutoff = time.time() - max_age
+    reports = {}
+    for start in range(0, len(student_ids), LOAD_CHUNK_SIZE):
+        chunk = student_ids[start:start + LOAD_CHUNK_SIZE]
+        placeholders = ",".join("?" * len(chunk))
+        rows = conn.execute(f"""
+            SELECT student_id, report FROM student_weekly_reports
+            WHERE student_id IN ({placeholders}) AND generated_at >= ?
+        """, (*chunk, cutoff)).fetchall()
+        reports.update((student_id, json.loads(report)) for student_id, report in rows)
+    return reports
+
+
+def store_reports(conn, reports_by_student):
+    """Save {student_id: report}, replacing each student's previous report."""
+    now = time.time()
+    conn.executemany("""
+        INSERT INTO student_weekly_reports (student_id, report, generated_at)
+        VALUES (?, ?, ?)
+        ON CONFLICT(student_id) DO UPDATE SET
+            report = excluded.report,
+            generated_at = excluded.generated_at
+    """, [
+        (student_id, json.dumps(report), now)
+        for student_id, report in reports_by_student.items()
+    ])
+    conn.commit()
+
+
+def _build_drafts(students):
+    conn = get_connection()
+    try:
+        return [(student_id, build_student_report(conn, student_id, name)) for student_id, name in students]
+    finally:
+        # Hand the connection back before awaiting the LLM
+        conn.close()
+
+
+def _store(reports):
+    conn = get_connection()
+    try:
+        store_reports(conn, reports)
+    finally:
+        conn.close()
+
+
+async def generate_reports(students, in_executor=False):
+    """Build and store fresh reports for [(student_id, username)]; returns {student_id: report}.
+
+    With in_executor, the database work runs in the default executor so a
+    long batch does not hold up the event loop.
+    """
+    if not students:
+        return {}
+    loop = asyncio.get_running_loop()
+    if in_executor:
+        drafts = await loop.run_in_executor(None, _build_drafts, students)
+    else:
+        drafts = _build_drafts(students)
+
+    complete = await add_actionable_steps([draft for _, draft in drafts])
+    reports = {student_id: report for student_id, (report, _) in drafts}
+    # Reports whose steps failed are served but not stored, so the next
+    # request or job run retries them
+    to_store = {student_id: reports[student_id] for (student_id, _), ok in zip(drafts, complete) if ok}
+
+    if in_executor:
+        await loop.run_in_executor(None, _store, to_store)
+    else:
+        _store(to_store)
+    return reports
+
+
+def _students_needing_reports(force, max_age):
+    conn = get_connection()
+    try:
+        # Linked students without a report younger than max_age (all of them when forced)
+        return conn.execute("""
+            SELECT u.id, u.username
+            FROM users u
+            LEFT JOIN student_weekly_reports swr ON swr.student_id = u.id
+            WHERE u.id IN (SELECT student_id FROM parent_child_links)
+            AND (? OR swr.generated_at IS NULL OR swr.generated_at < ?)
+        """, (force, time.time() - max_age)).fetchall()
+    finally:
+        conn.close()
+
+
+async def precompute_weekly_reports(force=False, max_age=REPORT_JOB_INTERVAL):
+    """Regenerate the stored reports of students linked to a parent.
+
+    Reports younger than max_age are kept unless force is set, so a restart
+    does not redo a run that just finished.
+    """
+    loop = asyncio.get_running_loop()
+    students = await loop.run_in_executor(None, _students_needing_reports, force, max_age)
+    generated = 0
+    # Batches keep each executor hop short and store finished reports as they go
+    for start in range(0, len(students), REPORT_JOB_BATCH_SIZE):
+        reports = await generate_reports(students[start:start + REPORT_JOB_BATCH_SIZE], in_executor=True)
+        generated += len(reports)
+    print(f"[{datetime.now().isoformat()}] Precomputed {generated} weekly parent reports.")
+    return generated
+
+
+async def run_report_job(interval=REPORT_JOB_INTERVAL):
+    """Precompute the weekly reports every `interval` seconds until cancelled."""
+    while True:
+        try:
+            await precompute_weekly_reports()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Weekly parent report job failed: {str(e)}")
+        await asyncio.sleep(interval)
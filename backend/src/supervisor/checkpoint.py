@@ -0,0 +1,72 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class ValidationCheckpoint:
+    """Records which questions a supervisor run has finished, so a crashed run can resume.
+
+    Progress is stored as a watermark (every question ID up to it is done) plus
+    the finished IDs above it, since concurrent batches complete out of order.
+    The file is replaced atomically after every batch and deleted when the run
+    completes. A checkpoint is only resumed by a run with the same run key
+    (mode and validator version); any other run starts over.
+    """
+
+    def __init__(self, path, run_key):
+        self.path = path
+        self.run_key = run_key
+        self.watermark = 0
+        self.done_ids = set()
+        self.started_at = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Load an existing checkpoint; returns True when there was one to resume."""
+        if not os.path.exists(self.path):
+            self.started_at = datetime.now().isoformat()
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("run_key") != self.run_key:
+            print(f"  -> Discarding checkpoint of a different run ({data.get('run_key')}).")
+            self.clear()
+            self.started_at = datetime.now().isoformat()
+            return False
+        self.watermark = data.get("watermark", 0)
+        self.done_ids = set(data.get("done_ids", []))
+        self.started_at = data.get("started_at")
+        return True
+
+    def is_done(self, question_id):
+        return question_id <= self.watermark or question_id in self.done_ids
+
+    def mark_done(self, question_ids, pending_ids):
+        """Record finished IDs; pending_ids are the IDs still queued or in flight."""
+        with self._lock:
+            self.done_ids.update(question_ids)
+            # Everything below the smallest outstanding ID is finished
+            floor = min(pending_ids) - 1 if pending_ids else max(self.done_ids, default=self.watermark)
+            if floor > self.watermark:
+                self.watermark = floor
+                self.done_ids = {qid for qid in self.done_ids if qid > floor}
+            self._save()
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "run_key": self.run_key,
+                "started_at": self.started_at,
+                "updated_at": datetime.now().isoformat(),
+                "watermark": self.watermark,
+                "done_ids": sorted(self.done_ids),
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Delete the checkpoint after a completed run."""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
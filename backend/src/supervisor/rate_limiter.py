@@ -0,0 +1,60 @@
+import random
+import threading
+import time
+
+
+class TokenBucketLimiter:
+    """Thread-safe limiter for requests-per-minute and tokens-per-minute budgets.
+
+    Both budgets refill continuously. acquire() only blocks the calling worker,
+    so other workers keep going as long as there is budget left.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.request_capacity = float(requests_per_minute)
+        self.token_capacity = float(tokens_per_minute)
+        self._requests = self.request_capacity
+        self._tokens = self.token_capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.request_capacity, self._requests + elapsed * self.request_capacity / 60.0)
+        self._tokens = min(self.token_capacity, self._tokens + elapsed * self.token_capacity / 60.0)
+
+    def acquire(self, tokens=0):
+        """Wait until one request and `tokens` tokens are available, then take them."""
+        # A single request larger than the whole budget would otherwise wait forever
+        tokens = min(float(tokens), self.token_capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self._requests) * 60.0 / self.request_capacity,
+                    (tokens - self._tokens) * 60.0 / self.token_capacity,
+                )
+            time.sleep(max(wait, 0.01))
+
+    def penalize(self, seconds):
+        """Drain the buckets after a rate-limit response so every worker slows down."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._requests -= seconds * self.request_capacity / 60.0
+            self._tokens -= seconds * self.token_capacity / 60.0
+
+
+def backoff_delay(attempt, base=2.0, cap=60.0):
+    """Full-jitter exponential backoff: a random delay in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def estimate_tokens(text):
+    """Rough token count for budgeting (about four characters per token)."""
+    return len(text) // 4 + 1
@@ -1,30 +1,63 @@
-import sqlite3
+import hashlib
 import json
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from datetime import datetime
-from openai import OpenAI
+
+from ..db.pool import get_connection
 
 # Import configuration from supervisor_config.py
-from .supervisor_config import DATABASE_PATH, OPENAI_API_KEY, VALIDATION_MODEL, BATCH_SIZE
+from .supervisor_config import (
+    DATABASE_PATH, OPENAI_API_KEY, VALIDATION_MODEL, CONTENT_MODEL, PREGEN_WORKERS,
+    VALIDATION_WORKERS, VALIDATION_REQUESTS_PER_MINUTE, VALIDATION_TOKENS_PER_MINUTE,
+    VALIDATION_OUTPUT_TOKENS_PER_QUESTION, BACKOFF_BASE, BACKOFF_MAX, CHECKPOINT_FILE,
+    VALIDATOR_REVISION, STREAM_PAGE_SIZE, WRITER_COMMIT_EVERY,
+    BATCH_TOKEN_BUDGET, MAX_BATCH_QUESTIONS, MAX_SPLIT_DEPTH
+)
+from .rate_limiter import TokenBucketLimiter, backoff_delay, estimate_tokens
+from .checkpoint import ValidationCheckpoint
+from ..quiz.openai_client import build_hint_messages, build_mini_lesson_messages
+
+def iter_questions_for_validation(full=True, after_id=0, page_size=STREAM_PAGE_SIZE):
+    """Yields questions in ID order, reading one keyset page (q.id > last ID) at a time.
 
-def get_all_questions_for_validation():
-    """Fetches all questions from the database."""
-    conn = sqlite3.connect(DATABASE_PATH)
+    With full=False only questions that are new, edited since validation, or
+    validated by an older validator are yielded.
+    """
+    conn = get_connection(DATABASE_PATH)
     c = conn.cursor()
-    c.execute("""
-        SELECT q.id, q.question, q.options, q.answer, q.difficulty, q.style, n.name as nano_topic
-        FROM questions q
-        JOIN nano_topics n ON q.nano_topic_id = n.id
-    """)
-    questions = c.fetchall()
-    conn.close()
-    return questions
+    last_id = after_id
+    try:
+        while True:
+            c.execute("""
+                SELECT q.id, q.question, q.options, q.answer, q.difficulty, q.style, n.name as nano_topic,
+                       q.content_hash, q.validator_version, q.validated_at
+                FROM questions q
+                JOIN nano_topics n ON q.nano_topic_id = n.id
+                WHERE q.id > ?
+                ORDER BY q.id
+                LIMIT ?
+            """, (last_id, page_size))
+            page = c.fetchall()
+            if not page:
+                return
+            last_id = page[-1][0]
+            for row in page:
+                if full or _needs_validation(row):
+                    yield row[:7]
+    finally:
+        conn.close()
+
+def _needs_validation(row):
+    content_hash, validator_version, validated_at = row[7:]
+    return (validated_at is None or validator_version != VALIDATOR_VERSION
+            or content_hash != question_content_hash(row[1], row[2], row[3], row[5]))
 
 # --- NEW: Function to fix legacy missing rejection reasons ---
 def fix_missing_rejection_reasons():
     """Updates existing questions where is_approved=0 but rejection_reason is missing."""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = get_connection(DATABASE_PATH)
     c = conn.cursor()
     c.execute("""
         UPDATE questions
@@ -36,34 +69,7 @@ def fix_missing_rejection_reasons():
     conn.close()
     print(f"[{datetime.now().isoformat()}] Fixed {affected} questions with missing rejection reasons.")
 
-def validate_question_batch_with_openai(question_batch, max_retries=3):
-    """Uses the OpenAI API to validate a batch of questions, with retries for network errors."""
-    client = OpenAI(api_key=OPENAI_API_KEY)
-
-    # If batch is too large and we're getting errors, try smaller batches
-    if len(question_batch) > 5:
-        print(f"  -> Large batch of {len(question_batch)} questions, using careful validation mode...")
-
-    formatted_questions = []
-    for q in question_batch:
-        question_id, question_text, options_json, correct_answer, difficulty, style, nano_topic = q
-        try:
-            options = json.loads(options_json) if options_json else []
-        except (json.JSONDecodeError, TypeError):
-            options = []
-
-        formatted_questions.append({
-            "question_id": question_id,
-            "topic": nano_topic,
-            "question": question_text,
-            "style": style,
-            "difficulty": difficulty,
-            "options": options,
-            "provided_answer": correct_answer
-        })
-
-    # --- IMPROVED: Much more careful and accurate validation prompt ---
-    prompt = """
+VALIDATION_PROMPT_TEMPLATE = """
     You are a highly skilled IGCSE Mathematics examiner with expertise in mathematical problem-solving. Your primary responsibility is to accurately validate mathematical questions and their answers.
 
     **CRITICAL INSTRUCTIONS:**
@@ -129,14 +135,87 @@ def validate_question_batch_with_openai(question_batch, max_retries=3):
     }}
     
     Validate exactly {} questions and return results for all of them.
-    """.format(len(formatted_questions), json.dumps(formatted_questions, indent=2), len(formatted_questions))
+    """
+
+VALIDATION_SYSTEM_PROMPT = "You are a highly skilled IGCSE Mathematics examiner. You must be extremely careful with mathematical calculations and only reject questions with genuine errors. Always double-check your arithmetic before making decisions. Respond only in the specified JSON format."
+
+# Changes whenever the model or prompts change, so questions checked by an
+# older validator are picked up again by the next incremental run.
+VALIDATOR_VERSION = "{}:{}".format(VALIDATOR_REVISION, hashlib.sha256(
+    (VALIDATION_MODEL + VALIDATION_SYSTEM_PROMPT + VALIDATION_PROMPT_TEMPLATE).encode("utf-8")
+).hexdigest()[:12])
+
+def question_content_hash(question_text, options_json, correct_answer, style):
+    """Hash of the fields the supervisor validates; changes when the question is edited."""
+    try:
+        options = json.loads(options_json) if options_json else []
+    except (json.JSONDecodeError, TypeError):
+        options = options_json
+    payload = json.dumps([question_text, options, correct_answer, style], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def format_question_for_validation(question_row):
+    """Turns a question row into the dict sent to the validator."""
+    question_id, question_text, options_json, correct_answer, difficulty, style, nano_topic = question_row
+    try:
+        options = json.loads(options_json) if options_json else []
+    except (json.JSONDecodeError, TypeError):
+        options = []
+
+    return {
+        "question_id": question_id,
+        "topic": nano_topic,
+        "question": question_text,
+        "style": style,
+        "difficulty": difficulty,
+        "options": options,
+        "provided_answer": correct_answer
+    }
+
+def estimate_question_tokens(question_row):
+    """Estimated prompt plus response tokens one question adds to a batch."""
+    formatted = json.dumps(format_question_for_validation(question_row), indent=2)
+    return estimate_tokens(formatted) + VALIDATION_OUTPUT_TOKENS_PER_QUESTION
+
+def _openai_client():
+    # Imported on first use so loading this module stays cheap
+    from openai import OpenAI
+    return OpenAI(api_key=OPENAI_API_KEY)
+
+def _failed_results(question_batch, reason):
+    # api_error results are stored but not stamped as validated, so they are retried
+    return [{"question_id": q[0], "is_valid": False, "rejection_reason": reason, "api_error": True} for q in question_batch]
+
+def validate_question_batch_with_openai(question_batch, max_retries=3, client=None, limiter=None):
+    """Uses the OpenAI API to validate a batch of questions, with retries for network errors.
+
+    A shared client and rate limiter can be passed in by concurrent callers.
+    """
+    if client is None:
+        client = _openai_client()
+
+    # If batch is too large and we're getting errors, try smaller batches
+    if len(question_batch) > 5:
+        print(f"  -> Large batch of {len(question_batch)} questions, using careful validation mode...")
+
+    formatted_questions = [format_question_for_validation(q) for q in question_batch]
+
+    # --- IMPROVED: Much more careful and accurate validation prompt ---
+    prompt = VALIDATION_PROMPT_TEMPLATE.format(len(formatted_questions), json.dumps(formatted_questions, indent=2), len(formatted_questions))
+
+    estimated_tokens = (
+        estimate_tokens(VALIDATION_SYSTEM_PROMPT + prompt)
+        + VALIDATION_OUTPUT_TOKENS_PER_QUESTION * len(question_batch)
+    )
 
     for attempt in range(max_retries):
         try:
+            if limiter is not None:
+                limiter.acquire(estimated_tokens)
             response = client.chat.completions.create(
                 model=VALIDATION_MODEL,
                 messages=[
-                    {"role": "system", "content": "You are a highly skilled IGCSE Mathematics examiner. You must be extremely careful with mathematical calculations and only reject questions with genuine errors. Always double-check your arithmetic before making decisions. Respond only in the specified JSON format."},
+                    {"role": "system", "content": VALIDATION_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 response_format={"type": "json_object"},
@@ -154,9 +233,9 @@ def validate_question_batch_with_openai(question_batch, max_retries=3):
                     if len(results_list) == len(question_batch):
                         return results_list
                     else:
-                        print(f"  -! BATCH FAILED: Expected {len(question_batch)} results, got {len(results_list)}")
-                        print("  -! RAW RESPONSE:", validation_results)
-                        return [{"question_id": q[0], "is_valid": False, "rejection_reason": "Incomplete batch response from supervisor API."} for q in question_batch]
+                        # Partial results; validate_batch_adaptive retries the missing IDs
+                        print(f"  -! INCOMPLETE BATCH: Expected {len(question_batch)} results, got {len(results_list)}")
+                        return results_list
                 
                 # Handle case where API returns a single result instead of batch
                 elif "question_id" in validation_results:
@@ -165,17 +244,8 @@ def validate_question_batch_with_openai(question_batch, max_retries=3):
                     # Try to find which question this result belongs to
                     question_id = validation_results.get("question_id")
                     matching_questions = [q for q in question_batch if q[0] == question_id]
-                    if matching_questions:
-                        # Return this single result and mark others as failed
-                        results = []
-                        for q in question_batch:
-                            if q[0] == question_id:
-                                results.append(validation_results)
-                            else:
-                                results.append({"question_id": q[0], "is_valid": False, "rejection_reason": "API failed to process this question in batch."})
-                        return results
-                    else:
-                        return [{"question_id": q[0], "is_valid": False, "rejection_reason": "API returned result for wrong question ID."} for q in question_batch]
+                    # The other questions are retried by validate_batch_adaptive
+                    return [validation_results] if matching_questions else []
                 
                 # Check for other possible formats
                 else:
@@ -184,35 +254,101 @@ def validate_question_batch_with_openai(question_batch, max_retries=3):
                             return validation_results[key]
                     print("  -! BATCH FAILED: API returned a JSON object but no valid results array found.")
                     print("  -! RAW RESPONSE:", validation_results)
-                    return [{"question_id": q[0], "is_valid": False, "rejection_reason": "Supervisor API returned an invalid object format."} for q in question_batch]
+                    return _failed_results(question_batch, "Supervisor API returned an invalid object format.")
             
             elif isinstance(validation_results, list):
                 # Direct array response - check if it has the right number of results
                 if len(validation_results) == len(question_batch):
                     return validation_results
                 else:
-                    print(f"  -! BATCH FAILED: Expected {len(question_batch)} results, got {len(validation_results)}")
-                    print("  -! RAW RESPONSE:", validation_results)
-                    return [{"question_id": q[0], "is_valid": False, "rejection_reason": "Incomplete batch response from supervisor API."} for q in question_batch]
+                    print(f"  -! INCOMPLETE BATCH: Expected {len(question_batch)} results, got {len(validation_results)}")
+                    return validation_results
 
             else:
                 print("  -! BATCH FAILED: API returned an unexpected format.")
                 print("  -! RAW RESPONSE:", validation_results)
-                return [{"question_id": q[0], "is_valid": False, "rejection_reason": "Supervisor API returned a non-JSON format."} for q in question_batch]
+                return _failed_results(question_batch, "Supervisor API returned a non-JSON format.")
 
         except Exception as e:
             print(f"  -! BATCH FAILED (Attempt {attempt + 1}/{max_retries}): {str(e)}")
             if attempt < max_retries - 1:
-                time.sleep(5 * (attempt + 1))
+                delay = backoff_delay(attempt, BACKOFF_BASE, BACKOFF_MAX)
+                if limiter is not None and getattr(e, "status_code", None) == 429:
+                    # Rate limited: slow every worker down, not just this one
+                    limiter.penalize(delay)
+                # Only this worker sleeps; the others keep validating
+                time.sleep(delay)
             else:
-                return [{"question_id": q[0], "is_valid": False, "rejection_reason": f"API failed after {max_retries} attempts."} for q in question_batch]
+                return _failed_results(question_batch, f"API failed after {max_retries} attempts.")
+
+def validate_batch_adaptive(question_batch, client=None, limiter=None, depth=0):
+    """Validates a batch and re-validates only the questions missing from the response.
+
+    Missing questions are split in half and retried, up to MAX_SPLIT_DEPTH
+    levels; anything still missing is marked as an API error so the next run
+    picks it up again.
+    """
+    results = validate_question_batch_with_openai(question_batch, client=client, limiter=limiter) or []
+    by_id = {}
+    batch_ids = {q[0] for q in question_batch}
+    for result in results:
+        if not isinstance(result, dict):
+            continue
+        question_id = result.get("question_id")
+        if isinstance(question_id, str) and question_id.isdigit():
+            question_id = int(question_id)
+            result["question_id"] = question_id
+        if question_id in batch_ids:
+            by_id[question_id] = result
+
+    missing = [q for q in question_batch if q[0] not in by_id]
+    if missing and depth < MAX_SPLIT_DEPTH:
+        print(f"  -> Retrying {len(missing)} missing question(s) from batch {question_batch[0][0]}-{question_batch[-1][0]}...")
+        half = max(1, (len(missing) + 1) // 2)
+        for part in (missing[:half], missing[half:]):
+            if part:
+                for result in validate_batch_adaptive(part, client=client, limiter=limiter, depth=depth + 1):
+                    by_id[result["question_id"]] = result
+        missing = [q for q in question_batch if q[0] not in by_id]
+
+    for result in _failed_results(missing, "Incomplete batch response from supervisor API."):
+        by_id[result["question_id"]] = result
+    return [by_id[q[0]] for q in question_batch]
 
-def update_question_batch_status(validation_results):
-    """Updates the status of a batch of questions in the database."""
-    conn = sqlite3.connect(DATABASE_PATH)
+def iter_token_batches(rows, token_budget, max_questions):
+    """Packs a stream of questions into batches that fit an estimated token budget.
+
+    A question larger than the budget on its own still gets a batch of one.
+    """
+    batch = []
+    batch_tokens = 0
+    for row in rows:
+        tokens = estimate_question_tokens(row)
+        if batch and (batch_tokens + tokens > token_budget or len(batch) >= max_questions):
+            yield batch
+            batch = []
+            batch_tokens = 0
+        batch.append(row)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+def update_question_batch_status(validation_results, content_hashes=None, conn=None):
+    """Updates the status of a batch of questions in the database.
+
+    content_hashes maps question IDs to the hash of the content that was
+    validated; those questions are stamped with the validator version. When
+    a connection is passed in, the caller owns the commit.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection(DATABASE_PATH)
     c = conn.cursor()
 
+    content_hashes = content_hashes or {}
+    validated_at = datetime.now().isoformat()
     update_data = []
+    stamp_data = []
     for result in validation_results:
         if result.get('question_id') is not None:
             is_valid = result.get('is_valid', False)
@@ -226,9 +362,14 @@ def update_question_batch_status(validation_results):
                 rejection_reason = None
             
             update_data.append((1 if is_valid else 0, rejection_reason, result['question_id']))
+            content_hash = content_hashes.get(result['question_id'])
+            if content_hash is not None and not result.get('api_error'):
+                stamp_data.append((content_hash, VALIDATOR_VERSION, validated_at, result['question_id']))
     
     if not update_data:
         print("  -> No valid data to update in this batch.")
+        if own_conn:
+            conn.close()
         return
 
     c.executemany("""
@@ -236,52 +377,271 @@ def update_question_batch_status(validation_results):
         SET is_approved = ?, rejection_reason = ?
         WHERE id = ?
     """, update_data)
+    # A hint or lesson generated from an earlier version of an edited question
+    # is dropped before the new hash is stamped; pre-generation redoes it.
+    # Questions never stamped before keep theirs, as there is nothing to compare.
+    c.executemany("""
+        DELETE FROM question_content
+        WHERE question_id = ? AND EXISTS (
+            SELECT 1 FROM questions
+            WHERE id = ? AND content_hash IS NOT NULL AND content_hash != ?
+        )
+    """, [(question_id, question_id, content_hash) for content_hash, _, _, question_id in stamp_data])
+    c.executemany("""
+        UPDATE questions
+        SET content_hash = ?, validator_version = ?, validated_at = ?
+        WHERE id = ?
+    """, stamp_data)
     
-    conn.commit()
-    conn.close()
+    if own_conn:
+        conn.commit()
+        conn.close()
+
+class ValidationWriter:
+    """Single long-lived connection that writes validation results with grouped commits.
+
+    The checkpoint only advances once a group has been committed, so a crash
+    never records questions whose results were lost.
+    """
+
+    def __init__(self, checkpoint, commit_every=WRITER_COMMIT_EVERY):
+        self.checkpoint = checkpoint
+        self.commit_every = commit_every
+        self.conn = get_connection(DATABASE_PATH)
+        self._uncommitted_ids = []
+        self._uncommitted_batches = 0
+
+    def write(self, batch, validation_results, outstanding_ids):
+        """Stage one batch's results; commits every commit_every batches."""
+        if validation_results and isinstance(validation_results, list):
+            content_hashes = {q[0]: question_content_hash(q[1], q[2], q[3], q[5]) for q in batch}
+            update_question_batch_status(validation_results, content_hashes, conn=self.conn)
+        else:
+            print(f"  -> Skipping update for a failed or empty batch.")
+        self._uncommitted_ids.extend(q[0] for q in batch)
+        self._uncommitted_batches += 1
+        if self._uncommitted_batches >= self.commit_every:
+            self.flush(outstanding_ids)
+
+    def flush(self, outstanding_ids):
+        """Commit staged results and advance the checkpoint."""
+        if not self._uncommitted_batches:
+            return
+        self.conn.commit()
+        self.checkpoint.mark_done(self._uncommitted_ids, outstanding_ids)
+        self._uncommitted_ids = []
+        self._uncommitted_batches = 0
+
+    def close(self):
+        self.conn.close()
+
+def run_full_database_check(use_small_batches=False, max_workers=VALIDATION_WORKERS, resume=True, full=False):
+    """Main function to run the supervisor AI on the database in batches.
 
-def run_full_database_check(use_small_batches=False):
-    """Main function to run the supervisor AI on the entire database in batches."""
+    Only new, edited or outdated questions are validated unless full=True.
+
+    Questions are streamed from the database page by page and at most two
+    batches per worker are in flight, so memory stays flat regardless of the
+    size of the question bank. Batches are validated concurrently by
+    max_workers threads sharing one rate limiter; results are written from
+    this thread through a single connection. Progress is checkpointed after
+    every commit, and with resume=True an interrupted run skips the questions
+    it already finished.
+    """
     print(f"[{datetime.now().isoformat()}] Starting full supervisor AI check...")
     
     # --- NEW: Fix legacy issues first ---
     fix_missing_rejection_reasons()
     
-    all_questions = get_all_questions_for_validation()
-    
-    if not all_questions:
-        print("No questions found in the database to validate.")
-        return
-        
-    total_questions = len(all_questions)
+    # A full run must not resume an incremental run's watermark, or vice versa
+    run_key = f"{'full' if full else 'incremental'}:{VALIDATOR_VERSION}"
+    checkpoint = ValidationCheckpoint(CHECKPOINT_FILE, run_key)
+    if not resume:
+        checkpoint.clear()
+    if checkpoint.load():
+        print(f"  -> Resuming run started at {checkpoint.started_at} (done up to question {checkpoint.watermark}).")
     
-    # Use smaller batch size for more accurate validation if requested
-    batch_size = 3 if use_small_batches else BATCH_SIZE
-    print(f"Found {total_questions} questions to validate. Processing in batches of {batch_size}...")
+    # Batches are packed by estimated tokens; accurate mode uses small batches
+    if use_small_batches:
+        token_budget, max_questions = BATCH_TOKEN_BUDGET // 3, 3
+    else:
+        token_budget, max_questions = BATCH_TOKEN_BUDGET, MAX_BATCH_QUESTIONS
+    print(f"Processing {'all' if full else 'new or changed'} questions in batches of up to {token_budget} tokens / {max_questions} questions with {max_workers} workers...")
     if use_small_batches:
         print("  -> Using small batches for more accurate validation.")
     
-    for i in range(0, total_questions, batch_size):
-        batch = all_questions[i:i + batch_size]
-        start_num = i + 1
-        end_num = min(i + batch_size, total_questions)
-        
-        print(f"  - Processing batch {start_num}-{end_num} of {total_questions}...")
-        
-        validation_results = validate_question_batch_with_openai(batch)
-        
-        if validation_results and isinstance(validation_results, list):
-            update_question_batch_status(validation_results)
-            print(f"  -> Batch processed and database updated.")
-        else:
-            print(f"  -> Skipping update for a failed or empty batch.")
-            
+    questions = (
+        q for q in iter_questions_for_validation(full=full, after_id=checkpoint.watermark)
+        if not checkpoint.is_done(q[0])
+    )
+    batches = iter_token_batches(questions, token_budget, max_questions)
+    client = _openai_client()
+    limiter = TokenBucketLimiter(VALIDATION_REQUESTS_PER_MINUTE, VALIDATION_TOKENS_PER_MINUTE)
+    writer = ValidationWriter(checkpoint)
+    # IDs in flight or in crashed batches; the checkpoint watermark stays below them
+    outstanding_ids = set()
+    failed = 0
+    processed = 0
+    
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            exhausted = False
+            while True:
+                while not exhausted and len(futures) < max_workers * 2:
+                    batch = next(batches, None)
+                    if batch is None:
+                        exhausted = True
+                        break
+                    outstanding_ids.update(q[0] for q in batch)
+                    futures[executor.submit(validate_batch_adaptive, batch, client=client, limiter=limiter)] = batch
+                if not futures:
+                    break
+                
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = futures.pop(future)
+                    batch_ids = [q[0] for q in batch]
+                    try:
+                        validation_results = future.result()
+                    except Exception as e:
+                        # Left outstanding so the checkpoint never skips past it
+                        failed += len(batch)
+                        print(f"  -! Batch {batch_ids[0]}-{batch_ids[-1]} crashed: {str(e)}")
+                        continue
+                    
+                    outstanding_ids.difference_update(batch_ids)
+                    writer.write(batch, validation_results, outstanding_ids)
+                    processed += len(batch)
+                    print(f"  - Processed {processed} questions (batch {batch_ids[0]}-{batch_ids[-1]}).")
+        writer.flush(outstanding_ids)
+    finally:
+        writer.close()
+    
+    if processed == 0 and failed == 0:
+        print("No questions need validation." if not full else "No questions found in the database to validate.")
+    if failed:
+        print(f"  -! {failed} questions were not validated; run again to resume.")
+    else:
+        checkpoint.clear()
     print(f"[{datetime.now().isoformat()}] Supervisor check completed.")
 
+# --- Hint and mini-lesson pre-generation ---
+
+def get_questions_missing_content():
+    """Fetches approved questions that have no stored hint or mini-lesson yet."""
+    conn = get_connection(DATABASE_PATH)
+    c = conn.cursor()
+    c.execute("""
+        SELECT q.id, q.question, q.options, q.answer, n.name as nano_topic,
+               qc.hint, qc.lesson
+        FROM questions q
+        JOIN nano_topics n ON q.nano_topic_id = n.id
+        LEFT JOIN question_content qc ON qc.question_id = q.id
+        WHERE q.is_approved = 1 AND (qc.hint IS NULL OR qc.lesson IS NULL)
+        ORDER BY q.id
+    """)
+    questions = c.fetchall()
+    conn.close()
+    return questions
+
+def generate_question_content(client, question_row):
+    """Generates whichever of the hint and mini-lesson is missing for one question.
+
+    Returns (question_id, hint, lesson, errors); a part that failed stays None.
+    """
+    question_id, question_text, options_json, answer, nano_topic, hint, lesson = question_row
+    try:
+        options = json.loads(options_json) if options_json else []
+    except (json.JSONDecodeError, TypeError):
+        options = []
+
+    # Each part is kept if it succeeds, so a failed lesson does not throw away
+    # a hint that was already paid for; the missing part is retried next run
+    errors = []
+    if hint is None:
+        try:
+            response = client.chat.completions.create(
+                model=CONTENT_MODEL,
+                messages=build_hint_messages(question_text, options, answer, nano_topic),
+                max_tokens=150
+            )
+            hint = response.choices[0].message.content.strip()
+        except Exception as e:
+            errors.append(f"hint: {str(e)}")
+    if lesson is None:
+        try:
+            response = client.chat.completions.create(
+                model=CONTENT_MODEL,
+                messages=build_mini_lesson_messages(nano_topic, question_text, answer),
+                max_tokens=300
+            )
+            lesson = response.choices[0].message.content.strip()
+        except Exception as e:
+            errors.append(f"lesson: {str(e)}")
+    return question_id, hint, lesson, errors
+
+def run_content_pregeneration(max_workers=PREGEN_WORKERS):
+    """Pre-generates hints and mini-lessons for newly approved questions.
+
+    Each question is committed as soon as it finishes, so an interrupted run
+    simply picks up the remaining questions next time.
+    """
+    print(f"[{datetime.now().isoformat()}] Starting hint/lesson pre-generation...")
+    pending = get_questions_missing_content()
+    if not pending:
+        print("All approved questions already have a hint and mini-lesson.")
+        return
+
+    print(f"Found {len(pending)} questions to pre-generate with {max_workers} workers...")
+    client = _openai_client()
+    conn = get_connection(DATABASE_PATH)
+    done = failed = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(generate_question_content, client, row): row[0] for row in pending}
+            # Results are written from this thread only, one commit per question
+            for future in as_completed(futures):
+                try:
+                    question_id, hint, lesson, errors = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"  -! Question {futures[future]} failed, will retry next run: {str(e)}")
+                    continue
+                if errors:
+                    failed += 1
+                    print(f"  -! Question {question_id} partly failed, will retry next run: {'; '.join(errors)}")
+                    if hint is None and lesson is None:
+                        continue
+                conn.execute("""
+                    INSERT INTO question_content (question_id, hint, lesson, generated_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(question_id) DO UPDATE SET
+                        hint = excluded.hint, lesson = excluded.lesson, generated_at = excluded.generated_at
+                """, (question_id, hint, lesson, datetime.now().isoformat()))
+                conn.commit()
+                if errors:
+                    continue
+                done += 1
+                if done % 25 == 0:
+                    print(f"  -> {done}/{len(pending)} questions stored.")
+    finally:
+        conn.close()
+    print(f"[{datetime.now().isoformat()}] Pre-generation completed: {done} stored, {failed} failed.")
+
 if __name__ == "__main__":
     # Add command line option for high-accuracy mode
     import sys
+    if "--pregenerate" in sys.argv:
+        run_content_pregeneration()
+        sys.exit(0)
     use_small_batches = "--accurate" in sys.argv or "--small-batches" in sys.argv
     if use_small_batches:
         print("Running in high-accuracy mode with smaller batches...")
-    run_full_database_check(use_small_batches)
\ No newline at end of file
+    workers = VALIDATION_WORKERS
+    if "--workers" in sys.argv:
+        workers = int(sys.argv[sys.argv.index("--workers") + 1])
+    full = "--full" in sys.argv
+    if full:
+        print("Running a full re-validation of every question...")
+    run_full_database_check(use_small_batches, max_workers=workers, resume="--restart" not in sys.argv, full=full)
\ No newline at end of file
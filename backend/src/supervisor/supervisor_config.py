@@ -16,8 +16,48 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 VALIDATION_MODEL = "gpt-3.5-turbo"
 
 # --- Supervisor Settings ---
-# The number of questions to validate in each run
-BATCH_SIZE = 10
+# Batches are packed by estimated tokens (question JSON plus expected
+# response) rather than by count, capped at MAX_BATCH_QUESTIONS questions
+BATCH_TOKEN_BUDGET = 3000
+MAX_BATCH_QUESTIONS = 20
+
+# How many times a batch's missing results are split in half and retried
+MAX_SPLIT_DEPTH = 3
+
+# Bump when the validation logic changes in a way the prompt hash doesn't
+# capture; questions validated under an older revision are re-checked.
+VALIDATOR_REVISION = 1
+
+# --- Concurrent Validation Settings ---
+# Number of batches validated in parallel
+VALIDATION_WORKERS = int(os.getenv("SUPERVISOR_WORKERS", "4"))
+
+# OpenAI rate limits shared by all workers (requests and tokens per minute)
+VALIDATION_REQUESTS_PER_MINUTE = int(os.getenv("SUPERVISOR_RPM", "500"))
+VALIDATION_TOKENS_PER_MINUTE = int(os.getenv("SUPERVISOR_TPM", "60000"))
+
+# Expected response tokens per validated question, used for the token budget
+VALIDATION_OUTPUT_TOKENS_PER_QUESTION = 60
+
+# Jittered exponential backoff after a failed request (seconds)
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 60.0
+
+# Questions read per keyset page when streaming the question bank
+STREAM_PAGE_SIZE = 500
+
+# Validated batches written per commit
+WRITER_COMMIT_EVERY = 5
+
+# Progress of the current run, so a crashed run resumes where it stopped
+CHECKPOINT_FILE = os.path.join(os.path.dirname(__file__), "supervisor_checkpoint.json")
+
+# --- Content Pre-generation Settings ---
+# The model used to pre-generate hints and mini-lessons
+CONTENT_MODEL = "gpt-3.5-turbo"
+
+# Number of questions whose hint/lesson are generated in parallel
+PREGEN_WORKERS = 4
 
 # Log file for the supervisor's findings
 LOG_FILE = os.path.join(os.path.dirname(__file__), "supervisor_log.txt")
\ No newline at end of file
@@ -25,6 +25,7 @@ class BackendTester:
         self.test_results = []
         ## MODIFICATION ##: Add a place to store real questions fetched from the API
         self.available_questions = []
+        self.explanation_ticket = None
 
     def log_test(self, test_name, success, message="", response_data=None):
         """Log test results"""
@@ -118,6 +119,10 @@ class BackendTester:
                 data = response.json()
                 curriculum = data.get("curriculum", [])
                 self.log_test("Curriculum Structure", True, f"Found {len(curriculum)} topics")
+                etag = response.headers.get("ETag")
+                revalidated = self.session.get(f"{BASE_URL}/topics/structure", headers={"If-None-Match": etag})
+                self.log_test("Curriculum Structure ETag", revalidated.status_code == 304,
+                              f"Status {revalidated.status_code} for If-None-Match {etag}")
                 return True
             else:
                 self.log_test("Curriculum Structure", False, f"Status {response.status_code}")
@@ -163,6 +168,30 @@ class BackendTester:
             self.log_test("Get Questions", False, str(e))
             return False
 
+    def test_next_question(self):
+        """Test the single adaptive next-question endpoint."""
+        try:
+            headers = self.get_auth_headers("student")
+            response = self.session.get(
+                f"{BASE_URL}/quiz/next-question",
+                params={"subject": "Numbers and the Number System"},
+                headers=headers
+            )
+            if response.status_code == 200:
+                question = response.json().get("question")
+                if question is None:
+                    self.log_test("Next Question", True, "No unanswered questions left")
+                else:
+                    self.log_test("Next Question", "id" in question and "nano_topic" in question,
+                                  f"Got question {question.get('id')} from {question.get('nano_topic')}")
+                return True
+            else:
+                self.log_test("Next Question", False, f"Status {response.status_code}")
+                return False
+        except Exception as e:
+            self.log_test("Next Question", False, str(e))
+            return False
+
     ## MODIFICATION ##: This function is now dynamic and robust.
     def test_submit_answer(self):
         """Test submitting an answer using a real question fetched from the API."""
@@ -187,6 +216,7 @@ class BackendTester:
             
             # A successful submission will return a 200 status and a JSON body
             if response.status_code == 200 and "is_correct" in response.json():
+                self.explanation_ticket = response.json().get("explanation_ticket")
                 self.log_test("Submit Answer", True, "Answer submitted, received valid response.")
                 return True
             else:
@@ -198,6 +228,28 @@ class BackendTester:
             self.log_test("Submit Answer", False, str(e))
             return False
 
+    def test_explanation_ticket(self):
+        """Test fetching the background explanation for the wrong answer submitted above."""
+        if not self.explanation_ticket:
+            self.log_test("Fetch Explanation", False, "Skipping test: No explanation ticket was returned.")
+            return False
+        try:
+            headers = self.get_auth_headers("student")
+            response = self.session.get(
+                f"{BASE_URL}/quiz/explanation/{self.explanation_ticket}",
+                params={"wait": 20}, headers=headers
+            )
+            if response.status_code == 200 and response.json().get("status") != "pending":
+                self.log_test("Fetch Explanation", True, f"Status: {response.json().get('status')}")
+                return True
+            else:
+                error_msg = response.json().get('detail', response.json().get('status', f'Status {response.status_code}'))
+                self.log_test("Fetch Explanation", False, error_msg)
+                return False
+        except Exception as e:
+            self.log_test("Fetch Explanation", False, str(e))
+            return False
+
     # ... (All other test functions like test_teacher_class_creation, etc., are correct and need no changes)
     def test_teacher_class_creation(self):
         try:
@@ -235,6 +287,28 @@ class BackendTester:
             self.log_test("Join Class", False, str(e))
             return False
     
+    def test_my_assignments(self):
+        """Test the batched student assignments endpoint."""
+        try:
+            headers = self.get_auth_headers("student")
+            response = self.session.get(
+                f"{BASE_URL}/students/me/assignments",
+                params={"page": 1, "page_size": 5},
+                headers=headers
+            )
+            if response.status_code == 200:
+                data = response.json()
+                assignments = data.get("assignments", [])
+                self.log_test("My Assignments", len(assignments) <= 5 and "total" in data,
+                              f"Got {len(assignments)} of {data.get('total')} assignments")
+                return True
+            else:
+                self.log_test("My Assignments", False, f"Status {response.status_code}")
+                return False
+        except Exception as e:
+            self.log_test("My Assignments", False, str(e))
+            return False
+
     def test_parent_link_student(self):
         try:
             headers = self.get_auth_headers("parent")
@@ -290,6 +364,30 @@ class BackendTester:
             self.log_test("Parent Reports", False, str(e))
             return False
     
+    def test_parent_student_analytics(self):
+        try:
+            headers = self.get_auth_headers("parent")
+            response = self.session.get(f"{BASE_URL}/parent/linked-students", headers=headers)
+            students = response.json().get("students", []) if response.status_code == 200 else []
+            if not students:
+                self.log_test("Parent Student Analytics", False, "No linked student available")
+                return False
+            url = f"{BASE_URL}/parent/student-analytics/{students[0]['id']}"
+            # The first request stores the snapshot, the second is served from it plus the delta
+            first = self.session.get(url, headers=headers)
+            second = self.session.get(url, headers=headers)
+            if first.status_code == 200 and second.status_code == 200:
+                data = second.json()
+                self.log_test("Parent Student Analytics", data == first.json(),
+                              f"Questions: {data.get('overall_stats', {}).get('total_questions', 0)}")
+                return True
+            else:
+                self.log_test("Parent Student Analytics", False, f"Status {first.status_code}/{second.status_code}")
+                return False
+        except Exception as e:
+            self.log_test("Parent Student Analytics", False, str(e))
+            return False
+    
     def test_feedback_submission(self):
         try:
             headers = self.get_auth_headers("student")
@@ -353,15 +451,19 @@ class BackendTester:
         ## MODIFICATION ##: The order of these two tests is now critical.
         # We must get the questions first, so we have something to submit.
         self.test_get_questions()
+        self.test_next_question()
         self.test_submit_answer()
+        self.test_explanation_ticket()
         
         self.test_student_analytics()
         
         class_code = self.test_teacher_class_creation()
         self.test_student_join_class(class_code)
+        self.test_my_assignments()
         
         self.test_parent_link_student()
         self.test_parent_reports()
+        self.test_parent_student_analytics()
         
         self.test_feedback_submission()
         self.test_admin_features()
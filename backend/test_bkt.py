@@ -0,0 +1,97 @@
+"""
+Equivalence checks between the scalar BKT model and the array-backed BKTEngine.
+
+BKTEngine promises the same numbers as calling BKT.update once per answer in
+order; these tests replay random answer sequences through both and compare
+p_learned exactly.
+
+Run with: python test_bkt.py  (or python -m pytest test_bkt.py)
+"""
+
+import os
+import random
+import sys
+import unittest
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+from src.quiz.bkt import BKT
+from src.quiz.bkt_engine import BKTEngine
+
+
+def random_answers(rng, count, students=5, topics=8):
+    """Return [(student_id, nano_topic_id, correct)] with repeated pairs."""
+    return [
+        (rng.randrange(1, students + 1), rng.randrange(1, topics + 1), rng.random() < 0.6)
+        for _ in range(count)
+    ]
+
+
+def scalar_replay(answers):
+    """Apply answers with one BKT object per pair; returns (trajectory, final state)."""
+    models = {}
+    trajectory = []
+    for student_id, topic_id, correct in answers:
+        model = models.setdefault((student_id, topic_id), BKT())
+        trajectory.append(model.update(correct))
+    return trajectory, {key: model.p_learned for key, model in models.items()}
+
+
+class BKTEngineEquivalenceTest(unittest.TestCase):
+
+    def test_update_batch_matches_sequential_updates(self):
+        rng = random.Random(7)
+        for trial in range(20):
+            answers = random_answers(rng, rng.randrange(1, 300))
+            expected_trajectory, expected_state = scalar_replay(answers)
+
+            engine = BKTEngine(capacity=4)  # small capacity also exercises _grow
+            students, topics, correct = zip(*answers)
+            trajectory = engine.update_batch(students, topics, correct)
+
+            with self.subTest(trial=trial):
+                self.assertEqual(trajectory.tolist(), expected_trajectory)
+                for (student_id, topic_id), p_learned in expected_state.items():
+                    self.assertEqual(engine.get(student_id, topic_id), p_learned)
+
+    def test_split_batches_match_one_batch(self):
+        rng = random.Random(11)
+        answers = random_answers(rng, 500)
+        expected_trajectory, expected_state = scalar_replay(answers)
+
+        engine = BKTEngine()
+        trajectory = []
+        start = 0
+        while start < len(answers):
+            end = start + rng.randrange(1, 40)
+            students, topics, correct = zip(*answers[start:end])
+            trajectory.extend(engine.update_batch(students, topics, correct).tolist())
+            start = end
+
+        self.assertEqual(trajectory, expected_trajectory)
+        for student_id, topic_id, p_learned, attempts, correct in engine.items():
+            self.assertEqual(p_learned, expected_state[(student_id, topic_id)])
+            pair_answers = [a for a in answers if a[:2] == (student_id, topic_id)]
+            self.assertEqual(attempts, len(pair_answers))
+            self.assertEqual(correct, sum(a[2] for a in pair_answers))
+
+    def test_replay_matches_sequential_updates(self):
+        rng = random.Random(3)
+        engine = BKTEngine()
+        # Existing state for the student is reset by replay
+        engine.update_batch([1, 1], [1, 2], [True, False])
+        for trial in range(10):
+            history = [(1, topic_id, correct) for _, topic_id, correct in random_answers(rng, 120)]
+            expected_trajectory, expected_state = scalar_replay(history)
+
+            _, topics, correct = zip(*history)
+            trajectory = engine.replay(1, topics, correct)
+
+            with self.subTest(trial=trial):
+                self.assertEqual(trajectory.tolist(), expected_trajectory)
+                self.assertEqual(engine.student_state(1), {t: p for (_, t), p in expected_state.items()})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+"""
+EXPLAIN QUERY PLAN regression checks for the SQL in main.py and src/quiz/data.py.
+
+Runs without the API server: every statement passed to execute() is read from
+the source with ast, planned against a fresh database built by
+data/database_setup.py (the schema migrations, which create the indexes in
+src/db/indexes.py), and any full scan that is not explicitly allowed fails
+the test.
+
+No statistics are gathered (no ANALYZE), so the planner assumes large tables,
+which is what a production database looks like; on a tiny seeded table it
+would rightly prefer a scan and hide a missing index.
+
+Run with: python test_query_plans.py  (or python -m pytest test_query_plans.py)
+"""
+
+import ast
+import importlib.util
+import itertools
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+from src.db.indexes import INDEXES
+
+SOURCES = ("main.py", os.path.join("src", "quiz", "data.py"))
+
+# (function, plan detail prefix) -> why a full scan is acceptable there
+ALLOWED_SCANS = {
+    ("get_question_stats", "SCAN questions"): "admin dashboard counts the whole question bank",
+    ("get_rejected_questions", "SCAN q USING INDEX idx_questions_rejected"): "partial index holds only rejected questions",
+}
+
+SQL_START = re.compile(r"\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+
+
+def _string_assignments(function):
+    """Map each local name to the expressions assigned to it inside the function."""
+    assignments = {}
+    for node in ast.walk(function):
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    assignments.setdefault(target.id, []).append(node.value)
+    return assignments
+
+
+def _render(expr, assignments, depth=0):
+    """Return every SQL text an expression can take (None when it is not a string)."""
+    if depth > 5:
+        return None
+    if isinstance(expr, ast.Constant):
+        return [expr.value] if isinstance(expr.value, str) else None
+    if isinstance(expr, ast.Name):
+        variants = []
+        for value in assignments.get(expr.id, []):
+            rendered = _render(value, assignments, depth + 1)
+            if rendered:
+                variants.extend(rendered)
+        return variants or None
+    if isinstance(expr, ast.BinOp) and isinstance(expr.op, ast.Add):
+        left = _render(expr.left, assignments, depth + 1)
+        right = _render(expr.right, assignments, depth + 1)
+        if left is None or right is None:
+            return None
+        return [a + b for a, b in itertools.product(left, right)]
+    if isinstance(expr, ast.JoinedStr):
+        parts = []
+        for value in expr.values:
+            if isinstance(value, ast.Constant):
+                parts.append([value.value])
+            else:
+                # Interpolated SQL fragments (e.g. an optional HAVING clause)
+                # are expanded; anything else is a placeholder list
+                parts.append(_render(value.value, assignments, depth + 1) or ["?"])
+        return ["".join(p) for p in itertools.product(*parts)]
+    return None
+
+
+def collect_statements():
+    """Return [(source, line, function, sql)] for every SQL statement in SOURCES."""
+    statements = []
+    for source in SOURCES:
+        with open(os.path.join(BACKEND_DIR, source), encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        for function in ast.walk(tree):
+            if not isinstance(function, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            assignments = _string_assignments(function)
+            for node in ast.walk(function):
+                if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                        and node.func.attr in ("execute", "executemany") and node.args):
+                    continue
+                for sql in _render(node.args[0], assignments) or []:
+                    if SQL_START.match(sql):
+                        statements.append((source, node.lineno, function.name, sql))
+    return statements
+
+
+def build_database(path):
+    spec = importlib.util.spec_from_file_location(
+        "database_setup", os.path.join(BACKEND_DIR, "data", "database_setup.py")
+    )
+    database_setup = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(database_setup)
+    database_setup.DATABASE_PATH = path
+    database_setup.setup_database()
+    return sqlite3.connect(path)
+
+
+def full_scans(plan):
+    """Plan details that read a whole table or index."""
+    return [
+        detail for _, _, _, detail in plan
+        if detail.startswith("SCAN ") and "CONSTANT ROW" not in detail and "(subquery" not in detail
+    ]
+
+
+class QueryPlanTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.conn = build_database(os.path.join(cls.tmpdir.name, "plans.db"))
+        cls.statements = collect_statements()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+        cls.tmpdir.cleanup()
+
+    def plan(self, sql):
+        return self.conn.execute("EXPLAIN QUERY PLAN " + sql, [None] * sql.count("?")).fetchall()
+
+    def test_statements_found(self):
+        sources = {source for source, _, _, _ in self.statements}
+        self.assertEqual(sources, set(SOURCES))
+        self.assertGreater(len(self.statements), 50)
+
+    def test_managed_indexes_created(self):
+        # Every managed index must be created by some migration
+        existing = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertEqual([name for name, _, _, _ in INDEXES if name not in existing], [])
+
+    def test_statements_prepare(self):
+        for source, line, function, sql in self.statements:
+            with self.subTest(f"{source}:{line} {function}"):
+                try:
+                    self.plan(sql)
+                except sqlite3.Error as e:
+                    self.fail(f"{e}\n{sql}")
+
+    def test_no_full_scans(self):
+        for source, line, function, sql in self.statements:
+            with self.subTest(f"{source}:{line} {function}"):
+                try:
+                    plan = self.plan(sql)
+                except sqlite3.Error:
+                    continue  # reported by test_statements_prepare
+                unexpected = [
+                    detail for detail in full_scans(plan)
+                    if not any(function == allowed_function and detail.startswith(prefix)
+                               for allowed_function, prefix in ALLOWED_SCANS)
+                ]
+                self.assertEqual(unexpected, [], f"full scan in {function}:\n{sql}")
+
+
+if __name__ == "__main__":
+    unittest.main()
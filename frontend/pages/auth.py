@@ -254,6 +254,8 @@ def _handle_register(auth_handler: AuthHandlers, username: str, password: str,
 def _handle_logout(cookies):
     """Handle user logout."""
     from src.auth.auth_handlers import clear_user_session
+    if st.session_state.get("token"):
+        AuthHandlers(BACKEND_URL).logout_user(st.session_state.token)
     clear_user_session(cookies)
     st.success("👋 Logged out successfully!")
 
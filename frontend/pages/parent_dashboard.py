@@ -1,3 +1,4 @@
+import time
 import streamlit as st
 import requests
 import plotly.express as px
@@ -8,6 +9,8 @@ from src.auth.session import restore_session_from_cookie, get_cookie_manager # <
 from src.ui.navigation import render_sidebar
 # --- Configuration ---
 BACKEND_URL = "http://127.0.0.1:8000"  # Or use os.environ.get for production
+# Seconds a student's analytics are reused before asking the backend again
+ANALYTICS_REFRESH_SECONDS = 60
 # --- ADD THIS BLOCK TO THE TOP OF THE PAGE ---
 # cookies = EncryptedCookieManager(prefix="eduapp_", password="some_secure_password_min_32_chars_long")
 # if not cookies.ready():
@@ -48,10 +51,28 @@ def get_linked_students():
         st.error(f"Error fetching students: {e}")
         return []
 
-def get_student_summary(student_name, time_range_days=None):
+def fetch_student_analytics(student_id):
+    """Get the student's analytics, reusing the session copy for ANALYTICS_REFRESH_SECONDS.
+
+    The response does not depend on the time period (that filter is applied
+    here), so switching periods does not need another request.
+    """
+    cache = st.session_state.setdefault("student_analytics_cache", {})
+    cached = cache.get(student_id)
+    if cached and time.time() - cached[1] < ANALYTICS_REFRESH_SECONDS:
+        return cached[0]
+    headers = {"Authorization": f"Bearer {st.session_state.token}"}
+    response = requests.get(f"{BACKEND_URL}/parent/student-analytics/{student_id}", headers=headers)
+    response.raise_for_status()
+    data = response.json()
+    cache[student_id] = (data, time.time())
+    return data
+
+def get_student_summary(student_name, time_range_days=None, linked_students=None):
     """Get comprehensive student summary with real data (keeping original function name)."""
     # First, find the student ID by name from linked students
-    linked_students = get_linked_students()
+    if linked_students is None:
+        linked_students = get_linked_students()
     student_data = next((s for s in linked_students if s["username"] == student_name), None)
     
     if not student_data:
@@ -60,10 +81,7 @@ def get_student_summary(student_name, time_range_days=None):
     student_id = student_data["id"]
     
     try:
-        headers = {"Authorization": f"Bearer {st.session_state.token}"}
-        response = requests.get(f"{BACKEND_URL}/parent/student-analytics/{student_id}", headers=headers)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_student_analytics(student_id)
         
         if not data.get("has_data", False):
             return {
@@ -167,7 +185,7 @@ else:
         time_range_days = {"Last 7 Days": 7, "Last 30 Days": 30, "All Time": None}[time_range]
     
     if student:
-        summary = get_student_summary(student, time_range_days)
+        summary = get_student_summary(student, time_range_days, linked_students)
         
         if summary and summary["overall"][0] > 0:  # Has data
             total_questions = summary["overall"][0]
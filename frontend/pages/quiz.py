@@ -6,6 +6,8 @@ from src.ui.feedback import render_feedback_widget
 from src.ui.components import render_question, render_results, render_parent_dashboard
 from src.auth.session import restore_session_from_cookie , get_cookie_manager
 from src.ui.navigation import render_sidebar
+from src.ui.curriculum import fetch_curriculum_structure
+from src.ui.assignments import fetch_my_assignments
 # --- Configuration ---
 BACKEND_URL = "http://127.0.0.1:8000"  # Or use os.environ.get for production
 # --- ADD THIS BLOCK TO THE TOP OF THE PAGE ---
@@ -63,40 +65,27 @@ def initialize_quiz_state():
 # --- End of Sidebar ---
 
 def get_student_assignments():
-    """Get pending assignments via composite API calls."""
+    """Get open assignments (attempts left, not past due) in one batched API call."""
     assignments = []
     try:
         headers = {"Authorization": f"Bearer {st.session_state.token}"}
-        resp_classes = requests.get(f"{BACKEND_URL}/classes/my-classes", headers=headers)
-        resp_classes.raise_for_status()
-        classes = resp_classes.json().get("classes", [])
-        
-        for cls in classes:
-            resp_assign = requests.get(f"{BACKEND_URL}/assignments/class/{cls['id']}", headers=headers)
-            if resp_assign.status_code == 200:
-                class_assigns = resp_assign.json().get("assignments", [])
-                for a in class_assigns:
-                    resp_subs = requests.get(f"{BACKEND_URL}/assignments/{a['id']}/submissions", headers=headers)
-                    if resp_subs.status_code == 200:
-                        subs = resp_subs.json().get("submissions", [])
-                        attempts = len(subs)
-                        if attempts < a['max_attempts'] and (not a['due_date'] or datetime.fromisoformat(a['due_date']) >= datetime.now()):
-                            assignments.append({
-                                "id": a['id'],
-                                "title": a['title'],
-                                "description": a['description'],
-                                "due_date": a['due_date'],
-                                "min_questions": a['min_questions'],
-                                "max_attempts": a['max_attempts'],
-                                "show_hints": a['show_hints'],
-                                "show_lessons": a['show_lessons'],
-                                "class_name": cls['name'],
-                                "attempts": attempts,
-                                "topic_id": None,  # Placeholder; not in API, default later
-                                "subtopic_id": None,
-                                "micro_topic_id": a.get('micro_topic_id'),
-                                "nano_topic_ids": a.get('nano_topic_ids')
-                            })
+        for a in fetch_my_assignments(BACKEND_URL, headers, status_filter="open"):
+            assignments.append({
+                "id": a['id'],
+                "title": a['title'],
+                "description": a['description'],
+                "due_date": a['due_date'],
+                "min_questions": a['min_questions'],
+                "max_attempts": a['max_attempts'],
+                "show_hints": a['show_hints'],
+                "show_lessons": a['show_lessons'],
+                "class_name": a['class_name'],
+                "attempts": a['attempts'],
+                "topic_id": None,  # Placeholder; not in API, default later
+                "subtopic_id": None,
+                "micro_topic_id": a.get('micro_topic_id'),
+                "nano_topic_ids": a.get('nano_topic_ids')
+            })
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching assignments: {e}")
     return assignments
@@ -307,9 +296,7 @@ else:
                                     # Composite: Get name from structure
                                     try:
                                         headers = {"Authorization": f"Bearer {st.session_state.token}"}
-                                        resp = requests.get(f"{BACKEND_URL}/topics/structure", headers=headers)
-                                        resp.raise_for_status()
-                                        curriculum = resp.json().get("curriculum", [])
+                                        curriculum = fetch_curriculum_structure(BACKEND_URL, headers)
                                         for top in curriculum:
                                             for sub in top.get("subtopics", []):
                                                 for mic in sub.get("micro_topics", []):
@@ -345,15 +332,12 @@ else:
         st.write("Select a topic to practice on your own:")
         
         # Load subjects and micro-topics from structure
-        if "curriculum_structure" not in st.session_state:
-            try:
-                headers = {"Authorization": f"Bearer {st.session_state.token}"}
-                response = requests.get(f"{BACKEND_URL}/topics/structure", headers=headers)
-                response.raise_for_status()
-                st.session_state.curriculum_structure = response.json().get("curriculum", [])
-            except requests.exceptions.RequestException as e:
-                st.error(f"Error loading topics: {e}")
-                st.session_state.curriculum_structure = []
+        try:
+            headers = {"Authorization": f"Bearer {st.session_state.token}"}
+            fetch_curriculum_structure(BACKEND_URL, headers)
+        except requests.exceptions.RequestException as e:
+            st.error(f"Error loading topics: {e}")
+            st.session_state.curriculum_structure = []
         
         subjects = [top["name"] for top in st.session_state.curriculum_structure]
         
@@ -5,6 +5,8 @@ from datetime import datetime
 from src.ui.feedback import render_feedback_widget
 from src.auth.session import restore_session_from_cookie, get_cookie_manager
 from src.ui.navigation import render_sidebar
+from src.ui.curriculum import fetch_curriculum_structure
+from src.ui.assignments import fetch_my_assignments
 
 # --- Configuration ---
 BACKEND_URL = "http://127.0.0.1:8000"  # Or use os.environ.get for production
@@ -42,53 +44,31 @@ if "user_id" not in st.session_state or st.session_state.role != "student":
 st.title("My Assignments")
 
 def get_student_assignments_detailed():
-    """Get all assignments with details via composite API calls."""
+    """Get all assignments with details in one batched API call."""
     assignments = []
     try:
         headers = {"Authorization": f"Bearer {st.session_state.token}"}
-        resp_classes = requests.get(f"{BACKEND_URL}/classes/my-classes", headers=headers)
-        resp_classes.raise_for_status()
-        classes = resp_classes.json().get("classes", [])
-        
-        for cls in classes:
-            resp_assign = requests.get(f"{BACKEND_URL}/assignments/class/{cls['id']}", headers=headers)
-            if resp_assign.status_code == 200:
-                class_assigns = resp_assign.json().get("assignments", [])
-                for a in class_assigns:
-                    resp_subs = requests.get(f"{BACKEND_URL}/assignments/{a['id']}/submissions", headers=headers)
-                    if resp_subs.status_code == 200:
-                        subs = resp_subs.json().get("submissions", [])
-                        
-                        # FIX: Only count COMPLETED submissions as attempts
-                        completed_subs = [s for s in subs if s.get('completed_at')]
-                        completed_attempts = len(completed_subs)
-                        
-                        # Check for incomplete/started submissions
-                        incomplete_subs = [s for s in subs if not s.get('completed_at')]
-                        has_incomplete = len(incomplete_subs) > 0
-                        
-                        best_score = max([s.get('score', 0) for s in completed_subs] or [None])
-                        
-                        assignments.append({
-                            "id": a['id'],
-                            "title": a['title'],
-                            "description": a['description'],
-                            "due_date": a['due_date'],
-                            "min_questions": a['min_questions'],
-                            "max_attempts": a['max_attempts'],
-                            "class_name": cls['name'],
-                            "teacher_name": "Your Teacher",  # Placeholder; no API field
-                            "completed_attempts": completed_attempts,  # Only completed attempts count
-                            "has_incomplete": has_incomplete,  # Track if there's an incomplete attempt
-                            "best_score": best_score,
-                            "assigned_date": a['created_at'],
-                            "topic_id": None,  # Placeholder
-                            "subtopic_id": None,
-                            "micro_topic_id": a.get('micro_topic_id'),
-                            "nano_topic_ids": a.get('nano_topic_ids'),
-                            "show_hints": a['show_hints'],
-                            "show_lessons": a['show_lessons']
-                        })
+        for a in fetch_my_assignments(BACKEND_URL, headers):
+            assignments.append({
+                "id": a['id'],
+                "title": a['title'],
+                "description": a['description'],
+                "due_date": a['due_date'],
+                "min_questions": a['min_questions'],
+                "max_attempts": a['max_attempts'],
+                "class_name": a['class_name'],
+                "teacher_name": a.get('teacher_name') or "Your Teacher",
+                "completed_attempts": a['completed_attempts'],  # Only completed attempts count
+                "has_incomplete": a['has_incomplete'],  # Track if there's an incomplete attempt
+                "best_score": a['best_score'],
+                "assigned_date": a['created_at'],
+                "topic_id": None,  # Placeholder
+                "subtopic_id": None,
+                "micro_topic_id": a.get('micro_topic_id'),
+                "nano_topic_ids": a.get('nano_topic_ids'),
+                "show_hints": a['show_hints'],
+                "show_lessons": a['show_lessons']
+            })
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching assignments: {e}")
     return assignments
@@ -176,13 +156,10 @@ def start_assignment_from_assignments_page(assignment):
         st.session_state.current_micro_topic = "Integer Operations"  # Default
         if assignment.get('micro_topic_id'):
             # Composite: Get name from structure (cache if possible)
-            if "curriculum_structure" not in st.session_state:
-                try:
-                    resp = requests.get(f"{BACKEND_URL}/topics/structure", headers=headers)
-                    resp.raise_for_status()
-                    st.session_state.curriculum_structure = resp.json().get("curriculum", [])
-                except:
-                    pass
+            try:
+                fetch_curriculum_structure(BACKEND_URL, headers)
+            except requests.exceptions.RequestException:
+                pass
             curriculum = st.session_state.get("curriculum_structure", [])
             for top in curriculum:
                 for sub in top.get("subtopics", []):
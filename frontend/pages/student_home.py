@@ -119,7 +119,7 @@ def _render_assignments_section(home_components: HomeComponents):
             for assignment in pending_assignments:
                 try:
                     headers = {"Authorization": f"Bearer {st.session_state.token}"}
-                    resp = requests.get(f"{BACKEND_URL}/assignments/{assignment[4]}/questions", headers=headers)  # assignment[4] is assignment_id
+                    resp = requests.get(f"{BACKEND_URL}/assignments/{assignment[4]}/questions", headers=headers, params={"sample": "true", "count": 1})  # assignment[4] is assignment_id
                     if resp.status_code == 200:
                         questions = resp.json().get("questions", [])
                         if questions:
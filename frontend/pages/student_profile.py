@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from src.ui.feedback import render_feedback_widget
 from src.auth.session import restore_session_from_cookie,get_cookie_manager
 from src.ui.navigation import render_sidebar
+from src.ui.curriculum import fetch_curriculum_structure
 
 # --- Configuration ---
 BACKEND_URL = "http://127.0.0.1:8000"  # Or use os.environ.get for production
@@ -252,9 +253,7 @@ if insights["overall"][0] > 0:  # Has answered questions
                 # Composite: Get structure to find subject/micro
                 try:
                     headers = {"Authorization": f"Bearer {st.session_state.token}"}
-                    response = requests.get(f"{BACKEND_URL}/topics/structure", headers=headers)
-                    response.raise_for_status()
-                    curriculum = response.json().get("curriculum", [])
+                    curriculum = fetch_curriculum_structure(BACKEND_URL, headers)
                     
                     subject = None
                     micro_topic = None
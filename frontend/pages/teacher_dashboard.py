@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from src.ui.feedback import render_feedback_widget
 from src.auth.session import restore_session_from_cookie, get_cookie_manager
 from src.ui.navigation import render_sidebar
+from src.ui.curriculum import fetch_curriculum_structure
 
 # --- Configuration ---
 BACKEND_URL = "http://127.0.0.1:8000"  # Or use os.environ.get for production
@@ -247,15 +248,12 @@ with tab2:
             st.session_state.selected_custom_questions = []
 
         # --- LOAD CURRICULUM STRUCTURE (outside form for dynamic updates) ---
-        if "curriculum_structure" not in st.session_state:
-            try:
-                headers = {"Authorization": f"Bearer {st.session_state.token}"}
-                response = requests.get(f"{BACKEND_URL}/topics/structure", headers=headers)
-                response.raise_for_status()
-                st.session_state.curriculum_structure = response.json().get("curriculum", [])
-            except requests.exceptions.RequestException as e:
-                st.error(f"Error loading topics: {e}")
-                st.session_state.curriculum_structure = []
+        try:
+            headers = {"Authorization": f"Bearer {st.session_state.token}"}
+            fetch_curriculum_structure(BACKEND_URL, headers)
+        except requests.exceptions.RequestException as e:
+            st.error(f"Error loading topics: {e}")
+            st.session_state.curriculum_structure = []
 
         curriculum = st.session_state.curriculum_structure
 
@@ -519,15 +517,12 @@ with tab3:
         custom_questions = []
 
     # --- LOAD CURRICULUM FOR HIERARCHY ---
-    if "curriculum_structure" not in st.session_state:
-        try:
-            headers = {"Authorization": f"Bearer {st.session_state.token}"}
-            resp = requests.get(f"{BACKEND_URL}/topics/structure", headers=headers)
-            resp.raise_for_status()
-            st.session_state.curriculum_structure = resp.json().get("curriculum", [])
-        except requests.exceptions.RequestException as e:
-            st.error(f"Error loading topics: {e}")
-            st.session_state.curriculum_structure = []
+    try:
+        headers = {"Authorization": f"Bearer {st.session_state.token}"}
+        fetch_curriculum_structure(BACKEND_URL, headers)
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error loading topics: {e}")
+        st.session_state.curriculum_structure = []
 
     curriculum = st.session_state.curriculum_structure
 
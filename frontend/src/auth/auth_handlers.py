@@ -112,6 +112,24 @@ class AuthHandlers:
         except requests.exceptions.RequestException as e:
             raise AuthenticationError(f"Connection error: Unable to validate session")
     
+    def logout_user(self, token: str) -> None:
+        """
+        Revoke an authentication token on the backend.
+        
+        Failures are ignored: the local session is cleared either way.
+        
+        Args:
+            token: Authentication token to revoke
+        """
+        try:
+            requests.post(
+                f"{self.backend_url}/auth/logout",
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=5
+            )
+        except requests.exceptions.RequestException:
+            pass
+    
     def link_parent_to_student(self, link_code: str, token: str) -> bool:
         """
         Link parent to student via backend.
@@ -0,0 +1,32 @@
+# FILE: src/ui/assignments.py
+
+import requests
+from typing import Dict, List, Optional
+
+# Largest page the backend accepts (MAX_PAGE_SIZE in backend/config.py)
+PAGE_SIZE = 100
+
+
+def fetch_my_assignments(backend_url: str, headers: Dict[str, str], status_filter: Optional[str] = None) -> List[dict]:
+    """
+    Fetch the student's assignments, classes and attempt counts from /students/me/assignments.
+
+    Args:
+        status_filter: None for all assignments, "incomplete" or "open"
+
+    Raises:
+        requests.exceptions.RequestException: If a request fails
+    """
+    assignments = []
+    page = 1
+    while True:
+        params = {"page": page, "page_size": PAGE_SIZE}
+        if status_filter:
+            params["status_filter"] = status_filter
+        response = requests.get(f"{backend_url}/students/me/assignments", headers=headers, params=params, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        assignments.extend(data.get("assignments", []))
+        if not data.get("has_more"):
+            return assignments
+        page += 1
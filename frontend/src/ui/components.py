@@ -50,7 +50,12 @@ def render_question(subject, micro_topic, question_index):
             # Initialize assignment question pool if not exists
             if "assignment_questions" not in st.session_state:
                 try:
-                    response = requests.get(f"{BACKEND_URL}/assignments/{assignment_id}/questions", headers=headers)
+                    # The backend samples the assignment's min_questions from the pool
+                    response = requests.get(
+                        f"{BACKEND_URL}/assignments/{assignment_id}/questions",
+                        headers=headers,
+                        params={"sample": "true"}
+                    )
                     response.raise_for_status()
                     assignment_questions = response.json().get("questions", [])
                     
@@ -80,6 +85,8 @@ def render_question(subject, micro_topic, question_index):
             
             st.session_state.current_question = {
                 "id": question_index + 1,
+                "question_id": question_data.get("id"),
+                "custom_question_id": question_data.get("custom_question_id"),
                 "question": question_data["question"],
                 "options": question_data.get("options", []),
                 "answer": question_data["answer"],
@@ -87,57 +94,33 @@ def render_question(subject, micro_topic, question_index):
                 "style": question_data.get("style", "mcq")
             }
         else:
-            # PRACTICE MODE - Use existing logic
-            # Fetch nano topics for the micro topic (cache in session)
-            if f"nano_topics_{subject}_{micro_topic}" not in st.session_state:
-                try:
-                    response = requests.get(f"{BACKEND_URL}/quiz/nano-topics/{subject}?micro_topic={micro_topic}", headers=headers)
-                    response.raise_for_status()
-                    st.session_state[f"nano_topics_{subject}_{micro_topic}"] = response.json().get("nano_topics", [])
-                except requests.exceptions.RequestException as e:
-                    st.error(f"Error fetching topics: {e}")
-                    st.stop()
-            
-            nano_topics = st.session_state[f"nano_topics_{subject}_{micro_topic}"]
-            if not nano_topics:
-                st.error(f"No nano-topics found for subject: {subject}, micro-topic: {micro_topic}.")
-                st.stop()
-
-            # Select next topic via backend (based on BKT)
+            # PRACTICE MODE - The backend picks the topic (BKT), difficulty and question
             try:
-                response = requests.get(f"{BACKEND_URL}/quiz/next-topic", headers=headers)
+                response = requests.get(
+                    f"{BACKEND_URL}/quiz/next-question",
+                    params={"subject": subject, "micro_topic": micro_topic},
+                    headers=headers
+                )
                 response.raise_for_status()
-                next_topic = response.json().get("next_topic")
-                if not next_topic or next_topic not in [n["name"] for n in nano_topics]:
-                    next_topic = random.choice([n["name"] for n in nano_topics])  # Fallback
-            except requests.exceptions.RequestException:
-                next_topic = random.choice([n["name"] for n in nano_topics])  # Fallback on error
-
-            # Get questions for the selected nano-topic
-            try:
-                response = requests.get(f"{BACKEND_URL}/quiz/questions/{next_topic}", headers=headers)
-                response.raise_for_status()
-                questions = response.json().get("questions", [])
+                question_data = response.json().get("question")
             except requests.exceptions.RequestException as e:
-                st.error(f"Error fetching questions: {e}")
-                questions = []
+                st.error(f"Error fetching question: {e}")
+                question_data = None
 
-            if not questions:
+            if not question_data:
                 st.warning("⚠️ We're sorry, there are no approved questions available for this topic yet.")
                 st.info("Our supervisors are working on it. Please select another topic or check back later.")
                 if st.button("⬅️ Back to Home"):
                     st.switch_page("app.py")
                 st.stop()
 
-            # Select question based on current mastery (approximate locally or from backend response)
-            question_data = random.choice(questions)  # Backend can filter; here random for simplicity
-
             st.session_state.current_question = {
                 "id": question_index + 1,
+                "question_id": question_data.get("id"),
                 "question": question_data["question"],
                 "options": question_data.get("options", []),
                 "answer": question_data["answer"],
-                "topic": next_topic,
+                "topic": question_data["nano_topic"],
                 "style": question_data.get("style", "mcq")
             }
         
@@ -188,6 +171,8 @@ def render_question(subject, micro_topic, question_index):
                     try:
                         # Add assignment_id parameter if in assignment mode
                         url = f"{BACKEND_URL}/quiz/hint?question={question['question']}&nano_topic={question['topic']}"
+                        if question.get("question_id") is not None:
+                            url += f"&question_id={question['question_id']}"
                         if st.session_state.get("assignment_mode") and st.session_state.get("assignment_id"):
                             url += f"&assignment_id={st.session_state.assignment_id}"
                         
@@ -209,6 +194,8 @@ def render_question(subject, micro_topic, question_index):
                     try:
                         # Add assignment_id parameter if in assignment mode
                         url = f"{BACKEND_URL}/quiz/lesson?question={question['question']}&nano_topic={question['topic']}"
+                        if question.get("question_id") is not None:
+                            url += f"&question_id={question['question_id']}"
                         if st.session_state.get("assignment_mode") and st.session_state.get("assignment_id"):
                             url += f"&assignment_id={st.session_state.assignment_id}"
                         
@@ -249,7 +236,9 @@ def _handle_submit(answer, question, subject, micro_topic):
             "answer": answer,
             "nano_topic": question["topic"],
             "hint_used": st.session_state.hint_used,
-            "lesson_viewed": st.session_state.lesson_viewed
+            "lesson_viewed": st.session_state.lesson_viewed,
+            "question_id": question.get("question_id"),
+            "custom_question_id": question.get("custom_question_id")
         }
         
         # Add assignment_id if in assignment mode
@@ -304,7 +293,9 @@ def _handle_skip(question, subject, micro_topic):
             "answer": "",  # Empty for skip
             "nano_topic": question["topic"],
             "hint_used": st.session_state.hint_used,
-            "lesson_viewed": st.session_state.lesson_viewed
+            "lesson_viewed": st.session_state.lesson_viewed,
+            "question_id": question.get("question_id"),
+            "custom_question_id": question.get("custom_question_id")
         }
         
         # Add assignment_id if in assignment mode
@@ -0,0 +1,42 @@
+# FILE: src/ui/curriculum.py
+
+import time
+import streamlit as st
+import requests
+from typing import Dict, List, Optional
+
+# Seconds the session copy is used without asking the backend whether it changed
+REVALIDATE_SECONDS = 60
+
+
+def fetch_curriculum_structure(backend_url: str, headers: Optional[Dict[str, str]] = None) -> List[dict]:
+    """
+    Return the curriculum structure, reusing the copy kept in session state.
+
+    The backend serves /topics/structure with an ETag. Once the session copy is
+    older than REVALIDATE_SECONDS it is revalidated with If-None-Match, and a
+    304 means the copy is reused without downloading the structure again.
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails and there is no copy to fall back on
+    """
+    cached = st.session_state.get("curriculum_structure")
+    etag = st.session_state.get("curriculum_etag")
+    checked_at = st.session_state.get("curriculum_checked_at", 0)
+    if cached is not None and time.time() - checked_at < REVALIDATE_SECONDS:
+        return cached
+
+    request_headers = dict(headers or {})
+    if cached is not None and etag:
+        request_headers["If-None-Match"] = etag
+    try:
+        response = requests.get(f"{backend_url}/topics/structure", headers=request_headers, timeout=10)
+        if response.status_code != 304:
+            response.raise_for_status()
+            st.session_state.curriculum_structure = response.json().get("curriculum", [])
+            st.session_state.curriculum_etag = response.headers.get("ETag")
+        st.session_state.curriculum_checked_at = time.time()
+    except requests.exceptions.RequestException:
+        if cached is None:
+            raise
+    return st.session_state.curriculum_structure
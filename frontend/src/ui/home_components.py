@@ -5,6 +5,8 @@ import requests
 from datetime import datetime
 from typing import List, Tuple, Dict, Optional
 from src.auth.auth_handlers import AuthenticationError
+from src.ui.curriculum import fetch_curriculum_structure
+from src.ui.assignments import fetch_my_assignments
 
 
 class HomeComponents:
@@ -28,9 +30,7 @@ class HomeComponents:
             Tuple of (subjects list, micro_topics dict)
         """
         try:
-            response = requests.get(f"{self.backend_url}/topics/structure", timeout=10)
-            response.raise_for_status()
-            curriculum = response.json().get("curriculum", [])
+            curriculum = fetch_curriculum_structure(self.backend_url)
             
             subjects = [topic['name'] for topic in curriculum]
             micro_topics = {}
@@ -56,60 +56,16 @@ class HomeComponents:
         try:
             headers = self._get_auth_headers()
             
-            # First get all classes the student is enrolled in
-            classes_response = requests.get(
-                f"{self.backend_url}/classes/my-classes",
-                headers=headers,
-                timeout=10
-            )
-            classes_response.raise_for_status()
-            student_classes = classes_response.json().get("classes", [])
-            
-            all_assignments = []
-            
-            # For each class, get all assignments
-            for class_info in student_classes:
-                class_id = class_info["id"]
-                class_name = class_info["name"]
-                
-                # Get assignments for this class
-                assignments_response = requests.get(
-                    f"{self.backend_url}/assignments/class/{class_id}",
-                    headers=headers,
-                    timeout=10
+            all_assignments = [
+                (
+                    assignment["title"],
+                    assignment.get("due_date"),
+                    assignment["class_name"],
+                    max(0, assignment["max_attempts"] - assignment["attempts"]),
+                    assignment["id"]
                 )
-                assignments_response.raise_for_status()
-                assignments = assignments_response.json().get("assignments", [])
-                
-                # For each assignment, check if student has completed it
-                for assignment in assignments:
-                    assignment_id = assignment["id"]
-                    
-                    # Get student's submissions for this assignment
-                    submissions_response = requests.get(
-                        f"{self.backend_url}/assignments/{assignment_id}/submissions",
-                        headers=headers,
-                        timeout=10
-                    )
-                    
-                    if submissions_response.status_code == 200:
-                        submissions = submissions_response.json().get("submissions", [])
-                        
-                        # Check if any submission is completed
-                        completed_submissions = [s for s in submissions if s.get("completed_at")]
-                        
-                        # If no completed submissions, this assignment is pending
-                        if not completed_submissions:
-                            attempts_used = len(submissions)
-                            attempts_left = max(0, assignment["max_attempts"] - attempts_used)
-                            
-                            all_assignments.append((
-                                assignment["title"],
-                                assignment.get("due_date"),
-                                class_name,
-                                attempts_left,
-                                assignment_id
-                            ))
+                for assignment in fetch_my_assignments(self.backend_url, headers, status_filter="incomplete")
+            ]
             
             # Sort by due date (overdue first, then by due date)
             def sort_key(assignment):
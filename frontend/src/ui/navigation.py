@@ -3,6 +3,7 @@ import requests
 from src.ui.feedback import render_feedback_widget
 # from streamlit_cookies_manager import EncryptedCookieManager
 from src.auth.session import get_cookie_manager
+from src.auth.auth_handlers import AuthHandlers
 
 def render_sidebar(current_page="app", backend_url="http://127.0.0.1:8000"):
     """
@@ -95,7 +96,7 @@ def render_sidebar(current_page="app", backend_url="http://127.0.0.1:8000"):
         # Logout button
         logout_key = f"logout_{current_page}"
         if st.button("🚪 Logout", type="secondary", use_container_width=True, key=logout_key):
-            _handle_logout()
+            _handle_logout(backend_url)
 
 def _clear_quiz_state():
     """Clear all quiz-related session state variables."""
@@ -142,8 +143,13 @@ def _get_student_privacy_info(student_id, backend_url):
     # For now, returning empty lists as in your original code
     return [], []
 
-def _handle_logout():
+def _handle_logout(backend_url="http://127.0.0.1:8000"):
     """Handle user logout process."""
+    # Revoke the token on the backend (best effort)
+    token = st.session_state.get("token")
+    if token:
+        AuthHandlers(backend_url).logout_user(token)
+    
     # Clear cookies if available
     try:
         cookies = get_cookie_manager()